@@ -118,15 +118,29 @@ export const fetchSchoolUsers = async (
 // --------------------
 export const fetchSchoolCourses = async (
   schoolId,
-  { educator_id, search } = {}
+  { educator_id, search, per_page = 100 } = {}
 ) => {
   const params = new URLSearchParams();
   if (educator_id) params.append("educator_id", educator_id);
   if (search) params.append("search", search);
-  const response = await fetchWithAuth(
-    `${API_URL}/schools/${schoolId}/courses?${params.toString()}`
-  );
-  return response.data || response || [];
+  params.append("per_page", per_page);
+  params.append("cursor", "");
+
+  // The endpoint is paginated; walk the cursor so callers still get every course
+  let result = null;
+  let courses = [];
+  for (;;) {
+    const response = await fetchWithAuth(
+      `${API_URL}/schools/${schoolId}/courses?${params.toString()}`
+    );
+    const data = response.data || response || {};
+    result = result || data;
+    courses = courses.concat(data.courses || []);
+    const next = data.meta && data.meta.next_cursor;
+    if (!next) break;
+    params.set("cursor", next);
+  }
+  return { ...result, courses };
 };
 
 // --------------------
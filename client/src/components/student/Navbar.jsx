@@ -3,6 +3,7 @@ import React, { useEffect, useRef, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import * as AuthService from "../../services/authServices";
 import { fetchNotifications, markNotificationAsRead } from "../../api";
+import { useNotifications } from "../../hooks/useNotifications";
 import { Bell, User, Settings, Lock, LogOut, ChevronDown } from "lucide-react";
 
 export default function Navbar() {
@@ -11,6 +12,7 @@ export default function Navbar() {
   const [showProfileMenu, setShowProfileMenu] = useState(false);
   const [showNotifications, setShowNotifications] = useState(false);
   const [notifications, setNotifications] = useState([]);
+  useNotifications();
   const profileRef = useRef(null);
   const notifRef = useRef(null);
 
@@ -83,10 +85,20 @@ export default function Navbar() {
       }
     };
     loadNotifications();
-    
-    // Poll for new notifications every 30 seconds
-    const interval = setInterval(loadNotifications, 30000);
-    return () => clearInterval(interval);
+
+    // New notifications are pushed over the notification stream
+    const onPushed = (e) => {
+      const n = e.detail;
+      setNotifications(prev => prev.some(p => p.id === n.id) ? prev : [{
+        id: n.id,
+        text: n.title,
+        message: n.message,
+        at: n.created_at,
+        is_read: n.is_read
+      }, ...prev]);
+    };
+    window.addEventListener("edu:notification", onPushed);
+    return () => window.removeEventListener("edu:notification", onPushed);
   }, []);
 
   const handleNotificationClick = async (notif) => {
@@ -1,104 +1,115 @@
 // src/hooks/useNotifications.js
-import { useEffect, useRef } from 'react';
+import { useEffect } from 'react';
 import { API_URL as BASE_URL } from '../config';
 
 const API_URL = `${BASE_URL}/api`;
+const POLL_MS = 15000;
 
 /**
- * Global notification hook that polls for new messages
- * Works across all pages to trigger notifications
+ * Subscribes to the server's notification stream (Server-Sent Events) and
+ * re-broadcasts it as window events, so any component can react without polling:
+ *   - "edu:notification"  detail = the new notification
+ *   - "edu:unread-count"  detail = { unread_count }
+ * When the server has no room for another stream it sends "busy"; the hook
+ * then polls the unread count until it is told to try the stream again.
  */
 export function useNotifications() {
-  const lastCheckRef = useRef({});
-  const isPollingRef = useRef(false);
-
   useEffect(() => {
-    // Temporarily disabled to prevent CORS errors
-    return () => {};
-    
-    /* eslint-disable no-unreachable */
-    const pollForNewMessages = async () => {
-      if (isPollingRef.current) return; // Prevent concurrent polls
-      isPollingRef.current = true;
+    if (typeof EventSource === 'undefined') return () => {};
+
+    let source = null;
+    let retryTimer = null;
+    let pollTimer = null;
+    let lastEventId = null;
+    let stopped = false;
+    // The server re-sends its recent id window after a reconnect
+    const seen = new Set();
+
+    const track = (e) => {
+      if (e.lastEventId) lastEventId = e.lastEventId;
+    };
 
+    const broadcastCount = (detail) => {
+      window.dispatchEvent(new CustomEvent('edu:unread-count', { detail }));
+    };
+
+    const poll = async () => {
+      const token = localStorage.getItem('token');
+      if (!token || stopped) return;
       try {
-        const token = localStorage.getItem('token');
-        if (!token) return;
+        const res = await fetch(`${API_URL}/notifications/unread-count`, {
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        if (res.ok) broadcastCount((await res.json()).data);
+      } catch {
+        // Try again on the next tick
+      }
+    };
 
-        // Get user's courses
-        const coursesRes = await fetch(`${API_URL}/courses`, {
-          headers: { Authorization: `Bearer ${token}` }
+    const connect = async () => {
+      clearInterval(pollTimer);
+      const token = localStorage.getItem('token');
+      if (!token || stopped) return;
+
+      // EventSource can't send headers, so trade the token for a short-lived,
+      // stream-only ticket rather than putting the token itself in the URL
+      let ticket;
+      try {
+        const res = await fetch(`${API_URL}/notifications/stream/ticket`, {
+          method: 'POST',
+          headers: { Authorization: `Bearer ${token}` },
         });
-        
-        if (!coursesRes.ok) return;
-        
-        const coursesData = await coursesRes.json();
-        const courses = coursesData?.data?.courses || coursesData?.data?.items || [];
-        
-        // Check each course for new messages
-        for (const course of courses) {
-          try {
-            const messagesRes = await fetch(`${API_URL}/courses/${course.id}/messages`, {
-              headers: { Authorization: `Bearer ${token}` }
-            });
-            
-            if (!messagesRes.ok) continue;
-            
-            const messagesData = await messagesRes.json();
-            const messages = messagesData?.data?.messages || messagesData?.messages || [];
-            
-            if (messages.length === 0) continue;
-            
-            // Get the last message
-            const latestMessage = messages[messages.length - 1];
-            const lastChecked = lastCheckRef.current[course.id];
-            
-            // If this is a new message since last check
-            if (!lastChecked || new Date(latestMessage.timestamp) > new Date(lastChecked)) {
-              // Get current user to check if it's their own message
-              const userStr = localStorage.getItem('user');
-              const currentUser = userStr ? JSON.parse(userStr) : null;
-              const isOwnMessage = currentUser && latestMessage.user_public_id === currentUser.public_id;
-              
-              // Only notify if it's not the user's own message
-              if (!isOwnMessage) {
-                console.log('🔔 New message detected:', course.title, latestMessage.content);
-                
-                // Dispatch notification event
-                window.dispatchEvent(
-                  new CustomEvent('edu:new-message', {
-                    detail: {
-                      courseId: course.id,
-                      courseTitle: course.title || course.name,
-                      message: latestMessage
-                    }
-                  })
-                );
-              }
-              
-              // Update last checked time
-              lastCheckRef.current[course.id] = latestMessage.timestamp;
-            }
-          } catch (err) {
-            console.error(`Failed to check messages for course ${course.id}:`, err);
-          }
-        }
-      } catch (err) {
-        console.error('Failed to poll for notifications:', err);
-      } finally {
-        isPollingRef.current = false;
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        ticket = (await res.json()).data.ticket;
+      } catch {
+        retryTimer = setTimeout(connect, 5000);
+        return;
       }
+      if (stopped) return;
+
+      const params = new URLSearchParams({ ticket });
+      if (lastEventId) params.append('last_event_id', lastEventId);
+      source = new EventSource(`${API_URL}/notifications/stream?${params.toString()}`);
+
+      source.addEventListener('notification', (e) => {
+        track(e);
+        const notification = JSON.parse(e.data);
+        if (seen.has(notification.id)) return;
+        seen.add(notification.id);
+        if (seen.size > 1000) seen.delete(seen.values().next().value);
+        window.dispatchEvent(new CustomEvent('edu:notification', { detail: notification }));
+      });
+      source.addEventListener('unread_count', (e) => {
+        track(e);
+        broadcastCount(JSON.parse(e.data));
+      });
+      source.addEventListener('busy', (e) => {
+        const { retry_after: retryAfter, unread_count: unreadCount } = JSON.parse(e.data);
+        source.close();
+        broadcastCount({ unread_count: unreadCount });
+        clearInterval(pollTimer);
+        pollTimer = setInterval(poll, POLL_MS);
+        clearTimeout(retryTimer);
+        retryTimer = setTimeout(connect, retryAfter * 1000);
+      });
+
+      source.onerror = () => {
+        // The ticket is only valid for a few seconds, so when a stream ends
+        // (they are capped at a few minutes) the browser's own reconnect is
+        // refused; fetch a new ticket and resume from the last event seen
+        source.close();
+        clearTimeout(retryTimer);
+        retryTimer = setTimeout(connect, 1000);
+      };
     };
 
-    // Initial check after 2 seconds
-    const initialTimeout = setTimeout(pollForNewMessages, 2000);
-    
-    // Poll every 10 seconds
-    const interval = setInterval(pollForNewMessages, 10000);
+    connect();
 
     return () => {
-      clearTimeout(initialTimeout);
-      clearInterval(interval);
+      stopped = true;
+      clearTimeout(retryTimer);
+      clearInterval(pollTimer);
+      if (source) source.close();
     };
   }, []);
 }
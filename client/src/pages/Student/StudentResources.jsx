@@ -176,6 +176,14 @@ const StudentResources = ({ courseId, embeddedResources = [] }) => {
 
                 {/* Card Body */}
                 <div className="p-6">
+                  {r.preview_url && r.preview_url.includes(".thumb.") && (
+                    <img
+                      src={r.preview_url.startsWith("http") ? r.preview_url : `${API_URL}${r.preview_url}`}
+                      alt=""
+                      loading="lazy"
+                      className="w-full h-40 object-cover rounded-lg mb-4 bg-gray-100"
+                    />
+                  )}
                   <p className="text-sm text-gray-600 mb-4 line-clamp-3">
                     {r.description || "No description available"}
                   </p>
@@ -4,6 +4,7 @@ import React, { useState, useEffect, useCallback } from "react";
 import { Calendar, Users, CheckCircle, XCircle, Save, History, Eye, Filter, UserCheck, BookOpen, TrendingUp } from "lucide-react";
 import { AttendanceSkeleton } from "../../components/common/SkeletonLoader";
 import { API_URL as CONFIG_URL } from '../../config';
+import { fetchSchoolCourses } from '../../api';
 
 const BASE_URL = `${CONFIG_URL}/api`;
 
@@ -94,45 +95,19 @@ export default function Attendance() {
         return;
       }
 
-      const response = await fetch(`${BASE_URL}/schools/${schoolId}/courses`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json'
-        }
-      });
-
-      if (!response.ok) {
-        if (response.status === 401) {
-          setError('Authentication failed. Please log in again.');
-          return;
-        }
-        if (response.status === 403) {
-          setError('You are not allowed to view courses for this school.');
-          return;
-        }
-        throw new Error(`HTTP error! status: ${response.status}`);
-      }
-
-      const data = await response.json();
-      if (data.success) {
-        const items = data?.data?.items
-          || data?.data?.courses
-          || data?.courses
-          || [];
-        const courseList = Array.isArray(items) ? items : [];
-        setCourses(courseList);
-        
-        // Check if there's a pre-selected course from course details page
-        const preselectedCourseId = localStorage.getItem('attendance_preselect_course');
-        if (preselectedCourseId && courseList.some(c => String(c.id) === preselectedCourseId)) {
-          setSelectedCourse(preselectedCourseId);
-          setHistoryFilter(prev => ({ ...prev, course: preselectedCourseId }));
-          setShowHistory(true); // Automatically show history
-          // Clear the preselection
-          localStorage.removeItem('attendance_preselect_course');
-        }
-      } else {
-        setError(data.message || 'Failed to fetch courses');
+      // Walks the cursor, so schools with more than one page of courses get all of them
+      const data = await fetchSchoolCourses(schoolId);
+      const courseList = Array.isArray(data?.courses) ? data.courses : [];
+      setCourses(courseList);
+
+      // Check if there's a pre-selected course from course details page
+      const preselectedCourseId = localStorage.getItem('attendance_preselect_course');
+      if (preselectedCourseId && courseList.some(c => String(c.id) === preselectedCourseId)) {
+        setSelectedCourse(preselectedCourseId);
+        setHistoryFilter(prev => ({ ...prev, course: preselectedCourseId }));
+        setShowHistory(true); // Automatically show history
+        // Clear the preselection
+        localStorage.removeItem('attendance_preselect_course');
       }
     } catch (err) {
       
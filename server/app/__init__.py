@@ -1,10 +1,11 @@
 
 
 import os
+import tempfile
 from dotenv import load_dotenv
 from flask import Flask
-from .extensions import cors, db, migrate
-from flask_jwt_extended import JWTManager
+from .extensions import cors, db, jwt, migrate
+from .utils.instrumentation import init_query_instrumentation
 from datetime import timedelta
 
 # Load the right .env file
@@ -37,6 +38,16 @@ def create_app(config_name=None):
         app.config["JWT_TOKEN_LOCATION"] = ["headers"]
         app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)  # ⬅ longer for tests
         app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=30)
+        app.config["QUERY_INSTRUMENTATION"] = True
+        app.config["JWT_REVOCATION_REFRESH_SECONDS"] = 0
+        app.config["BCRYPT_LOG_ROUNDS"] = 4
+        app.config["PASSWORD_HASHER_EXECUTOR"] = "inline"
+        app.config["USER_IMPORT_PROCESSES"] = 1
+        app.config["CURRENT_USER_CACHE_TTL"] = 0
+        # Tests drive the hub directly; keep the poller idle
+        app.config["NOTIFICATION_BROKER"] = "polling"
+        app.config["NOTIFICATION_POLL_SECONDS"] = 3600
+        app.config["UPLOAD_FOLDER"] = tempfile.mkdtemp(prefix="jifunze-uploads-")
     else:
         app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev_secret")
         app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
@@ -45,6 +56,50 @@ def create_app(config_name=None):
         app.config["JWT_TOKEN_LOCATION"] = ["headers"]
         app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)   # ⬅ default 15 mins → 1 hr
         app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=30)  # ⬅ optional refresh
+        # Query count / DB time headers; on by default outside production
+        app.config["QUERY_INSTRUMENTATION"] = os.getenv(
+            "QUERY_INSTRUMENTATION", str(flask_env != "production")
+        ).lower() in ("1", "true", "yes")
+        # Token revocation store: "database" (default) or "redis"
+        app.config["JWT_REVOCATION_BACKEND"] = os.getenv("JWT_REVOCATION_BACKEND", "database")
+        app.config["JWT_REVOCATION_REDIS_URL"] = os.getenv("REDIS_URL")
+        # The job worker deletes expired revocations this often (seconds; 0 disables)
+        app.config["JWT_REVOCATION_PURGE_SECONDS"] = int(os.getenv("JWT_REVOCATION_PURGE_SECONDS", 3600))
+        # Password hashing: bcrypt cost and where it runs (inline / process / thread).
+        # A pool only helps threaded gunicorn workers; sync workers block on it anyway.
+        app.config["BCRYPT_LOG_ROUNDS"] = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+        app.config["PASSWORD_HASHER_EXECUTOR"] = os.getenv("PASSWORD_HASHER_EXECUTOR", "inline")
+        app.config["PASSWORD_HASHER_WORKERS"] = int(os.getenv("PASSWORD_HASHER_WORKERS", 0)) or None
+        # Hashing processes per CSV user import job (0: one per CPU)
+        app.config["USER_IMPORT_PROCESSES"] = int(os.getenv("USER_IMPORT_PROCESSES", 0)) or None
+        # Process-local cache of JWT users (seconds; 0 disables)
+        app.config["CURRENT_USER_CACHE_TTL"] = int(os.getenv("CURRENT_USER_CACHE_TTL", 30))
+        # Notification stream delivery across workers: "auto", "postgres" or "polling"
+        app.config["NOTIFICATION_BROKER"] = os.getenv("NOTIFICATION_BROKER", "auto")
+        app.config["NOTIFICATION_POLL_SECONDS"] = float(os.getenv("NOTIFICATION_POLL_SECONDS", 2))
+        # Each open stream holds a gthread thread; keep most threads for normal requests
+        app.config["NOTIFICATION_STREAM_MAX_PER_WORKER"] = int(os.getenv("NOTIFICATION_STREAM_MAX_PER_WORKER", 8))
+        # Upload storage: "local" (UPLOAD_FOLDER) or "s3" (any S3-compatible endpoint)
+        app.config["STORAGE_BACKEND"] = os.getenv("STORAGE_BACKEND", "local")
+        app.config["UPLOAD_FOLDER"] = os.getenv("UPLOAD_FOLDER", os.path.join(os.getcwd(), "uploads"))
+        app.config["STORAGE_S3_BUCKET"] = os.getenv("STORAGE_S3_BUCKET")
+        app.config["STORAGE_S3_ENDPOINT_URL"] = os.getenv("STORAGE_S3_ENDPOINT_URL")
+        app.config["STORAGE_S3_PUBLIC_URL"] = os.getenv("STORAGE_S3_PUBLIC_URL")
+        app.config["STORAGE_S3_PRESIGN_SECONDS"] = int(os.getenv("STORAGE_S3_PRESIGN_SECONDS", 300))
+        # Hand file bodies to the web server: nginx internal location prefix, or X-Sendfile
+        app.config["UPLOAD_ACCEL_REDIRECT"] = os.getenv("UPLOAD_ACCEL_REDIRECT")
+        app.config["USE_X_SENDFILE"] = os.getenv("USE_X_SENDFILE", "false").lower() == "true"
+        # Signed /uploads links; the key defaults to one derived from SECRET_KEY
+        app.config["UPLOAD_SIGNING_KEY"] = os.getenv("UPLOAD_SIGNING_KEY")
+        app.config["UPLOAD_URL_TTL_SECONDS"] = int(os.getenv("UPLOAD_URL_TTL_SECONDS", 3600))
+        app.config["UPLOAD_REQUIRE_SIGNED_URLS"] = os.getenv("UPLOAD_REQUIRE_SIGNED_URLS", "true").lower() == "true"
+        # Background jobs: retry backoff, and how long a running job may go without
+        # a worker heartbeat before it is requeued (checked every requeue interval)
+        app.config["JOB_BACKOFF_SECONDS"] = float(os.getenv("JOB_BACKOFF_SECONDS", 10))
+        app.config["JOB_MAX_BACKOFF_SECONDS"] = float(os.getenv("JOB_MAX_BACKOFF_SECONDS", 3600))
+        app.config["JOB_TIMEOUT_SECONDS"] = float(os.getenv("JOB_TIMEOUT_SECONDS", 300))
+        app.config["JOB_HEARTBEAT_SECONDS"] = float(os.getenv("JOB_HEARTBEAT_SECONDS", 30))
+        app.config["JOB_REQUEUE_INTERVAL_SECONDS"] = float(os.getenv("JOB_REQUEUE_INTERVAL_SECONDS", 60))
 
     db_uri = app.config.get("SQLALCHEMY_DATABASE_URI")
     if db_uri and isinstance(db_uri, str) and db_uri.startswith("postgresql"):
@@ -53,6 +108,7 @@ def create_app(config_name=None):
     # Init extensions
     db.init_app(app)
     migrate.init_app(app, db)
+    init_query_instrumentation(app)
 
     # CORS configuration
     if config_name == "testing":
@@ -94,11 +150,24 @@ def create_app(config_name=None):
             },
             supports_credentials=True,
             allow_headers=["Content-Type", "Authorization", "Cache-Control"],
+            expose_headers=["X-Query-Count", "Server-Timing"],
             methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
         )
 
     # JWT setup
-    JWTManager(app)
+    jwt.init_app(app)
+    from .utils.revocation import init_revocation_store
+    from .utils.identity import init_identity
+    from .utils.pubsub import init_notification_hub
+    from .utils.storage import init_storage
+    init_revocation_store(app)
+    init_identity(app)
+    init_notification_hub(app)
+    init_storage(app)
+
+    # Full-text search index maintenance
+    from .utils.search import register_search_events
+    register_search_events()
 
     # Register blueprints
     from .routes import api_bp
@@ -0,0 +1,56 @@
+from flask.cli import with_appcontext
+import click
+
+from app.models import AttendanceDailySummary, NotificationCounter, RevokedToken
+from app.utils.jobs import run_worker
+from app.utils.previews import run_preview_worker
+from app.utils.search import reindex
+
+
+@click.command("rebuild-attendance-summary", help="Recompute attendance_daily_summary from raw attendance.")
+@with_appcontext
+def rebuild_attendance_summary():
+    rows = AttendanceDailySummary.rebuild()
+    click.echo(f"Rebuilt attendance summary: {rows} course-day rows.")
+
+
+@click.command("purge-revoked-tokens", help="Delete revoked-token rows whose tokens have expired.")
+@with_appcontext
+def purge_revoked_tokens():
+    removed = RevokedToken.purge_expired()
+    click.echo(f"Purged {removed} expired revoked tokens.")
+
+
+@click.command("reindex-search", help="Rebuild the full-text search index from users, courses, resources and messages.")
+@with_appcontext
+def reindex_search():
+    documents = reindex()
+    click.echo(f"Reindexed {documents} search documents.")
+
+
+@click.command("reconcile-notification-counters", help="Rebuild per-user unread notification counters from notifications.")
+@with_appcontext
+def reconcile_notification_counters():
+    rows = NotificationCounter.rebuild()
+    click.echo(f"Rebuilt unread counters for {rows} users.")
+
+
+@click.command("preview-worker", help="Generate resource thumbnails and excerpts from the job queue.")
+@click.option("--processes", type=int, default=None, help="Render processes (default: CPU count).")
+@click.option("--poll", "poll_seconds", type=float, default=2.0, show_default=True, help="Seconds between polls when idle.")
+@click.option("--once", is_flag=True, help="Exit once the queue is empty.")
+@with_appcontext
+def preview_worker(processes, poll_seconds, once):
+    processed = run_preview_worker(processes=processes, poll_seconds=poll_seconds, once=once)
+    click.echo(f"Processed {processed} preview jobs.")
+
+
+@click.command("worker", help="Run background jobs (notification fan-out, exports, previews).")
+@click.option("--concurrency", "-c", type=int, default=1, show_default=True, help="Jobs run at the same time.")
+@click.option("--kind", "kinds", multiple=True, help="Only run jobs of this kind (repeatable).")
+@click.option("--poll", "poll_seconds", type=float, default=1.0, show_default=True, help="Seconds between polls when idle.")
+@click.option("--once", is_flag=True, help="Exit once no job is due.")
+@with_appcontext
+def worker(concurrency, kinds, poll_seconds, once):
+    processed = run_worker(concurrency=concurrency, kinds=list(kinds) or None, poll_seconds=poll_seconds, once=once)
+    click.echo(f"Ran {processed} jobs.")
@@ -1,26 +1,174 @@
+import base64
+import json
+from datetime import date, datetime
+
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from flask import request, url_for
 from flask_marshmallow import Marshmallow
-from app.utils.responses import success_response
+from flask_jwt_extended import JWTManager
+from sqlalchemy import and_, or_
+from app.utils.responses import success_response, error_response
+from app.utils.conditional import cache_headers, list_validator, make_etag, newest, not_modified, related_validator
 
 db = SQLAlchemy()
 migrate = Migrate()
 cors = CORS()
 ma = Marshmallow()
+jwt = JWTManager()
+
+
+def encode_cursor(row, columns):
+    """Encode the sort-key values of `row` into an opaque, URL-safe cursor."""
+    values = []
+    for column in columns:
+        value = getattr(row, column.key)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        values.append(value)
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, columns):
+    """Decode a cursor produced by encode_cursor back into typed column values."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("Malformed cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Cursor does not match this listing")
+
+    decoded = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        if value is None:
+            raise ValueError("Cursor contains an empty sort key")
+        if python_type is datetime:
+            value = datetime.fromisoformat(value)
+        elif python_type is date:
+            value = date.fromisoformat(value)
+        else:
+            value = python_type(value)
+        decoded.append(value)
+    return decoded
+
 
-def paginate(query, schema, default_per_page=10, resource_name="items"):
+def _keyset_after(columns, values):
+    """
+    Rows strictly after `values` in descending (columns...) order:
+    (a < va) OR (a = va AND b < vb) OR ...
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, column < values[i]))
+    return or_(*clauses)
+
+
+def _paginate_by_cursor(query, schema, per_page, resource_name, cursor_column, extra=None, etag_parts=(),
+                        related=()):
+    """
+    Keyset pagination: seeks past the last row seen instead of using OFFSET,
+    and only runs COUNT(*) when ?include_total=true is passed.
+    """
+    entity = query.column_descriptions[0]["entity"]
+    columns = [cursor_column, entity.id] if cursor_column is not None else [entity.id]
+
+    token = request.args.get("cursor", "")
+    include_total = request.args.get("include_total", "false").lower() == "true"
+
+    page_query = query.order_by(None).order_by(*[c.desc() for c in columns])
+    if token:
+        try:
+            values = decode_cursor(token, columns)
+        except (ValueError, TypeError):
+            return error_response("Invalid cursor.", status_code=400)
+        page_query = page_query.filter(_keyset_after(columns, values))
+
+    rows = page_query.limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor(rows[-1], columns) if has_next else None
+
+    # Validate on the page itself so cursor listings never need a COUNT
+    stamps = [(row.id, row.updated_at) for row in rows]
+    if related and rows:
+        stamps += related_validator(query.filter(entity.id.in_([row.id for row in rows])), *related)
+    last_modified = newest(stamps)
+    etag = make_etag(resource_name, has_next, stamps, *etag_parts)
+    cached = not_modified(etag, last_modified, honor_if_modified_since=False)
+    if cached:
+        return cached
+
+    def make_url(cursor):
+        args = request.args.to_dict()
+        args.update(cursor=cursor, per_page=per_page)
+        return url_for(request.endpoint, **args, **request.view_args, _external=True)
+
+    meta = {"per_page": per_page, "next_cursor": next_cursor}
+    if include_total:
+        meta["total"] = query.order_by(None).count()
+
+    response_data = {
+        **(extra or {}),
+        resource_name: schema.dump(rows),
+        "meta": meta,
+        "links": {
+            "self": make_url(token),
+            "next": make_url(next_cursor) if next_cursor else None
+        }
+    }
+
+    return success_response(
+        "Fetched paginated results successfully.", response_data,
+        headers=cache_headers(etag, last_modified)
+    )
+
+
+def paginate(query, schema, default_per_page=10, resource_name="items", cursor_column=None, extra=None,
+             etag_parts=(), related=()):
     """
     Reusable pagination for list endpoints with meta + links.
     - query: SQLAlchemy query (e.g., Course.query)
     - schema: Marshmallow schema (e.g., courses_schema)
     - resource_name: key under which items will appear in data
+    - cursor_column: column the listing is ordered by (descending). When the
+      request carries ?cursor=, pages are keyed on (cursor_column, id) instead
+      of page numbers; pass an empty cursor to fetch the first page.
+    - extra: additional keys to include in data alongside the items
+    - etag_parts: values the serialized items depend on beyond the rows
+      themselves (e.g. the signing window of signed URLs)
+    - related: relationships the schema embeds (e.g. Course.resources); their
+      rows are folded into the validator, see related_validator
+    Responses carry an ETag / Last-Modified; a matching If-None-Match gets a
+    304 before any rows are serialized. If-Modified-Since is not honoured:
+    a deleted row does not move the newest updated_at.
     """
     page = request.args.get("page", 1, type=int)
     per_page = request.args.get("per_page", default_per_page, type=int)
 
-    items = query.paginate(page=page, per_page=per_page, error_out=False)
+    if "cursor" in request.args:
+        if per_page < 1:
+            per_page = default_per_page
+        return _paginate_by_cursor(query, schema, per_page, resource_name, cursor_column, extra, etag_parts,
+                                   related)
+
+    # One aggregate gives both the total and the conditional-GET validator
+    validators = [list_validator(query)]
+    if related:
+        validators += related_validator(query, *related)
+    total = validators[0][0]
+    last_modified = newest(validators)
+    etag = make_etag(resource_name, validators, *etag_parts)
+    cached = not_modified(etag, last_modified, honor_if_modified_since=False)
+    if cached:
+        return cached
+
+    items = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+    items.total = total
 
     # Build pagination links dynamically
     def make_url(p):
@@ -33,6 +181,7 @@ def paginate(query, schema, default_per_page=10, resource_name="items"):
     }
 
     response_data = {
+        **(extra or {}),
         resource_name: schema.dump(items.items),
         "meta": {
             "total": items.total,
@@ -43,4 +192,7 @@ def paginate(query, schema, default_per_page=10, resource_name="items"):
         "links": links
     }
 
-    return success_response("Fetched paginated results successfully.", response_data)
+    return success_response(
+        "Fetched paginated results successfully.", response_data,
+        headers=cache_headers(etag, last_modified)
+    )
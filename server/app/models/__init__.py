@@ -1,12 +1,16 @@
 from .attendance import Attendance
+from .attendance_summary import AttendanceDailySummary
 from .base import BaseModel, db
 from .course import Course
 from .enrollment import Enrollment
+from .job import Job
 from .message import Message
 from .resource import Resource
 from .school import School
 from .reset_password import ResetPassword
 from .notification import Notification
+from .notification_counter import NotificationCounter
+from .revoked_token import RevokedToken
 # Import all models here so they register with SQLAlchemy
 from .user import User
 
@@ -18,8 +22,12 @@ __all__ = [
     "Course",
     "Enrollment",
     "Attendance",
+    "AttendanceDailySummary",
     "Resource",
     "Message",
     "ResetPassword",
     "Notification",
+    "NotificationCounter",
+    "RevokedToken",
+    "Job",
 ]
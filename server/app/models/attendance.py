@@ -4,7 +4,7 @@ from .course import Course
 from sqlalchemy.orm import synonym
 
 class Attendance(BaseModel):
-    _tablename_ = "attendance"
+    __tablename__ = "attendance"
 
     # Foreign Keys
     user_public_id = db.Column(db.String(50), db.ForeignKey("users.public_id"), nullable=False)
@@ -21,9 +21,12 @@ class Attendance(BaseModel):
     verifier = db.relationship("User", foreign_keys=[verified_by_public_id])
     course = db.relationship("Course", back_populates="attendance", foreign_keys=[course_id])
 
-    _table_args_ = (
+    __table_args__ = (
         db.UniqueConstraint("user_public_id", "course_id", "date", name="unique_attendance"),
+        # List filters: ?course_id= and a student's own records, both newest first
+        db.Index("ix_attendance_course_id_date", "course_id", "date"),
+        db.Index("ix_attendance_user_public_id_date", "user_public_id", "date"),
     )
 
-    def _repr_(self):
+    def __repr__(self):
         return f"<Attendance user={self.user_public_id}, course={self.course_id}, date={self.date}>"
\ No newline at end of file
@@ -0,0 +1,181 @@
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from .base import BaseModel, db
+from .attendance import Attendance
+
+# Attendance.status -> summary counter column
+STATUS_COLUMNS = {
+    "present": "present_count",
+    "absent": "absent_count",
+    "late": "late_count",
+}
+
+
+class AttendanceDailySummary(BaseModel):
+    """Per-course, per-day attendance counts kept in sync with Attendance rows."""
+    __tablename__ = "attendance_daily_summary"
+
+    course_id = db.Column(db.Integer, db.ForeignKey("courses.id"), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    present_count = db.Column(db.Integer, nullable=False, default=0)
+    absent_count = db.Column(db.Integer, nullable=False, default=0)
+    late_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Relationships
+    course = db.relationship("Course", back_populates="attendance_summaries")
+
+    __table_args__ = (
+        db.UniqueConstraint("course_id", "date", name="unique_attendance_summary_day"),
+    )
+
+    @property
+    def total_count(self):
+        return self.present_count + self.absent_count + self.late_count
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every summary row from the raw attendance table."""
+        table = cls.__table__
+        rollup = (
+            select(
+                Attendance.course_id,
+                Attendance.date,
+                func.sum(case((Attendance.status == "present", 1), else_=0)),
+                func.sum(case((Attendance.status == "absent", 1), else_=0)),
+                func.sum(case((Attendance.status == "late", 1), else_=0)),
+            )
+            .group_by(Attendance.course_id, Attendance.date)
+        )
+        try:
+            db.session.execute(table.delete())
+            db.session.execute(
+                table.insert().from_select(
+                    ["course_id", "date", "present_count", "absent_count", "late_count"], rollup
+                )
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return db.session.query(func.count(cls.id)).scalar()
+
+    def __repr__(self):
+        return f"<AttendanceDailySummary course={self.course_id}, date={self.date}>"
+
+
+# -----------------------------
+# Keep summary rows in sync with Attendance writes
+#
+# Mapper events record +1/-1 deltas per (course, day) on the session while it
+# flushes; after_flush folds them into one upsert per touched (course, day), so
+# a whole roll call costs one statement per class-day rather than per student.
+# -----------------------------
+_DELTAS_KEY = "attendance_summary_deltas"
+
+
+def _record(target, key, delta):
+    session = object_session(target)
+    course_id, day, status = key
+    column = STATUS_COLUMNS.get(status)
+    if session is None or not column or course_id is None or day is None:
+        return
+    counters = session.info.setdefault(_DELTAS_KEY, {}).setdefault((course_id, day), {})
+    counters[column] = counters.get(column, 0) + delta
+
+
+def _committed_key(target):
+    """(course_id, date, status) as last written to the database."""
+    state = inspect(target)
+    values = []
+    for attr in ("course_id", "date", "status"):
+        history = state.attrs[attr].history
+        values.append(history.deleted[0] if history.deleted else getattr(target, attr))
+    return tuple(values)
+
+
+def _on_insert(mapper, connection, target):
+    _record(target, (target.course_id, target.date, target.status), 1)
+
+
+def _on_update(mapper, connection, target):
+    old_key = _committed_key(target)
+    new_key = (target.course_id, target.date, target.status)
+    if old_key == new_key:
+        return
+    _record(target, old_key, -1)
+    _record(target, new_key, 1)
+
+
+def _on_delete(mapper, connection, target):
+    _record(target, _committed_key(target), -1)
+
+
+def _apply_deltas(connection, course_id, day, deltas):
+    """Add `deltas` ({column: n}) to one summary row, creating it if needed."""
+    table = AttendanceDailySummary.__table__
+    changes = {column: table.c[column] + delta for column, delta in deltas.items()}
+
+    if not any(delta > 0 for delta in deltas.values()):
+        # Only decrements: never create a row, never go below zero
+        connection.execute(
+            table.update()
+            .where(table.c.course_id == course_id, table.c.date == day)
+            .values({column: case((expr < 0, 0), else_=expr) for column, expr in changes.items()})
+        )
+        return
+
+    values = {"course_id": course_id, "date": day, "present_count": 0, "absent_count": 0, "late_count": 0}
+    values.update({column: max(delta, 0) for column, delta in deltas.items()})
+
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["course_id", "date"],
+            set_={**changes, "updated_at": stmt.excluded.updated_at},
+        )
+        connection.execute(stmt)
+        return
+
+    result = connection.execute(
+        table.update()
+        .where(table.c.course_id == course_id, table.c.date == day)
+        .values(changes)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(**values))
+
+
+def _reset_deltas(session, flush_context, instances):
+    # A flush that failed part-way may have left deltas behind
+    session.info.pop(_DELTAS_KEY, None)
+
+
+def _flush_deltas(session, flush_context):
+    pending = session.info.pop(_DELTAS_KEY, None)
+    if not pending:
+        return
+    connection = session.connection()
+    for (course_id, day), deltas in pending.items():
+        deltas = {column: delta for column, delta in deltas.items() if delta}
+        if deltas:
+            _apply_deltas(connection, course_id, day, deltas)
+
+
+def _load_previous(target, value, oldvalue, initiator):
+    """No-op; registered with active_history so the old value is loaded before a change."""
+
+
+for _attr in (Attendance.course_id, Attendance.date, Attendance.status):
+    event.listen(_attr, "set", _load_previous, active_history=True)
+
+event.listen(Attendance, "after_insert", _on_insert)
+event.listen(Attendance, "after_update", _on_update)
+event.listen(Attendance, "after_delete", _on_delete)
+event.listen(Session, "before_flush", _reset_deltas)
+event.listen(Session, "after_flush", _flush_deltas)
@@ -31,6 +31,12 @@ class Course(BaseModel):
         cascade="all, delete-orphan",
         foreign_keys="Attendance.course_id"
     )
+    attendance_summaries = db.relationship(
+        "AttendanceDailySummary",
+        back_populates="course",
+        cascade="all, delete-orphan",
+        foreign_keys="AttendanceDailySummary.course_id"
+    )
     resources = db.relationship(
         "Resource",
         back_populates="course",
@@ -44,5 +50,10 @@ class Course(BaseModel):
         foreign_keys="Message.course_id"
     )
 
+    __table_args__ = (
+        db.Index("ix_courses_school_id_created_at", "school_id", "created_at"),
+        db.Index("ix_courses_educator_id", "educator_id"),
+    )
+
     def __repr__(self):
         return f"<Course {self.title}>"
\ No newline at end of file
@@ -21,6 +21,8 @@ class Enrollment(BaseModel):
     # Unique constraint: one student can only be enrolled once in a course
     __table_args__ = (
         db.UniqueConstraint("user_public_id", "course_id", name="unique_user_course"),
+        # unique_user_course covers lookups by student; this covers roster lookups by course
+        db.Index("ix_enrollments_course_id", "course_id"),
     )
 
     @validates("date_enrolled")
@@ -0,0 +1,145 @@
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+
+from .base import BaseModel, db
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Serializes claims within a process on databases without SKIP LOCKED
+_claim_lock = threading.Lock()
+
+
+class Job(BaseModel):
+    """A unit of background work, run by a worker process outside the request."""
+    __tablename__ = "jobs"
+
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=DEFAULT_MAX_ATTEMPTS)
+    # Not picked up before this time (retry backoff)
+    run_at = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    requested_by_public_id = db.Column(db.String(50), db.ForeignKey("users.public_id"), nullable=True)
+    started_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    finished_at = db.Column(db.DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_jobs_status_run_at_id", "status", "run_at", "id"),
+    )
+
+    @classmethod
+    def enqueue(cls, kind, payload=None, requested_by=None, max_attempts=None):
+        """Add a queued job to the session; the caller commits."""
+        job = cls(
+            kind=kind,
+            payload=payload or {},
+            status="queued",
+            attempts=0,
+            max_attempts=max_attempts or DEFAULT_MAX_ATTEMPTS,
+            run_at=datetime.now(timezone.utc),
+            requested_by_public_id=requested_by,
+        )
+        db.session.add(job)
+        return job
+
+    @classmethod
+    def claim(cls, kinds=None, limit=1):
+        """
+        Mark up to `limit` due queued jobs (of `kinds`, a kind or list of
+        kinds; any kind if None) as running and return them, oldest first.
+
+        PostgreSQL claims with one UPDATE ... WHERE id IN (SELECT ... FOR
+        UPDATE SKIP LOCKED), so concurrent workers skip each other's rows
+        instead of queueing behind them. Elsewhere (SQLite) claims take a
+        process-wide lock and each row is taken with a conditional UPDATE,
+        so two workers never get the same job.
+        """
+        if isinstance(kinds, str):
+            kinds = [kinds]
+        table = cls.__table__
+        now = datetime.now(timezone.utc)
+        due = db.select(table.c.id).where(table.c.status == "queued", table.c.run_at <= now)
+        if kinds:
+            due = due.where(table.c.kind.in_(list(kinds)))
+        due = due.order_by(table.c.run_at, table.c.id).limit(limit)
+        running = dict(status="running", attempts=table.c.attempts + 1, started_at=now, updated_at=now)
+
+        if db.session.get_bind().dialect.name == "postgresql":
+            claimed = db.session.execute(
+                table.update()
+                .where(table.c.id.in_(due.with_for_update(skip_locked=True).scalar_subquery()))
+                .values(**running)
+                .returning(table.c.id)
+            ).scalars().all()
+            db.session.commit()
+        else:
+            with _claim_lock:
+                claimed = []
+                for job_id in db.session.execute(due).scalars().all():
+                    result = db.session.execute(
+                        table.update()
+                        .where(table.c.id == job_id, table.c.status == "queued")
+                        .values(**running)
+                    )
+                    if result.rowcount == 1:
+                        claimed.append(job_id)
+                db.session.commit()
+
+        if not claimed:
+            return []
+        return cls.query.filter(cls.id.in_(claimed)).order_by(cls.run_at, cls.id).all()
+
+    @classmethod
+    def requeue_stale(cls, timeout_seconds):
+        """
+        Put back running jobs whose worker has not touched them (updated_at,
+        kept fresh by the worker's heartbeat) for `timeout_seconds`: it died.
+        """
+        table = cls.__table__
+        now = datetime.now(timezone.utc)
+        stale = (table.c.status == "running") & (table.c.updated_at < now - timedelta(seconds=timeout_seconds))
+        exhausted = db.session.execute(
+            table.update()
+            .where(stale, table.c.attempts >= table.c.max_attempts)
+            .values(status="failed", error="Timed out", finished_at=now, updated_at=now)
+        ).rowcount
+        requeued = db.session.execute(
+            table.update().where(stale).values(status="queued", run_at=now, updated_at=now)
+        ).rowcount
+        db.session.commit()
+        return requeued + exhausted
+
+    def mark_done(self, result=None):
+        self.status = "done"
+        self.result = result
+        self.error = None
+        self.finished_at = datetime.now(timezone.utc)
+
+    def mark_failed(self, error):
+        self.status = "failed"
+        self.error = str(error)[:2000]
+        self.finished_at = datetime.now(timezone.utc)
+
+    def record_failure(self, error, backoff_seconds=10, max_backoff_seconds=3600):
+        """
+        Requeue with exponential backoff (and jitter) while attempts remain,
+        otherwise mark failed. Returns True if the job will be retried.
+        """
+        if self.attempts >= self.max_attempts:
+            self.mark_failed(error)
+            return False
+        delay = min(backoff_seconds * 2 ** max(self.attempts - 1, 0), max_backoff_seconds)
+        # Jitter so jobs that failed together don't all retry together
+        delay = delay / 2 + random.uniform(0, delay / 2)
+        self.status = "queued"
+        self.error = str(error)[:2000]
+        self.run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        return True
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.kind} ({self.status})>"
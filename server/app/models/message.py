@@ -20,5 +20,11 @@ class Message(BaseModel):
         "Message", backref=db.backref("parent", remote_side="Message.id")
     )
 
+    __table_args__ = (
+        db.Index("ix_messages_course_id_timestamp", "course_id", "timestamp"),
+        db.Index("ix_messages_user_public_id_timestamp", "user_public_id", "timestamp"),
+        db.Index("ix_messages_parent_id", "parent_id"),
+    )
+
     def __repr__(self):
         return f"<Message user={self.user_public_id}, course={self.course_id}, ts={self.timestamp}>"
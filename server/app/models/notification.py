@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -15,5 +15,10 @@ class Notification(BaseModel):
     # Relationship
     user = relationship("User", backref="notifications", foreign_keys=[user_public_id])
 
+    __table_args__ = (
+        # Unread badge + newest-first listing per user
+        Index("ix_notifications_user_public_id_is_read_created_at", "user_public_id", "is_read", "created_at"),
+    )
+
     def __repr__(self):
         return f"<Notification {self.title} for {self.user_public_id}>"
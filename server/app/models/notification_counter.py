@@ -0,0 +1,175 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from .base import BaseModel, db
+from .notification import Notification
+
+
+class NotificationCounter(BaseModel):
+    """Per-user unread notification count kept in sync with Notification rows."""
+    __tablename__ = "notification_counters"
+
+    user_public_id = db.Column(db.String(50), db.ForeignKey("users.public_id"), nullable=False, unique=True)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def unread_for(cls, user_public_id):
+        count = db.session.query(cls.unread_count).filter_by(user_public_id=user_public_id).scalar()
+        return count or 0
+
+    @classmethod
+    def increment(cls, user_public_ids, delta=1, connection=None):
+        """Add `delta` to each user's counter in one statement, creating missing rows."""
+        user_public_ids = list(user_public_ids)
+        if user_public_ids and delta:
+            _apply_deltas(connection or db.session.connection(), {uid: delta for uid in user_public_ids})
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every counter from the notifications table."""
+        table = cls.__table__
+        rollup = (
+            select(Notification.user_public_id, func.count(Notification.id))
+            .where(Notification.is_read.is_(False))
+            .group_by(Notification.user_public_id)
+        )
+        try:
+            db.session.execute(table.delete())
+            db.session.execute(table.insert().from_select(["user_public_id", "unread_count"], rollup))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return db.session.query(func.count(cls.id)).scalar()
+
+    def __repr__(self):
+        return f"<NotificationCounter {self.user_public_id}: {self.unread_count}>"
+
+
+# -----------------------------
+# Keep counters in sync with ORM Notification writes
+#
+# Same approach as the attendance summary: mapper events record +1/-1 per
+# user while the session flushes, and after_flush applies them in one
+# statement. Bulk INSERT/UPDATE statements bypass these events and adjust the
+# counters themselves (NotificationCounter.increment / reset).
+# -----------------------------
+_DELTAS_KEY = "notification_counter_deltas"
+
+
+def _record(target, user_public_id, delta):
+    session = object_session(target)
+    if session is None or user_public_id is None:
+        return
+    deltas = session.info.setdefault(_DELTAS_KEY, {})
+    deltas[user_public_id] = deltas.get(user_public_id, 0) + delta
+
+
+def _committed(target):
+    """(user_public_id, is_read) as last written to the database."""
+    state = inspect(target)
+    values = []
+    for attr in ("user_public_id", "is_read"):
+        history = state.attrs[attr].history
+        values.append(history.deleted[0] if history.deleted else getattr(target, attr))
+    return tuple(values)
+
+
+def _on_insert(mapper, connection, target):
+    if not target.is_read:
+        _record(target, target.user_public_id, 1)
+
+
+def _on_update(mapper, connection, target):
+    old_user, old_read = _committed(target)
+    if (old_user, bool(old_read)) == (target.user_public_id, bool(target.is_read)):
+        return
+    if not old_read:
+        _record(target, old_user, -1)
+    if not target.is_read:
+        _record(target, target.user_public_id, 1)
+
+
+def _on_delete(mapper, connection, target):
+    user_public_id, is_read = _committed(target)
+    if not is_read:
+        _record(target, user_public_id, -1)
+
+
+def _apply_deltas(connection, deltas):
+    """Add {user_public_id: delta} to the counters; never below zero."""
+    table = NotificationCounter.__table__
+    deltas = {uid: delta for uid, delta in deltas.items() if delta}
+    now = datetime.now(timezone.utc)
+
+    # Group by delta so a fan-out chunk (all +1) is a single statement
+    by_delta = {}
+    for uid, delta in deltas.items():
+        by_delta.setdefault(delta, []).append(uid)
+
+    dialect = connection.dialect.name
+    for delta, user_public_ids in by_delta.items():
+        new_count = table.c.unread_count + delta
+        if delta < 0:
+            # Only decrements: never create a row, never go below zero
+            connection.execute(
+                table.update()
+                .where(table.c.user_public_id.in_(user_public_ids))
+                .values(unread_count=case((new_count < 0, 0), else_=new_count), updated_at=now)
+            )
+            continue
+
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(table).values([
+                {"user_public_id": uid, "unread_count": delta} for uid in user_public_ids
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_public_id"],
+                set_={"unread_count": new_count, "updated_at": stmt.excluded.updated_at},
+            )
+            connection.execute(stmt)
+            continue
+
+        existing = set(connection.execute(
+            select(table.c.user_public_id).where(table.c.user_public_id.in_(user_public_ids))
+        ).scalars())
+        if existing:
+            connection.execute(
+                table.update()
+                .where(table.c.user_public_id.in_(existing))
+                .values(unread_count=new_count, updated_at=now)
+            )
+        missing = [uid for uid in user_public_ids if uid not in existing]
+        if missing:
+            connection.execute(table.insert(), [{"user_public_id": uid, "unread_count": delta} for uid in missing])
+
+
+def _reset_deltas(session, flush_context, instances):
+    # A flush that failed part-way may have left deltas behind
+    session.info.pop(_DELTAS_KEY, None)
+
+
+def _flush_deltas(session, flush_context):
+    pending = session.info.pop(_DELTAS_KEY, None)
+    if pending:
+        _apply_deltas(session.connection(), pending)
+
+
+def _load_previous(target, value, oldvalue, initiator):
+    """No-op; registered with active_history so the old value is loaded before a change."""
+
+
+for _attr in (Notification.user_public_id, Notification.is_read):
+    event.listen(_attr, "set", _load_previous, active_history=True)
+
+event.listen(Notification, "after_insert", _on_insert)
+event.listen(Notification, "after_update", _on_update)
+event.listen(Notification, "after_delete", _on_delete)
+event.listen(Session, "before_flush", _reset_deltas)
+event.listen(Session, "after_flush", _flush_deltas)
@@ -12,10 +12,22 @@ class Resource(BaseModel):
     title = db.Column(db.String(150), nullable=False)
     url = db.Column(db.String(255), nullable=False)
     type = db.Column(db.String(50), nullable=False)  # pdf, video, doc, etc.
+    # Set for uploaded files (content-addressed storage); NULL for external URLs
+    sha256 = db.Column(db.String(64), nullable=True)
+    size = db.Column(db.BigInteger, nullable=True)
+    mime_type = db.Column(db.String(100), nullable=True)
+    # Storage key of the generated thumbnail/excerpt, once the preview job has run
+    preview_key = db.Column(db.String(255), nullable=True)
 
     # Relationships
     course = db.relationship("Course", back_populates="resources")
     uploader = db.relationship("User", back_populates="resources", primaryjoin="Resource.uploaded_by_public_id==User.public_id")
 
+    __table_args__ = (
+        db.Index("ix_resources_course_id_created_at", "course_id", "created_at"),
+        db.Index("ix_resources_created_at", "created_at"),
+        db.Index("ix_resources_sha256", "sha256"),
+    )
+
     def __repr__(self):
         return f"<Resource {self.title} ({self.type})>"
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from .base import BaseModel, db
+
+
+class RevokedToken(BaseModel):
+    """A JWT revoked before its natural expiry (e.g. on logout)."""
+    __tablename__ = "revoked_tokens"
+
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    token_type = db.Column(db.String(10), nullable=False, default="access")
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=True, index=True)
+
+    @classmethod
+    def purge_expired(cls, now=None):
+        """Delete rows whose token has expired anyway; returns the number removed."""
+        now = now or datetime.now(timezone.utc)
+        removed = cls.query.filter(cls.expires_at < now).delete(synchronize_session=False)
+        db.session.commit()
+        return removed
+
+    def __repr__(self):
+        return f"<RevokedToken {self.jti} ({self.token_type})>"
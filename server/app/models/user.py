@@ -1,12 +1,10 @@
 import uuid
-from flask_bcrypt import Bcrypt
 from sqlalchemy import Enum
 from sqlalchemy.orm import validates, relationship
 
+from app.utils.passwords import hash_password, verify_password
 from .base import BaseModel, db
 
-bcrypt = Bcrypt()
-
 ROLES = ("student", "educator", "manager")
 
 
@@ -73,12 +71,16 @@ class User(BaseModel):
     )
     reset_passwords = relationship("ResetPassword", back_populates="user")
 
+    __table_args__ = (
+        db.Index("ix_users_school_id_role", "school_id", "role"),
+    )
+
     # 🔹 Password methods
     def set_password(self, password: str):
-        self.password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
 
     @validates("email")
     def validate_email(self, key, email):
@@ -1,20 +1,25 @@
 from flask_restful import Api
 from flask import Blueprint
 from .courses import CourseListResource, CourseResource
-from .attendance import AttendanceListResource, AttendanceResource
+from .attendance import AttendanceListResource, AttendanceResource, AttendanceBulkResource, AttendanceExportResource
 from .auth import RegisterResource, LoginResource, LogoutResource, ResetPasswordResource 
-from .users import (UserResource, UserListResource, 
-    UserProfileResource, UsersBySchoolResource, UserDashboardResource, ValidateUserEmailResource)
+from .users import (UserResource, UserListResource, UserCoursesResource,
+                    UserProfileResource, UsersBySchoolResource, UserDashboardResource, ValidateUserEmailResource,
+                    SchoolUsersImportResource)
 from .schools import (SchoolResource, SchoolListResource, SchoolStatsResource,
-    SchoolUsersResource, SchoolCoursesResource, SchoolDashboardResource,
-    EducatorsByManagerResource, ManagerStudentsResource, ManagerUsersResource, SchoolAssignUserResource)
-from .messages import MessageListResource, MessageResource
+                      SchoolUsersResource, SchoolCoursesResource, SchoolDashboardResource,
+                      EducatorsByManagerResource, ManagerStudentsResource, ManagerUsersResource,
+                      SchoolAssignUserResource)
+from .messages import MessageListResource, MessageResource, MessageThreadResource
 from .resources import ResourceListApi, ResourceDetailApi
 from .enrollment import EnrollmentListResource, EnrollmentResource
 from .resources import CourseResourcesApi
 from .resources import StudentResourcesApi
-from .notifications import (NotificationListResource, NotificationResource, 
-    NotificationMarkAllReadResource)
+from .notifications import (NotificationListResource, NotificationResource,
+                            NotificationMarkAllReadResource, NotificationStreamResource,
+                            NotificationStreamTicketResource, NotificationUnreadCountResource)
+from .search import SearchResource
+from .jobs import JobResource
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 api = Api(api_bp)
 
@@ -24,6 +29,8 @@ api.add_resource(CourseResource, "/courses/<int:course_id>")
 
 # Attendance endpoints
 api.add_resource(AttendanceListResource, "/attendance")
+api.add_resource(AttendanceBulkResource, "/attendance/bulk")
+api.add_resource(AttendanceExportResource, "/attendance/export")
 api.add_resource(AttendanceResource, "/attendance/<int:attendance_id>")
 
 # Auth endpoints
@@ -37,9 +44,11 @@ api.add_resource(ResetPasswordResource, "/auth/reset-password")
 # -------------------
 api.add_resource(UserListResource, "/users")
 api.add_resource(UserResource, "/users/me", "/users/<int:user_id>")
+api.add_resource(UserCoursesResource, "/users/me/courses")
 api.add_resource(UserProfileResource, "/users/profile")
 api.add_resource(UserDashboardResource, "/users/dashboard")
 api.add_resource(UsersBySchoolResource, "/schools/<int:school_id>/users")
+api.add_resource(SchoolUsersImportResource, "/schools/<int:school_id>/users/import")
 api.add_resource(ValidateUserEmailResource, "/users/validate-email/<string:email>")
 
 # -------------------
@@ -63,11 +72,15 @@ api.add_resource(ManagerUsersResource, "/manager/users")
 # Message endpoints
 api.add_resource(MessageListResource, "/messages")
 api.add_resource(MessageResource, "/messages/<int:message_id>")
+api.add_resource(MessageThreadResource, "/messages/<int:message_id>/thread")
 
 # Notification endpoints
 api.add_resource(NotificationListResource, "/notifications")
 api.add_resource(NotificationResource, "/notifications/<int:notification_id>")
 api.add_resource(NotificationMarkAllReadResource, "/notifications/mark-all-read")
+api.add_resource(NotificationStreamResource, "/notifications/stream")
+api.add_resource(NotificationStreamTicketResource, "/notifications/stream/ticket")
+api.add_resource(NotificationUnreadCountResource, "/notifications/unread-count")
 
 # Resource endpoints
 api.add_resource(ResourceListApi, "/resources")
@@ -75,6 +88,12 @@ api.add_resource(ResourceDetailApi, "/resources/<int:resource_id>")
 api.add_resource(CourseResourcesApi, "/courses/<int:course_id>/resources")
 api.add_resource(StudentResourcesApi, "/student/resources")
 
+# Search endpoint
+api.add_resource(SearchResource, "/search")
+
+# Background job status
+api.add_resource(JobResource, "/jobs/<int:job_id>")
+
 
 # -------------------
 # Enrollment endpoints
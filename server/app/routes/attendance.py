@@ -1,14 +1,21 @@
-from flask import request, current_app
+import csv
+import io
+import json
+import tempfile
+from flask import Response, request, current_app, stream_with_context
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, get_current_user
+from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from sqlalchemy.orm import joinedload
-from datetime import datetime
+from sqlalchemy.orm import joinedload, lazyload
+from datetime import date, datetime
 
-from app.models import Attendance, Course, User
+from app.models import Attendance, Course, Enrollment, Job, User
 from app.extensions import db, paginate
-from app.schemas.attendance import attendance_schema, attendances_schema
+from app.schemas.attendance import ATTENDANCE_STATUSES, attendance_schema, attendances_schema
 from app.utils.responses import success_response, error_response
+from app.utils.jobs import job_accepted, job_handler
+from app.utils.storage import get_storage
 
 
 def require_roles(*roles):
@@ -61,7 +68,7 @@ class AttendanceListResource(Resource):
             query = query.filter_by(status=status)
 
         query = query.order_by(Attendance.date.desc())
-        return paginate(query, attendances_schema, resource_name="attendance")
+        return paginate(query, attendances_schema, resource_name="attendance", cursor_column=Attendance.date)
 
 
     @jwt_required()
@@ -128,6 +135,289 @@ class AttendanceListResource(Resource):
             return error_response("Error creating attendance record.", status_code=500, errors=str(e))
 
 
+BULK_ATTENDANCE_MAX_RECORDS = 500
+
+
+EXPORT_COLUMNS = [
+    "id", "date", "status", "course_id", "course_title",
+    "user_public_id", "student_name", "student_email", "verified_by_public_id",
+]
+EXPORT_BATCH_SIZE = 1000
+EXPORT_JOB = "attendance_export"
+
+
+def _export_rows(stmt, fmt):
+    """Encode rows from a server-side cursor a batch at a time; memory stays flat."""
+    result = db.session.execute(stmt, execution_options={"yield_per": EXPORT_BATCH_SIZE})
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for batch in result.partitions():
+            writer.writerows(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for batch in result.partitions():
+            yield "".join(
+                json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n" for row in batch
+            )
+
+
+def _export_statement(school_id, educator_id=None, course_id=None, date_from=None, date_to=None):
+    stmt = (
+        select(
+            Attendance.id, Attendance.date, Attendance.status, Attendance.course_id, Course.title,
+            Attendance.user_public_id, User.name, User.email, Attendance.verified_by_public_id,
+        )
+        .join(Course, Course.id == Attendance.course_id)
+        .join(User, User.public_id == Attendance.user_public_id)
+        .where(Course.school_id == school_id)
+        .order_by(Attendance.course_id, Attendance.date, Attendance.id)
+    )
+    if educator_id is not None:
+        stmt = stmt.where(Course.educator_id == educator_id)
+    if course_id:
+        stmt = stmt.where(Attendance.course_id == course_id)
+    if date_from:
+        stmt = stmt.where(Attendance.date >= date_from)
+    if date_to:
+        stmt = stmt.where(Attendance.date <= date_to)
+    return stmt
+
+
+def _export_filename(params):
+    return "attendance-{}-{}-{}.{}".format(
+        params["school_id"], params["from"] or "start", params["to"] or "end", params["format"]
+    )
+
+
+def _export_params():
+    """(params, None) from the request's query string, or (None, error response)."""
+    ok, err = require_roles("educator", "manager")
+    if not ok:
+        return None, err
+
+    claims = get_jwt()
+    school_id = claims.get("school_id")
+    if school_id is None:
+        return None, error_response("Missing school claim in token.", status_code=403)
+
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in ("csv", "ndjson"):
+        return None, error_response("format must be csv or ndjson.", status_code=400)
+
+    try:
+        date_from = date.fromisoformat(request.args["from"]) if request.args.get("from") else None
+        date_to = date.fromisoformat(request.args["to"]) if request.args.get("to") else None
+    except ValueError:
+        return None, error_response("from/to must be dates (YYYY-MM-DD).", status_code=400)
+
+    return {
+        "school_id": school_id,
+        # Educators only export their own courses
+        "educator_id": get_current_user().id if claims.get("role") == "educator" else None,
+        "course_id": request.args.get("course_id", type=int),
+        "from": date_from.isoformat() if date_from else None,
+        "to": date_to.isoformat() if date_to else None,
+        "format": fmt,
+    }, None
+
+
+def _statement_for(params):
+    return _export_statement(
+        params["school_id"],
+        educator_id=params["educator_id"],
+        course_id=params["course_id"],
+        date_from=date.fromisoformat(params["from"]) if params["from"] else None,
+        date_to=date.fromisoformat(params["to"]) if params["to"] else None,
+    )
+
+
+@job_handler(EXPORT_JOB)
+def run_attendance_export(params):
+    """Write the export to storage; the job result links to the file."""
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as out:
+        for chunk in _export_rows(_statement_for(params), params["format"]):
+            out.write(chunk.encode("utf-8"))
+        out.seek(0)
+        filename = _export_filename(params)
+        stored = get_storage().save(out, filename)
+    return {"url": stored.url, "filename": filename, "size": stored.size}
+
+
+class AttendanceExportResource(Resource):
+    @jwt_required()
+    def get(self):
+        """
+        GET /attendance/export?format=csv|ndjson&from=2025-01-01&to=2025-03-31&course_id=1
+        Streams every matching record in the caller's school (educators: own courses only).
+        """
+        params, err = _export_params()
+        if err:
+            return err
+
+        return Response(
+            stream_with_context(_export_rows(_statement_for(params), params["format"])),
+            mimetype="text/csv" if params["format"] == "csv" else "application/x-ndjson",
+            headers={
+                "Content-Disposition": f'attachment; filename="{_export_filename(params)}"',
+                "Cache-Control": "no-store",
+                "X-Accel-Buffering": "no",
+            },
+        )
+
+    @jwt_required()
+    def post(self):
+        """
+        POST /attendance/export?format=...&from=...&to=...&course_id=...
+        Same export built by the job worker: 202 with the job, whose result
+        carries a download link once done.
+        """
+        params, err = _export_params()
+        if err:
+            return err
+
+        job = Job.enqueue(EXPORT_JOB, params, requested_by=get_jwt_identity())
+        db.session.commit()
+        return job_accepted(job, "Export queued")
+
+
+class AttendanceBulkResource(Resource):
+    @jwt_required()
+    def post(self):
+        """
+        POST /attendance/bulk
+        Body: {"course_id": 1, "date": "2025-01-31",
+               "records": [{"user_public_id": "uuid", "status": "present"}, ...]}
+        Takes a whole class roll call in one transaction: existing records for
+        the course/date are updated, new ones created. Returns a result per row.
+        """
+        allowed, resp = require_roles("educator", "manager")
+        if not allowed:
+            return resp
+
+        claims = get_jwt()
+        json_data = request.get_json() or {}
+        course_id = json_data.get("course_id")
+        records = json_data.get("records")
+
+        field_errors = {}
+        # bool is a subclass of int, but true/false is not a course id
+        if not isinstance(course_id, int) or isinstance(course_id, bool):
+            field_errors["course_id"] = ["Must be an integer."]
+        try:
+            day = datetime.strptime(str(json_data.get("date")), "%Y-%m-%d").date()
+        except ValueError:
+            field_errors["date"] = ["Must be a date in YYYY-MM-DD format."]
+        if not isinstance(records, list) or not records:
+            field_errors["records"] = ["Must be a non-empty list."]
+        elif len(records) > BULK_ATTENDANCE_MAX_RECORDS:
+            field_errors["records"] = [f"At most {BULK_ATTENDANCE_MAX_RECORDS} records per request."]
+        if field_errors:
+            return error_response("Validation failed.", status_code=400, errors=field_errors)
+
+        course = db.session.get(Course, course_id)
+        if not course:
+            return error_response("Course not found.", status_code=404)
+
+        scope_err = assert_same_school_or_forbidden(claims.get("school_id"), course.school_id)
+        if scope_err:
+            return scope_err
+
+        public_ids = [
+            r.get("user_public_id") for r in records
+            if isinstance(r, dict) and isinstance(r.get("user_public_id"), str) and r.get("user_public_id")
+        ]
+
+        # One query each for enrollment checks and for the rows already recorded that day
+        enrolled = {
+            public_id for (public_id,) in db.session.query(Enrollment.user_public_id).filter(
+                Enrollment.course_id == course.id,
+                Enrollment.user_public_id.in_(public_ids),
+            )
+        }
+        existing = {
+            a.user_public_id: a for a in Attendance.query.options(lazyload(Attendance.user)).filter(
+                Attendance.course_id == course.id,
+                Attendance.date == day,
+                Attendance.user_public_id.in_(public_ids),
+            )
+        }
+
+        results = []
+        seen = set()
+        verifier = claims.get("sub")
+        for index, record in enumerate(records):
+            record = record if isinstance(record, dict) else {}
+            public_id = record.get("user_public_id")
+            status = record.get("status")
+            row = {"index": index, "user_public_id": public_id, "status": status}
+
+            if not public_id:
+                row.update(result="error", error="Missing required field: user_public_id")
+            elif not isinstance(public_id, str):
+                row.update(result="error", error="user_public_id must be a string.")
+            elif status not in ATTENDANCE_STATUSES:
+                row.update(result="error", error=f"Status must be one of {', '.join(ATTENDANCE_STATUSES)}.")
+            elif public_id in seen:
+                row.update(result="error", error="Duplicate user_public_id in request.")
+            elif public_id not in enrolled:
+                row.update(result="error", error="Student is not enrolled in this course.")
+            elif public_id in existing:
+                attendance = existing[public_id]
+                if attendance.status == status:
+                    row.update(result="unchanged", id=attendance.id)
+                else:
+                    attendance.status = status
+                    attendance.verified_by_public_id = verifier
+                    row.update(result="updated", id=attendance.id)
+            else:
+                attendance = Attendance(
+                    user_public_id=public_id,
+                    course_id=course.id,
+                    date=day,
+                    status=status,
+                    verified_by_public_id=verifier,
+                )
+                db.session.add(attendance)
+                existing[public_id] = attendance
+                row.update(result="created")
+
+            if public_id and isinstance(public_id, str):
+                seen.add(public_id)
+            results.append(row)
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            current_app.logger.warning(
+                f"Concurrent roll call conflict: course_id={course.id}, date={day}"
+            )
+            return error_response(
+                "Attendance for this course and date changed during the request; please retry.",
+                status_code=409,
+            )
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"DB error on POST /attendance/bulk: {str(e)}")
+            return error_response("Error saving attendance records.", status_code=500, errors=str(e))
+
+        summary = {"created": 0, "updated": 0, "unchanged": 0, "error": 0}
+        for row in results:
+            if row["result"] == "created":
+                row["id"] = existing[row["user_public_id"]].id
+            summary[row["result"]] += 1
+
+        return success_response(
+            "Roll call saved.",
+            {"course_id": course.id, "date": day.isoformat(), "summary": summary, "results": results},
+        )
+
+
 class AttendanceResource(Resource):
     @jwt_required(optional=True)
     def get(self, attendance_id):
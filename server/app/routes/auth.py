@@ -11,6 +11,7 @@ from app.schemas.auth import (RegisterSchema, ResetPasswordRequestSchema,
     ResetPasswordConfirmSchema, LoginSchema)
 from app.schemas.user import UserSchema
 from app.utils.responses import success_response, error_response
+from app.utils.revocation import get_revocation_store
 
 # Initialize schemas
 register_schema = RegisterSchema()
@@ -19,9 +20,6 @@ login_schema = LoginSchema()
 reset_password_request_schema = ResetPasswordRequestSchema()
 reset_password_confirm_schema = ResetPasswordConfirmSchema()
 
-# JWT blocklist - in production, use Redis or database
-jwt_blocklist = set()
-
 
 class RegisterResource(Resource):
     def post(self):
@@ -78,44 +76,6 @@ class LoginResource(Resource):
             access_token = create_access_token(identity=user.public_id, additional_claims=claims)
             refresh_token = create_refresh_token(identity=user.public_id, additional_claims=claims)
 
-            # Build courses list depending on role
-            user_courses = []
-
-            if user.role == "educator":
-                # Educator → their courses
-                for course in user.courses:
-                    course_data = {
-                        "id": course.id,
-                        "title": course.title,
-                        "description": course.description,
-                        "resources": [
-                            {
-                                "id": res.id,
-                                "title": res.title,
-                                "url": res.url
-                            } for res in getattr(course, "resources", [])
-                        ]
-                    }
-                    user_courses.append(course_data)
-
-            elif user.role == "student":
-                # Student → courses via enrollments
-                for enrollment in user.enrollments:
-                    course = enrollment.course
-                    course_data = {
-                        "id": course.id,
-                        "title": course.title,
-                        "description": course.description,
-                        "resources": [
-                            {
-                                "id": res.id,
-                                "title": res.title,
-                                "url": res.url
-                            } for res in getattr(course, "resources", [])
-                        ]
-                    }
-                    user_courses.append(course_data)
-
             # Still expose UUID (public_id) to the frontend
             token_data = {
                 "access_token": access_token,
@@ -125,8 +85,7 @@ class LoginResource(Resource):
                     "email": user.email,
                     "role": user.role,
                     "name": user.name,
-                    "school_id": user.school_id,
-                    "courses": user_courses
+                    "school_id": user.school_id
                 }
             }
 
@@ -139,8 +98,7 @@ class LogoutResource(Resource):
     @jwt_required()
     def post(self):
         try:
-            jti = get_jwt().get("jti")
-            jwt_blocklist.add(jti)
+            get_revocation_store().revoke_payload(get_jwt())
             return success_response("Logout successful")
         except Exception as e:
             return error_response("Something went wrong during logout", {"error": str(e)}, status_code=500)
@@ -2,12 +2,29 @@ from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload, selectinload
 from marshmallow import ValidationError
 
-from app.models import Course
+from app.models import Course, Resource as ResourceModel
 from app.extensions import db, paginate
 from app.schemas.course import CourseSchema  # use class, not instance
 from app.utils.responses import success_response, error_response
+from app.utils.conditional import cache_headers, detail_validator, not_modified
+from app.utils.signing import signing_window
+
+# Everything CourseSchema dumps, loaded per page instead of per course
+COURSE_DUMP_OPTIONS = (
+    joinedload(Course.educator),
+    joinedload(Course.school),
+    selectinload(Course.resources).joinedload(ResourceModel.uploader),
+)
+# ...and the relations those rows come from, for the conditional-GET validator
+COURSE_DUMP_RELATED = (
+    Course.educator,
+    Course.school,
+    Course.resources,
+    (Course.resources, ResourceModel.uploader),
+)
 
 
 def require_roles(*roles):
@@ -41,9 +58,11 @@ class CourseListResource(Resource):
                 (Course.description.ilike(term))
             )
 
-        query = query.order_by(Course.created_at.desc())
+        query = query.options(*COURSE_DUMP_OPTIONS).order_by(Course.created_at.desc())
         schema = CourseSchema(many=True)
-        return paginate(query, schema)
+        # Embedded resources carry signed URLs, so the signing window is part of the ETag
+        return paginate(query, schema, cursor_column=Course.created_at, related=COURSE_DUMP_RELATED,
+                        etag_parts=(signing_window(),))
 
     @jwt_required()
     def post(self):
@@ -92,8 +111,16 @@ class CourseResource(Resource):
         course = db.session.get(Course, course_id)
         if not course:
             return error_response("Course not found.", 404)
+        etag, last_modified = detail_validator(course, signing_window(), related=COURSE_DUMP_RELATED)
+        # A deleted resource leaves last_modified unchanged, so only the ETag counts
+        cached = not_modified(etag, last_modified, honor_if_modified_since=False)
+        if cached:
+            return cached
         schema = CourseSchema()
-        return success_response("Course retrieved successfully.", schema.dump(course))
+        return success_response(
+            "Course retrieved successfully.", schema.dump(course),
+            headers=cache_headers(etag, last_modified)
+        )
 
     @jwt_required()
     def put(self, course_id):
@@ -1,7 +1,7 @@
 # app/resources/enrollments.py
 from flask import request, jsonify
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, get_current_user
 from datetime import datetime
 
 from app.models import db
@@ -54,8 +54,7 @@ class EnrollmentListResource(Resource):
 
         if role == "educator":
             # Educators can see enrollments for their courses
-            educator_public_id = get_jwt_identity()
-            educator = User.query.filter_by(public_id=educator_public_id).first()
+            educator = get_current_user()
             if not educator:
                 return error_response("Educator not found", 404)
             
@@ -85,8 +84,7 @@ class EnrollmentListResource(Resource):
 
         if role == "manager":
             # Scope to schools owned by this manager OR the manager's assigned school
-            manager_public_id = get_jwt_identity()
-            manager = User.query.filter_by(public_id=manager_public_id).first()
+            manager = get_current_user()
             if not manager:
                 return error_response("Manager not found", 404)
 
@@ -121,8 +119,7 @@ class EnrollmentListResource(Resource):
 
         if role == "educator":
             # Educators can see enrollments for their assigned courses
-            educator_public_id = get_jwt_identity()
-            educator = User.query.filter_by(public_id=educator_public_id).first()
+            educator = get_current_user()
             if not educator:
                 return error_response("Educator not found", 404)
             
@@ -199,8 +196,7 @@ class EnrollmentListResource(Resource):
         # Enforce school scope for managers
         if role == "manager":
             # Verify manager is scoped to the course's school (owner or assigned)
-            manager_public_id = get_jwt_identity()
-            manager = User.query.filter_by(public_id=manager_public_id).first()
+            manager = get_current_user()
             if not manager:
                 return error_response("Manager not found", 404)
             from app.models.school import School
@@ -250,8 +246,7 @@ class EnrollmentResource(Resource):
 
         if role == "manager":
             # Verify manager is scoped to the course's school (owner or assigned)
-            manager_public_id = get_jwt_identity()
-            manager = User.query.filter_by(public_id=manager_public_id).first()
+            manager = get_current_user()
             if not manager:
                 return error_response("Manager not found", 404)
             from app.models.school import School
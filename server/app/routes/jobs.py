@@ -0,0 +1,27 @@
+# app/routes/jobs.py
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.extensions import db
+from app.models.job import Job
+from app.schemas.job import job_schema
+from app.utils.responses import success_response, error_response
+
+
+class JobResource(Resource):
+    @jwt_required()
+    def get(self, job_id):
+        """
+        GET /jobs/<id>
+        Status of a background job started by the caller.
+        """
+        job = db.session.get(Job, job_id)
+        # Other users' jobs are reported as missing rather than forbidden
+        if job is None or job.requested_by_public_id != get_jwt_identity():
+            return error_response("Job not found", status_code=404)
+
+        headers = {"Cache-Control": "no-store"}
+        if job.status in ("queued", "running"):
+            # Hint for pollers
+            headers["Retry-After"] = "2"
+        return success_response("Fetched job", job_schema.dump(job), headers=headers)
@@ -1,13 +1,16 @@
 from flask import request, current_app
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt, get_current_user
 from sqlalchemy.exc import SQLAlchemyError
-from datetime import datetime
+from datetime import datetime, timezone
 
-from app.models import Message, Course, Enrollment, User
+from app.models import Message, Course, Enrollment
 from app.extensions import db, paginate
 from app.schemas.message import message_schema, messages_schema
 from app.utils.responses import success_response, error_response
+from app.utils.conditional import cache_headers, detail_validator, list_validator, make_etag, not_modified
+from app.utils.threads import build_threads, load_threads, thread_limits
+from app.utils.notifications import enqueue_course_notification
 from app.routes.attendance import assert_same_school_or_forbidden
 
 
@@ -28,8 +31,51 @@ class MessageListResource(Resource):
         if user_public_id:
             query = query.filter_by(user_public_id=user_public_id)
 
+        if request.args.get("threaded", "false").lower() == "true":
+            if not course_id:
+                return error_response("threaded=true requires course_id.", status_code=400)
+            return self._threaded(query)
+
         query = query.order_by(Message.timestamp.desc())
-        return paginate(query, messages_schema, resource_name="messages")
+        return paginate(query, messages_schema, resource_name="messages", cursor_column=Message.timestamp)
+
+    @staticmethod
+    def _threaded(query):
+        """
+        Page over top-level messages (newest first), each with its replies
+        nested under it, all loaded with one recursive query.
+        """
+        page = max(request.args.get("page", 1, type=int), 1)
+        per_page = min(max(request.args.get("per_page", 10, type=int), 1), 50)
+        max_depth, max_nodes = thread_limits(
+            request.args.get("max_depth", type=int), request.args.get("max_nodes", type=int)
+        )
+
+        # Replies change the page too, so validate on every message in the listing
+        total_messages, last_modified = list_validator(query)
+        etag = make_etag("threads", total_messages, last_modified)
+        cached = not_modified(etag, last_modified, honor_if_modified_since=False)
+        if cached:
+            return cached
+
+        roots = query.filter(Message.parent_id.is_(None)).order_by(Message.timestamp.desc(), Message.id.desc())
+        total = roots.order_by(None).count()
+        root_ids = [
+            row.id for row in roots.with_entities(Message.id).offset((page - 1) * per_page).limit(per_page)
+        ]
+        rows, truncated = load_threads(root_ids, max_depth, max_nodes)
+
+        return success_response("Fetched message threads.", {
+            "messages": build_threads(rows, message_schema, root_ids),
+            "meta": {
+                "total": total,
+                "page": page,
+                "pages": (total + per_page - 1) // per_page,
+                "per_page": per_page,
+                "max_depth": max_depth,
+                "truncated": truncated,
+            },
+        }, headers=cache_headers(etag, last_modified))
 
     @jwt_required()
     def post(self):
@@ -40,9 +86,8 @@ class MessageListResource(Resource):
         """
         claims = get_jwt()
         role = claims.get("role")
-        current_public_id = claims.get("sub")
 
-        user = User.query.filter_by(public_id=current_public_id).first()
+        user = get_current_user()
         if not user:
             return error_response("User not found.", 404)
 
@@ -90,13 +135,30 @@ class MessageListResource(Resource):
             db.session.add(new_message)
             db.session.commit()
             db.session.refresh(new_message)
-
-            return success_response("Message created successfully.", message_schema.dump(new_message), 201)
+            payload = message_schema.dump(new_message)
         except SQLAlchemyError as e:
             db.session.rollback()
             current_app.logger.error(f"DB error on POST /messages: {str(e)}")
             return error_response("Error creating message.", 500, errors=str(e))
 
+        try:
+            # Fanned out by the job worker, not in this request
+            enqueue_course_notification(
+                course,
+                f"New message in {course.title}",
+                message=f"{user.name}: {content[:140]}",
+                link={"student": "/student/messages", "educator": "/educator/messages"},
+                exclude=[user.public_id],
+                requested_by=user.public_id,
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            # The message is saved; a failed enqueue shouldn't fail the request
+            db.session.rollback()
+            current_app.logger.error(f"Could not queue notifications for message {new_message.id}: {str(e)}")
+
+        return success_response("Message created successfully.", payload, 201)
+
 
 class MessageResource(Resource):
     @jwt_required(optional=True)
@@ -105,7 +167,14 @@ class MessageResource(Resource):
         message = Message.query.get(message_id)
         if not message:
             return error_response("Message not found.", 404)
-        return success_response("Fetched message.", message_schema.dump(message))
+        etag, last_modified = detail_validator(message)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        return success_response(
+            "Fetched message.", message_schema.dump(message),
+            headers=cache_headers(etag, last_modified)
+        )
 
     @jwt_required()
     def put(self, message_id):
@@ -196,3 +265,32 @@ class MessageResource(Resource):
             db.session.rollback()
             current_app.logger.error(f"DB error on DELETE /messages/{message_id}: {str(e)}")
             return error_response("Error deleting message.", 500, errors=str(e))
+
+
+class MessageThreadResource(Resource):
+    @jwt_required(optional=True)
+    def get(self, message_id):
+        """GET /messages/<id>/thread?max_depth=&max_nodes= — the message and its nested replies"""
+        max_depth, max_nodes = thread_limits(
+            request.args.get("max_depth", type=int), request.args.get("max_nodes", type=int)
+        )
+        rows, truncated = load_threads([message_id], max_depth, max_nodes)
+        if not rows:
+            return error_response("Message not found.", status_code=404)
+
+        # Any edited or new reply moves the validator
+        stamps = sorted((message.id, message.updated_at) for message, _ in rows)
+        last_modified = max((stamp for _, stamp in stamps if stamp), default=None)
+        if last_modified is not None and last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        etag = make_etag("thread", max_depth, max_nodes, stamps)
+        cached = not_modified(etag, last_modified, honor_if_modified_since=False)
+        if cached:
+            return cached
+
+        return success_response("Fetched message thread.", {
+            "thread": build_threads(rows, message_schema, [message_id])[0],
+            "count": len(rows),
+            "max_depth": max_depth,
+            "truncated": truncated,
+        }, headers=cache_headers(etag, last_modified))
@@ -1,12 +1,32 @@
 # app/routes/notifications.py
-from flask import request
+import json
+import time
+
+from flask import Response, current_app, request, stream_with_context
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, verify_jwt_in_request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import func
 
 from app.models import db
-from app.models.user import User
 from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
 from app.utils.responses import success_response, error_response
+from app.utils.conditional import cache_headers, list_validator, make_etag, not_modified
+from app.utils.pubsub import get_notification_hub, publish_notification_changes
+from app.utils.revocation import get_revocation_store
+
+
+def serialize_notification(n):
+    return {
+        "id": n.id,
+        "title": n.title,
+        "message": n.message,
+        "type": n.type,
+        "is_read": n.is_read,
+        "link": n.link,
+        "created_at": n.created_at.isoformat() if n.created_at else None
+    }
 
 
 class NotificationListResource(Resource):
@@ -21,6 +41,13 @@ class NotificationListResource(Resource):
         
         # Build query
         query = Notification.query.filter_by(user_public_id=current_user_public_id)
+
+        # Any new, deleted or re-read notification changes the validator
+        total, last_modified = list_validator(query)
+        etag = make_etag(total, last_modified)
+        cached = not_modified(etag, last_modified, honor_if_modified_since=False)
+        if cached:
+            return cached
         
         if unread_only:
             query = query.filter_by(is_read=False)
@@ -29,25 +56,22 @@ class NotificationListResource(Resource):
         notifications = query.order_by(Notification.created_at.desc()).limit(limit).all()
         
         # Serialize
-        result = [{
-            "id": n.id,
-            "title": n.title,
-            "message": n.message,
-            "type": n.type,
-            "is_read": n.is_read,
-            "link": n.link,
-            "created_at": n.created_at.isoformat() if n.created_at else None
-        } for n in notifications]
-        
-        # Count unread
-        unread_count = Notification.query.filter_by(
-            user_public_id=current_user_public_id, 
-            is_read=False
-        ).count()
+        result = [serialize_notification(n) for n in notifications]
+        
+        unread_count = NotificationCounter.unread_for(current_user_public_id)
         
         return success_response("Notifications retrieved successfully", {
             "notifications": result,
             "unread_count": unread_count
+        }, headers=cache_headers(etag, last_modified))
+
+
+class NotificationUnreadCountResource(Resource):
+    @jwt_required()
+    def get(self):
+        """Unread notification count for the current user (from the counter table)"""
+        return success_response("Unread count retrieved successfully", {
+            "unread_count": NotificationCounter.unread_for(get_jwt_identity())
         })
 
 
@@ -95,11 +119,169 @@ class NotificationMarkAllReadResource(Resource):
         """Mark all notifications as read"""
         current_user_public_id = get_jwt_identity()
         
-        Notification.query.filter_by(
+        marked = Notification.query.filter_by(
             user_public_id=current_user_public_id,
             is_read=False
-        ).update({"is_read": True})
+        ).update({"is_read": True}, synchronize_session=False)
+        # Bulk update skips the ORM events that maintain the counter. Subtract
+        # what was marked rather than zeroing: a fan-out committing in between
+        # has already added its +1 for a notification this update didn't see.
+        NotificationCounter.increment([current_user_public_id], delta=-marked)
         
         db.session.commit()
+        publish_notification_changes([current_user_public_id])
         
         return success_response("All notifications marked as read")
+
+
+def _sse(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _event_stream(user_public_id, subscription, last_id, deadline, sent=()):
+    """
+    Push new notifications (oldest first) and unread-count changes until
+    `deadline`; the client reconnects with Last-Event-ID to pick up from there.
+
+    Ids are assigned at insert, not at commit: a fan-out chunk can commit a
+    lower id after a higher one was pushed. So every pass re-reads the last
+    NOTIFICATION_STREAM_ID_OVERLAP ids and skips the ones already sent. After
+    a reconnect that window is sent again; clients drop ids they have seen.
+    """
+    hub = get_notification_hub()
+    heartbeat = current_app.config["NOTIFICATION_STREAM_HEARTBEAT_SECONDS"]
+    overlap = current_app.config["NOTIFICATION_STREAM_ID_OVERLAP"]
+    batch_size = 50
+    unread_count = None
+    sent = set(sent)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            floor = max(last_id - overlap, 0)
+            sent = {notification_id for notification_id in sent if notification_id > floor}
+            query = Notification.query.filter(
+                Notification.user_public_id == user_public_id, Notification.id > floor
+            )
+            if sent:
+                query = query.filter(Notification.id.notin_(sent))
+            notifications = query.order_by(Notification.id).limit(batch_size).all()
+            for n in notifications:
+                sent.add(n.id)
+                # The event id is the high-water mark to resume from
+                last_id = max(last_id, n.id)
+                yield _sse("notification", serialize_notification(n), event_id=last_id)
+
+            count = NotificationCounter.unread_for(user_public_id)
+            if count != unread_count:
+                unread_count = count
+                yield _sse("unread_count", {"unread_count": count}, event_id=last_id)
+
+            # End the read transaction so no pooled connection is held while idle
+            db.session.commit()
+
+            if len(notifications) == batch_size:
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            # A timeout still resyncs, which also catches deletes from other workers
+            if not subscription.wait(min(heartbeat, remaining)):
+                yield ": keepalive\n\n"
+    finally:
+        hub.unsubscribe(subscription)
+
+
+def _ticket_serializer():
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt="notification-stream")
+
+
+def _stream_identity():
+    """
+    (user public_id, session expiry) for a stream request: from a ?ticket=
+    minted by NotificationStreamTicketResource, or from the Authorization
+    header. None if neither is valid.
+    """
+    ticket = request.args.get("ticket")
+    if ticket is None:
+        verify_jwt_in_request(locations=["headers"])
+        return get_jwt_identity(), get_jwt()["exp"]
+    try:
+        claims = _ticket_serializer().loads(
+            ticket, max_age=current_app.config["NOTIFICATION_STREAM_TICKET_SECONDS"]
+        )
+    except BadSignature:
+        return None
+    # Logging out revokes the token the ticket was minted from
+    if get_revocation_store().is_revoked(claims["jti"]):
+        return None
+    return claims["sub"], claims["exp"]
+
+
+class NotificationStreamTicketResource(Resource):
+    @jwt_required()
+    def post(self):
+        """
+        Short-lived ticket for opening the notification stream. EventSource
+        can't send headers, and a ticket in the URL (and so in access logs)
+        is only good for the stream, and only for a few seconds.
+        """
+        jwt_data = get_jwt()
+        ticket = _ticket_serializer().dumps(
+            {"sub": get_jwt_identity(), "exp": jwt_data["exp"], "jti": jwt_data["jti"]}
+        )
+        return success_response("Stream ticket issued", {
+            "ticket": ticket,
+            "expires_in": current_app.config["NOTIFICATION_STREAM_TICKET_SECONDS"],
+        })
+
+
+class NotificationStreamResource(Resource):
+    def get(self):
+        """Server-Sent Events stream of the current user's notifications"""
+        identity = _stream_identity()
+        if identity is None:
+            return error_response("Invalid or expired stream ticket", status_code=401)
+        current_user_public_id, session_exp = identity
+
+        last_id = request.headers.get("Last-Event-ID", type=int)
+        if last_id is None:
+            last_id = request.args.get("last_event_id", type=int)
+        sent = ()
+        if last_id is None:
+            # Fresh connection: only push what arrives from now on
+            last_id = db.session.query(func.max(Notification.id)).filter(
+                Notification.user_public_id == current_user_public_id
+            ).scalar() or 0
+            floor = max(last_id - current_app.config["NOTIFICATION_STREAM_ID_OVERLAP"], 0)
+            sent = [notification_id for (notification_id,) in db.session.query(Notification.id).filter(
+                Notification.user_public_id == current_user_public_id, Notification.id > floor
+            )]
+
+        # End the stream before the token expires; the client reconnects with a fresh one
+        max_seconds = current_app.config["NOTIFICATION_STREAM_MAX_SECONDS"]
+        lifetime = min(max_seconds, max(session_exp - time.time(), 0))
+        deadline = time.monotonic() + lifetime
+
+        subscription = get_notification_hub().subscribe(current_user_public_id)
+        if subscription is None:
+            # This worker is at NOTIFICATION_STREAM_MAX_PER_WORKER. EventSource only
+            # reads 200 responses, so say so in an event: the client polls
+            # /notifications/unread-count and tries the stream again later.
+            retry_after = current_app.config["NOTIFICATION_STREAM_BUSY_RETRY_SECONDS"]
+            busy = _sse("busy", {
+                "retry_after": retry_after,
+                "unread_count": NotificationCounter.unread_for(current_user_public_id),
+            })
+            return Response(
+                busy, mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "Retry-After": str(retry_after)},
+            )
+        return Response(
+            stream_with_context(_event_stream(current_user_public_id, subscription, last_id, deadline, sent)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
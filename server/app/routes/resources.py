@@ -1,14 +1,19 @@
-from flask import request
+from flask import current_app, request
 from flask_restful import Resource as ApiResource
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, get_current_user
 from app.extensions import db, paginate
 from functools import wraps
-from werkzeug.utils import secure_filename  # For file uploads (if supported)
-import os
+from sqlalchemy import false, or_, select
+from sqlalchemy.exc import SQLAlchemyError
 
-from app.models import Resource, Course, Enrollment
+from app.models import Resource, Course, Enrollment, School
 from app.schemas.resources import resource_schema, resources_schema
 from app.utils.responses import success_response, error_response
+from app.utils.conditional import cache_headers, detail_validator, not_modified
+from app.utils.notifications import enqueue_course_notification
+from app.utils.previews import schedule_preview
+from app.utils.signing import signing_window, strip_upload_signature
+from app.utils.storage import get_storage
 
 
 def role_required(*roles):
@@ -30,12 +35,36 @@ def role_required(*roles):
     return decorator
 
 
+def readable_resources(query):
+    """
+    Restrict a Resource query to what the caller may read, since every
+    resource response carries signed download links: managers get their
+    school's courses (and schools they own), educators their own courses,
+    students the courses they are enrolled in.
+    """
+    user = get_current_user()
+    role = get_jwt().get("role")
+    if role == "student":
+        courses = select(Enrollment.course_id).where(Enrollment.user_public_id == user.public_id)
+    elif role == "educator":
+        courses = select(Course.id).where(Course.educator_id == user.id)
+    elif role == "manager":
+        owned = select(School.id).where(School.owner_id == user.id)
+        courses = select(Course.id).where(or_(Course.school_id == user.school_id, Course.school_id.in_(owned)))
+    else:
+        return query.filter(false())
+    return query.filter(Resource.course_id.in_(courses))
+
+
 class ResourceListApi(ApiResource):
     @jwt_required()
     def get(self):
-        """List all resources with pagination"""
-        query = Resource.query.order_by(Resource.created_at.desc())
-        return paginate(query, resources_schema, resource_name="resources")
+        """List the resources of the caller's courses with pagination"""
+        query = readable_resources(Resource.query).order_by(Resource.created_at.desc())
+        return paginate(
+            query, resources_schema, resource_name="resources", cursor_column=Resource.created_at,
+            etag_parts=(signing_window(),)
+        )
 
     @jwt_required()
     @role_required("educator", "manager")
@@ -59,22 +88,17 @@ class ResourceListApi(ApiResource):
         if not url and not file:
             return error_response("Provide either a URL or a file", 400)
 
-        if file:
-            # Sanitize filename before saving
-            filename = secure_filename(file.filename)
-            # Ensure uploads directory exists
-            upload_dir = os.path.join(os.getcwd(), "uploads")
-            os.makedirs(upload_dir, exist_ok=True)
-            file_path = os.path.join(upload_dir, filename)
-            file.save(file_path)
-            # Public URL path (adjust if serving static differently)
-            url = f"/uploads/{filename}"
-
         # Validate course existence
         course = db.session.get(Course, course_id)
         if not course:
             return error_response("Invalid course_id", status_code=404)
 
+        stored = None
+        if file:
+            # Streamed to storage in chunks and stored under its SHA-256
+            stored = get_storage().save(file.stream, file.filename, content_type=file.mimetype)
+            url = stored.url
+
         user_public_id = get_jwt_identity()
         resource = Resource(
             title=title,
@@ -82,21 +106,49 @@ class ResourceListApi(ApiResource):
             type=type_,
             course_id=course_id,
             uploaded_by_public_id=user_public_id,
+            sha256=stored.sha256 if stored else None,
+            size=stored.size if stored else None,
+            mime_type=stored.mime_type if stored else None,
         )
         db.session.add(resource)
         db.session.commit()
 
+        try:
+            # Thumbnails/excerpts and notification fan-out run in the job worker
+            if stored:
+                schedule_preview(resource)
+            enqueue_course_notification(
+                course,
+                f"New resource in {course.title}",
+                message=title,
+                link={"student": "/student/resources", "educator": "/educator/resources"},
+                exclude=[user_public_id],
+                requested_by=user_public_id,
+            )
+            db.session.commit()
+        except SQLAlchemyError as e:
+            # The resource is saved; a failed enqueue shouldn't fail the request
+            db.session.rollback()
+            current_app.logger.error(f"Could not queue jobs for resource {resource.id}: {str(e)}")
+
         return success_response("Resource created successfully", resource_schema.dump(resource), 201)
 
 
 class ResourceDetailApi(ApiResource):
     @jwt_required()
     def get(self, resource_id):
-        """Get a single resource"""
-        resource = db.session.get(Resource, resource_id)
+        """Get a single resource from one of the caller's courses"""
+        resource = readable_resources(Resource.query.filter_by(id=resource_id)).first()
         if not resource:
             return error_response("Resource not found", status_code=404)
-        return success_response("Fetched resource", resource_schema.dump(resource))
+        etag, last_modified = detail_validator(resource, signing_window())
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+        return success_response(
+            "Fetched resource", resource_schema.dump(resource),
+            headers=cache_headers(etag, last_modified)
+        )
 
     @jwt_required()
     @role_required("educator", "manager")
@@ -111,7 +163,7 @@ class ResourceDetailApi(ApiResource):
             return error_response("No data provided", 400)
 
         resource.title = data.get("title", resource.title)
-        resource.url = data.get("url", resource.url)
+        resource.url = strip_upload_signature(data.get("url", resource.url))
         resource.type = data.get("type", resource.type)
 
         db.session.commit()
@@ -142,15 +194,17 @@ class CourseResourcesApi(ApiResource):
         if role in ["educator", "manager", "admin"]:
             # Educators can access their own courses
             if role == "educator":
-                from app.models.user import User
-                user = User.query.filter_by(public_id=user_public_id).first()
+                user = get_current_user()
                 course = db.session.get(Course, course_id)
                 if course and course.educator_id != user.id:
                     return error_response("You are not the educator of this course", 403)
             
             # Paginated query
             query = Resource.query.filter_by(course_id=course_id).order_by(Resource.created_at.desc())
-            return paginate(query, resources_schema, resource_name="resources")
+            return paginate(
+                query, resources_schema, resource_name="resources", cursor_column=Resource.created_at,
+                etag_parts=(signing_window(),)
+            )
 
         # Students need to be enrolled
         enrollment = Enrollment.query.filter_by(
@@ -162,7 +216,10 @@ class CourseResourcesApi(ApiResource):
 
         # Paginated query
         query = Resource.query.filter_by(course_id=course_id).order_by(Resource.created_at.desc())
-        return paginate(query, resources_schema, resource_name="resources")
+        return paginate(
+            query, resources_schema, resource_name="resources", cursor_column=Resource.created_at,
+            etag_parts=(signing_window(),)
+        )
 
 
 class StudentResourcesApi(ApiResource):
@@ -179,4 +236,7 @@ class StudentResourcesApi(ApiResource):
 
         # Paginated query
         query = Resource.query.filter(Resource.course_id.in_(course_ids)).order_by(Resource.created_at.desc())
-        return paginate(query, resources_schema, resource_name="resources")
+        return paginate(
+            query, resources_schema, resource_name="resources", cursor_column=Resource.created_at,
+            etag_parts=(signing_window(),)
+        )
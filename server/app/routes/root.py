@@ -1,6 +1,13 @@
-from flask import Blueprint, jsonify, send_from_directory
+from flask import Blueprint, abort, current_app, jsonify, redirect, request, send_from_directory
 from flask_restful import Resource
+from werkzeug.security import safe_join
+import mimetypes
 import os
+import re
+
+from app.utils.responses import error_response
+from app.utils.signing import verify_upload_signature
+from app.utils.storage import get_storage, is_compressible
 
 # Create a blueprint for root routes (without /api prefix)
 root_bp = Blueprint("root", __name__)
@@ -45,14 +52,97 @@ class FaviconResource(Resource):
         from flask import Response
         return Response('', status=204, mimetype='image/x-icon')
 
+# Content-addressed uploads: <sha256[:2]>/<sha256><ext> (see app.utils.storage),
+# and previews derived from them: <sha256[:2]>/<sha256>.thumb.png etc.
+CONTENT_KEY = re.compile(r"^[0-9a-f]{2}/([0-9a-f]{64}(?:\.(?:thumb|excerpt))?)(\.[a-z0-9]+)?$")
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Preferred first
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _precompressed_variant(upload_dir, filename):
+    """(filename, encoding) of the best compressed sibling the client accepts."""
+    for encoding, suffix in PRECOMPRESSED:
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(upload_dir, filename + suffix)):
+            return filename + suffix, encoding
+    return filename, None
+
+
+def _accel_redirect(upload_dir, filename, mimetype, etag):
+    """Empty response telling nginx to send the file from its internal location."""
+    path = safe_join(upload_dir, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    response = current_app.response_class(mimetype=mimetype)
+    response.headers["X-Accel-Redirect"] = f"{current_app.config['UPLOAD_ACCEL_REDIRECT'].rstrip('/')}/{filename}"
+    response.set_etag(etag)
+    # nginx handles Range itself; only answer If-None-Match here
+    return response.make_conditional(request)
+
+
 # Route to serve uploaded files
 @root_bp.route('/uploads/<path:filename>')
 def serve_upload(filename):
     """
-    Serve uploaded files from the uploads directory
+    Serve uploaded files from the uploads directory.
+
+    Content-addressed files never change, so they get a strong ETag (their
+    hash) and an immutable year-long Cache-Control. Range requests get 206
+    partial content. Text documents are served from a precompressed .br/.gz
+    sibling when the client accepts it. With UPLOAD_ACCEL_REDIRECT (nginx)
+    or USE_X_SENDFILE (Apache, lighttpd) the web server sends the bytes.
+
+    Links must carry a valid signature from app.utils.signing (checked
+    without touching the database) unless UPLOAD_REQUIRE_SIGNED_URLS is off.
+    With S3 storage, a valid link redirects to a freshly presigned URL.
     """
-    upload_dir = os.path.join(os.getcwd(), "uploads")
-    return send_from_directory(upload_dir, filename)
+    require_signature = current_app.config.get("UPLOAD_REQUIRE_SIGNED_URLS", True)
+    if require_signature and not verify_upload_signature(
+        filename, request.args.get("expires"), request.args.get("signature")
+    ):
+        return error_response("Invalid or expired download link", status_code=403)
+
+    target = get_storage().download_url(filename)
+    if target:
+        response = redirect(target, code=302)
+        # The presigned URL expires; never cache the redirect
+        response.cache_control.no_store = True
+        return response
+
+    upload_dir = current_app.config["UPLOAD_FOLDER"]
+    match = CONTENT_KEY.match(filename)
+    if not match:
+        # Older uploads stored by their original name may be replaced; keep the defaults
+        return send_from_directory(upload_dir, filename)
+
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    compressible = is_compressible(mimetype)
+    served, encoding = filename, None
+    if compressible:
+        served, encoding = _precompressed_variant(upload_dir, filename)
+    # Each encoding is a different representation with its own validator
+    etag = f"{match.group(1)}-{encoding}" if encoding else match.group(1)
+
+    if current_app.config.get("UPLOAD_ACCEL_REDIRECT"):
+        response = _accel_redirect(upload_dir, served, mimetype, etag)
+    else:
+        response = send_from_directory(
+            upload_dir, served, mimetype=mimetype, etag=etag, max_age=IMMUTABLE_MAX_AGE, conditional=True
+        )
+
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if compressible:
+        response.vary.add("Accept-Encoding")
+    # Signed links must not outlive their expiry in shared caches
+    if require_signature:
+        response.cache_control.public = False
+        response.cache_control.private = True
+    else:
+        response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
 
 # Add resources to the blueprint
 from flask_restful import Api
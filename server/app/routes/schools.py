@@ -1,18 +1,24 @@
 from flask import request
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, get_current_user
 from marshmallow import ValidationError
+from sqlalchemy import case, func
 from datetime import datetime, timedelta
 
 from app.models.school import School
 from app.models.user import User, ROLES
 from app.models.base import db
 from app.models.course import Course
-from app.models.attendance import Attendance
+from app.models.attendance_summary import AttendanceDailySummary
 
 from app.schemas.schools import SchoolSchema
 from app.schemas.user import UserSchema
+from app.schemas.course import courses_schema
+from app.extensions import paginate
+from app.routes.courses import COURSE_DUMP_OPTIONS, COURSE_DUMP_RELATED
 from app.utils.responses import success_response, error_response
+from app.utils.search import matching_ids
+from app.utils.signing import signing_window
 
 school_schema = SchoolSchema()
 user_schema = UserSchema()
@@ -29,9 +35,8 @@ class SchoolResource(Resource):
     def get(self, school_id=None):
         """Get a school by ID or current user's school"""
         try:
-            current_user_public_id = get_jwt_identity()
             current_user_claims = get_jwt()
-            user = User.query.filter_by(public_id=current_user_public_id).first()
+            user = get_current_user()
             if not user:
                 return error_response("User not found", status_code=404)
 
@@ -71,9 +76,8 @@ class SchoolResource(Resource):
     def put(self, school_id):
         """Update a school (managers only)"""
         try:
-            current_user_public_id = get_jwt_identity()
             current_user_claims = get_jwt()
-            user = User.query.filter_by(public_id=current_user_public_id).first()
+            user = get_current_user()
             if not user:
                 return error_response("User not found", status_code=404)
 
@@ -106,9 +110,8 @@ class SchoolResource(Resource):
     def delete(self, school_id):
         """Delete a school (managers only)"""
         try:
-            current_user_public_id = get_jwt_identity()
             current_user_claims = get_jwt()
-            user = User.query.filter_by(public_id=current_user_public_id).first()
+            user = get_current_user()
             if not user:
                 return error_response("User not found", status_code=404)
 
@@ -134,9 +137,8 @@ class SchoolListResource(Resource):
     def get(self):
         """Get list of schools (managers: all owned, users: their school)"""
         try:
-            current_user_public_id = get_jwt_identity()
             current_user_claims = get_jwt()
-            user = User.query.filter_by(public_id=current_user_public_id).first()
+            user = get_current_user()
             if not user:
                 return error_response("User not found", status_code=404)
 
@@ -157,9 +159,8 @@ class SchoolListResource(Resource):
     def post(self):
         """Create a new school (managers only)"""
         try:
-            current_user_public_id = get_jwt_identity()
             current_user_claims = get_jwt()
-            user = User.query.filter_by(public_id=current_user_public_id).first()
+            user = get_current_user()
             if not user:
                 return error_response("User not found", status_code=404)
 
@@ -196,8 +197,7 @@ class SchoolStatsResource(Resource):
         """Get school statistics (attendance + course-based performance)"""
         try:
             current_user_claims = get_jwt()
-            current_user_public_id = get_jwt_identity()
-            current_user = User.query.filter_by(public_id=current_user_public_id).first()
+            current_user = get_current_user()
 
             # Determine which school to get stats for
             target_school_id = school_id or current_user.school_id
@@ -211,37 +211,48 @@ class SchoolStatsResource(Resource):
             if not school:
                 return error_response("School not found", status_code=404)
 
-            # --- Attendance Summary ---
-            # Attendance has no direct school_id; compute via Course.school_id
-            total_sessions = (
-                db.session.query(Attendance)
-                .join(Course, Attendance.course_id == Course.id)
+            # --- Course Performance ---
+            # Read the incrementally maintained per-day rollups instead of raw
+            # attendance. Outer join keeps courses that have no attendance yet.
+            course_rows = (
+                db.session.query(
+                    Course.id,
+                    Course.title,
+                    func.coalesce(func.sum(
+                        AttendanceDailySummary.present_count
+                        + AttendanceDailySummary.absent_count
+                        + AttendanceDailySummary.late_count
+                    ), 0),
+                    func.coalesce(func.sum(AttendanceDailySummary.present_count), 0),
+                )
+                .outerjoin(AttendanceDailySummary, AttendanceDailySummary.course_id == Course.id)
                 .filter(Course.school_id == target_school_id)
-                .count()
+                .group_by(Course.id, Course.title)
+                .order_by(Course.id)
+                .all()
             )
-            present_sessions = (
-                db.session.query(Attendance)
-                .join(Course, Attendance.course_id == Course.id)
-                .filter(Course.school_id == target_school_id, Attendance.status == "present")
-                .count()
-            )
-            attendance_rate = round((present_sessions / total_sessions) * 100, 2) if total_sessions > 0 else 0
 
-            # --- Course Performance ---
             performance_data = []
-            for course in school.courses:
-                total_course_attendance = Attendance.query.filter_by(course_id=course.id).count()
-                present_course_attendance = Attendance.query.filter_by(course_id=course.id, status="present").count()
+            total_sessions = 0
+            present_sessions = 0
+            for _course_id, title, total_course_attendance, present_course_attendance in course_rows:
+                present_course_attendance = int(present_course_attendance or 0)
+                total_sessions += total_course_attendance
+                present_sessions += present_course_attendance
 
                 avg_attendance = round(
                     (present_course_attendance / total_course_attendance) * 100, 2
                 ) if total_course_attendance > 0 else 0
 
                 performance_data.append({
-                    "course": course.title,
+                    "course": title,
                     "avg_attendance": avg_attendance
                 })
 
+            # --- Attendance Summary ---
+            # School rate is derived from the same per-course rows
+            attendance_rate = round((present_sessions / total_sessions) * 100, 2) if total_sessions > 0 else 0
+
             return success_response("School stats retrieved successfully", {
                 "school": school_schema.dump(school),
                 "attendance": attendance_rate,
@@ -257,8 +268,7 @@ class SchoolUsersResource(Resource):
         """Get all users in a school with filtering"""
         try:
             current_user_claims = get_jwt()
-            current_user_public_id = get_jwt_identity()
-            current_user = User.query.filter_by(public_id=current_user_public_id).first()
+            current_user = get_current_user()
 
             # Check authorization
             if (current_user_claims.get("role") != "manager" and
@@ -279,10 +289,9 @@ class SchoolUsersResource(Resource):
 
             search = request.args.get("search")
             if search:
-                search_term = f"%{search}%"
-                query = query.filter(
-                    User.name.ilike(search_term) | User.email.ilike(search_term)
-                )
+                matches = matching_ids(search, "user")
+                if matches is not None:
+                    query = query.filter(User.id.in_(matches))
             
             # Pagination
             try:
@@ -313,8 +322,7 @@ class SchoolCoursesResource(Resource):
         """Get all courses in a school"""
         try:
             current_user_claims = get_jwt()
-            current_user_public_id = get_jwt_identity()
-            current_user = User.query.filter_by(public_id=current_user_public_id).first()
+            current_user = get_current_user()
             
             # Check authorization
             if (current_user_claims.get('role') != 'manager' and 
@@ -325,50 +333,29 @@ class SchoolCoursesResource(Resource):
             if not school:
                 return error_response("School not found", status_code=404)
             
-            # Get courses with optional filtering
-            query = school.courses
+            query = Course.query.filter(Course.school_id == school_id)
             
             # Filter by educator if specified
             educator_id = request.args.get('educator_id')
             if educator_id:
                 try:
-                    educator_id = int(educator_id)
-                    query = [course for course in query if course.educator_id == educator_id]
+                    query = query.filter(Course.educator_id == int(educator_id))
                 except ValueError:
                     return error_response("Invalid educator_id parameter", status_code=400)
             
             # Search functionality
             search = request.args.get('search')
             if search:
-                search_term = search.lower()
-                query = [course for course in query if 
-                          search_term in course.title.lower() or 
-                          (course.description and search_term in course.description.lower())]
+                matches = matching_ids(search, "course")
+                if matches is not None:
+                    query = query.filter(Course.id.in_(matches))
             
-            # Use your existing CourseSchema
-            try:
-                from app.schemas.course import courses_schema
-                courses_data = courses_schema.dump(query)
-            except ImportError:
-                # Fallback to manual serialization if import fails
-                courses_data = []
-                for course in query:
-                    course_dict = {
-                        'id': course.id,
-                        'title': course.title,
-                        'description': course.description,
-                        'educator_id': course.educator_id,
-                        'school_id': course.school_id,
-                        'created_at': course.created_at.isoformat() if course.created_at else None,
-                        'updated_at': course.updated_at.isoformat() if course.updated_at else None
-                    }
-                    courses_data.append(course_dict)
-            
-            return success_response("School courses retrieved successfully", {
-                "school": {"id": school.id, "name": school.name},
-                "courses": courses_data,
-                "total": len(courses_data)
-            })
+            query = query.options(*COURSE_DUMP_OPTIONS).order_by(Course.created_at.desc())
+            return paginate(
+                query, courses_schema, default_per_page=50, resource_name="courses",
+                cursor_column=Course.created_at, related=COURSE_DUMP_RELATED, etag_parts=(signing_window(),),
+                extra={"school": {"id": school.id, "name": school.name}}
+            )
             
         except Exception as e:
             return error_response("Something went wrong", {"error": str(e)}, status_code=500)
@@ -379,8 +366,7 @@ class SchoolDashboardResource(Resource):
         """Get dashboard data (managers only)"""
         try:
             claims = get_jwt()
-            current_public_id = get_jwt_identity()
-            current_user = User.query.filter_by(public_id=current_public_id).first()
+            current_user = get_current_user()
 
             # Only managers can access school dashboard
             if claims.get("role") != "manager":
@@ -404,19 +390,42 @@ class SchoolDashboardResource(Resource):
             }
 
             week_ago = datetime.utcnow() - timedelta(days=7)
+            school_ids = [school.id for school in schools]
+
+            # One grouped pass over users: role totals + recent sign-ups per school
+            user_rows = (
+                db.session.query(
+                    User.school_id,
+                    User.role,
+                    func.count(User.id),
+                    func.sum(case((User.created_at >= week_ago, 1), else_=0)),
+                )
+                .filter(User.school_id.in_(school_ids))
+                .group_by(User.school_id, User.role)
+                .all()
+            )
+            course_counts = dict(
+                db.session.query(Course.school_id, func.count(Course.id))
+                .filter(Course.school_id.in_(school_ids))
+                .group_by(Course.school_id)
+                .all()
+            )
+
+            role_counts = {}
+            new_user_counts = {}
+            for row_school_id, role, total, recent in user_rows:
+                role_counts[(row_school_id, role)] = total
+                new_user_counts[row_school_id] = new_user_counts.get(row_school_id, 0) + int(recent or 0)
 
             for school in schools:
                 school_stats = {
                     "id": school.id,
                     "name": school.name,
-                    "students": User.query.filter_by(school_id=school.id, role="student").count(),
-                    "educators": User.query.filter_by(school_id=school.id, role="educator").count(),
-                    "managers": User.query.filter_by(school_id=school.id, role="manager").count(),
-                    "total_courses": Course.query.filter_by(school_id=school.id).count(),
-                    "new_users_this_week": User.query.filter(
-                        User.school_id == school.id,
-                        User.created_at >= week_ago
-                    ).count()
+                    "students": role_counts.get((school.id, "student"), 0),
+                    "educators": role_counts.get((school.id, "educator"), 0),
+                    "managers": role_counts.get((school.id, "manager"), 0),
+                    "total_courses": course_counts.get(school.id, 0),
+                    "new_users_this_week": new_user_counts.get(school.id, 0)
                 }
 
                 # Add to aggregated totals
@@ -493,9 +502,8 @@ class SchoolAssignUserResource(Resource):
                 return error_response("Role must be 'student' or 'educator'", status_code=400)
 
             # Identify current user
-            current_user_public_id = get_jwt_identity()
             current_user_claims = get_jwt()
-            current_user = User.query.filter_by(public_id=current_user_public_id).first()
+            current_user = get_current_user()
 
             if not current_user:
                 return error_response("User not found", status_code=404)
@@ -551,8 +559,7 @@ class EducatorsByManagerResource(Resource):
     @jwt_required()
     def get(self):
         try:
-            current_user_public_id = get_jwt_identity()
-            user = User.query.filter_by(public_id=current_user_public_id).first()
+            user = get_current_user()
             if not user or user.role != "manager":
                 return error_response("Only managers can view their educators", status_code=403)
 
@@ -581,8 +588,7 @@ class ManagerStudentsResource(Resource):
     @jwt_required()
     def get(self):
         try:
-            current_user_public_id = get_jwt_identity()
-            user = User.query.filter_by(public_id=current_user_public_id).first()
+            user = get_current_user()
             if not user or user.role != "manager":
                 return error_response("Only managers can view their students", status_code=403)
 
@@ -666,8 +672,7 @@ class ManagerUsersResource(Resource):
     def get(self):
         """Get all users under manager's schools"""
         try:
-            current_public_id = get_jwt_identity()
-            manager = User.query.filter_by(public_id=current_public_id).first()
+            manager = get_current_user()
             if not manager or manager.role != "manager":
                 return error_response("Only managers can view this", 403)
 
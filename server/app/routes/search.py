@@ -0,0 +1,110 @@
+# app/routes/search.py
+from flask import request
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_current_user
+
+from app.models.school import School
+from app.models.user import User
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.message import Message
+from app.models.resource import Resource as ResourceModel
+from app.utils.responses import success_response, error_response
+from app.utils.search import ENTITY_TYPES, search
+from app.utils.signing import sign_upload_url
+
+
+def _serialize_user(user):
+    return {"name": user.name, "email": user.email, "role": user.role, "public_id": user.public_id}
+
+
+def _serialize_course(course):
+    return {"title": course.title, "description": course.description, "school_id": course.school_id}
+
+
+def _serialize_resource(resource):
+    return {
+        "title": resource.title,
+        "type": resource.type,
+        "url": sign_upload_url(resource.url),
+        "course_id": resource.course_id,
+    }
+
+
+def _serialize_message(message):
+    return {
+        "content": message.content,
+        "course_id": message.course_id,
+        "user_public_id": message.user_public_id,
+        "timestamp": message.timestamp.isoformat() if message.timestamp else None,
+    }
+
+
+SEARCH_MODELS = {
+    "user": (User, _serialize_user),
+    "course": (Course, _serialize_course),
+    "resource": (ResourceModel, _serialize_resource),
+    "message": (Message, _serialize_message),
+}
+
+
+class SearchResource(Resource):
+    @jwt_required()
+    def get(self):
+        """Ranked, prefix-matching search within the caller's school(s)"""
+        q = (request.args.get("q") or "").strip()
+        if not q:
+            return error_response("Query parameter 'q' is required", status_code=400)
+
+        types = [t for t in request.args.get("type", "").split(",") if t] or list(ENTITY_TYPES)
+        unknown = [t for t in types if t not in ENTITY_TYPES]
+        if unknown:
+            return error_response(
+                "Invalid search type",
+                {"type": f"Must be one of: {', '.join(ENTITY_TYPES)}"},
+                status_code=400,
+            )
+
+        limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+        offset = max(request.args.get("offset", 0, type=int), 0)
+
+        user = get_current_user()
+        school_ids = {user.school_id} if user.school_id else set()
+        if user.role == "manager":
+            school_ids.update(sid for (sid,) in School.query.with_entities(School.id).filter_by(owner_id=user.id))
+
+        # Students only see resources and messages of courses they are enrolled in
+        course_ids = None
+        if user.role == "student":
+            course_ids = [
+                cid for (cid,) in Enrollment.query.with_entities(Enrollment.course_id)
+                .filter_by(user_public_id=user.public_id)
+            ]
+
+        hits = search(q, types, school_ids, course_ids=course_ids, limit=limit, offset=offset)
+
+        # One query per entity type to resolve the hits
+        ids_by_type = {}
+        for entity_type, entity_id, _ in hits:
+            ids_by_type.setdefault(entity_type, []).append(entity_id)
+        rows = {}
+        for entity_type, ids in ids_by_type.items():
+            model, _ = SEARCH_MODELS[entity_type]
+            rows[entity_type] = {row.id: row for row in model.query.filter(model.id.in_(ids))}
+
+        results = []
+        for entity_type, entity_id, score in hits:
+            row = rows[entity_type].get(entity_id)
+            if row is None:
+                # Index entry outlived its row (e.g. a bulk delete)
+                continue
+            _, serialize = SEARCH_MODELS[entity_type]
+            results.append({"type": entity_type, "id": entity_id, "score": round(score, 4), **serialize(row)})
+
+        return success_response("Search results retrieved successfully", {
+            "query": q,
+            "results": results,
+            "limit": limit,
+            "offset": offset,
+            "has_more": len(hits) == limit,
+        })
@@ -1,17 +1,27 @@
 from flask import request
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, get_current_user
 from marshmallow import ValidationError
+from sqlalchemy.orm import selectinload
 
 from app.models.user import User, ROLES
 from app.models.school import School
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.resource import Resource as ResourceModel
 from app.models.base import db
+from app.models.job import Job
 from app.schemas.user import (
     UserSchema, UserCreateSchema, UserUpdateSchema, PasswordChangeSchema,
     UserListResponseSchema, UserStatsSchema, UserQuerySchema
 )
 from app.schemas.schools import SchoolSchema
 from app.utils.responses import success_response, error_response
+from app.utils.conditional import cache_headers, list_validator, make_etag, not_modified
+from app.utils.signing import sign_upload_url, signing_window
+from app.utils.search import matching_ids
+from app.utils.jobs import job_accepted
+from app.utils.user_import import USER_IMPORT_JOB, ImportFormatError, import_payload, read_rows, validate_rows
 
 
 # Initialize schemas
@@ -30,11 +40,9 @@ class UserResource(Resource):
     def get(self, user_id=None):
         """Get user by ID (int) or public_id (string) or current user"""
         try:
-            current_user_public_id = get_jwt_identity()
-            
             if user_id is None:
                 # /users/me
-                user = User.query.filter_by(public_id=current_user_public_id).first()
+                user = get_current_user()
             else:
                 # /users/<int:user_id>
                 user = User.query.get(user_id)  # safer than filter_by(id=...)
@@ -55,8 +63,7 @@ class UserResource(Resource):
         """Update user information"""
         try:
             if not user_id:
-                current_user_public_id = get_jwt_identity()
-                user = User.query.filter_by(public_id=current_user_public_id).first()
+                user = get_current_user()
             else:
                 user = User.query.get(user_id)
 
@@ -64,7 +71,7 @@ class UserResource(Resource):
                 return error_response("User not found", status_code=404)
 
             current_user_public_id = get_jwt_identity()
-            current_user = User.query.filter_by(public_id=current_user_public_id).first()
+            current_user = get_current_user()
             current_user_claims = get_jwt()
 
             # Only self or managers (same school)
@@ -110,8 +117,7 @@ class UserResource(Resource):
             if not user:
                 return error_response("User not found", status_code=404)
 
-            current_user_public_id = get_jwt_identity()
-            current_user = User.query.filter_by(public_id=current_user_public_id).first()
+            current_user = get_current_user()
 
             if current_user.school_id != user.school_id:
                 return error_response("Can only delete users from your school", status_code=403)
@@ -130,8 +136,7 @@ class UserListResource(Resource):
         try:
             query_params = user_query_schema.load(request.args)
             current_user_claims = get_jwt()
-            current_user_public_id = get_jwt_identity()
-            current_user = User.query.filter_by(public_id=current_user_public_id).first()
+            current_user = get_current_user()
 
             if not current_user:
                 return error_response("User not found", status_code=404)
@@ -164,8 +169,9 @@ class UserListResource(Resource):
                 query = query.filter(User.school_id == query_params["school_id"])
 
             if query_params.get("search"):
-                search_term = f"%{query_params['search']}%"
-                query = query.filter(User.name.ilike(search_term) | User.email.ilike(search_term))
+                matches = matching_ids(query_params["search"], "user")
+                if matches is not None:
+                    query = query.filter(User.id.in_(matches))
 
             users = query.paginate(
                 page=query_params["page"], per_page=query_params["per_page"], error_out=False
@@ -198,8 +204,7 @@ class UsersBySchoolResource(Resource):
         """Get users by school (managers only, same school)"""
         try:
             current_user_claims = get_jwt()
-            current_user_public_id = get_jwt_identity()
-            current_user = User.query.filter_by(public_id=current_user_public_id).first()
+            current_user = get_current_user()
 
             if current_user_claims.get("role") != "manager" or current_user.school_id != school_id:
                 return error_response("Not authorized to view users from this school", status_code=403)
@@ -216,8 +221,9 @@ class UsersBySchoolResource(Resource):
 
             search = request.args.get("search")
             if search:
-                search_term = f"%{search}%"
-                query = query.filter(User.name.ilike(search_term) | User.email.ilike(search_term))
+                matches = matching_ids(search, "user")
+                if matches is not None:
+                    query = query.filter(User.id.in_(matches))
 
             page = int(request.args.get("page", 1))
             per_page = min(int(request.args.get("per_page", 20)), 100)
@@ -250,8 +256,7 @@ class UsersBySchoolResource(Resource):
         """Add user to school (managers only, same school)"""
         try:
             current_user_claims = get_jwt()
-            current_user_public_id = get_jwt_identity()
-            current_user = User.query.filter_by(public_id=current_user_public_id).first()
+            current_user = get_current_user()
 
             if current_user_claims.get("role") != "manager" or current_user.school_id != school_id:
                 return error_response("Not authorized to add users to this school", status_code=403)
@@ -282,13 +287,59 @@ class UsersBySchoolResource(Resource):
             return error_response("Something went wrong", {"error": str(e)}, status_code=500)
 
 
+class SchoolUsersImportResource(Resource):
+    @jwt_required()
+    def post(self, school_id):
+        """
+        POST /schools/<id>/users/import
+        Create users from a CSV (multipart field "file", or a text/csv body)
+        with columns name,email,role,password. All rows are validated first;
+        if any is invalid nothing is imported and the response lists the
+        errors per line, unless ?skip_invalid=true imports the valid rows.
+        The users are created by the job worker: 202 with the job, whose
+        result carries created/skipped/public_ids/errors.
+        """
+        current_user_claims = get_jwt()
+        current_user = get_current_user()
+        if current_user_claims.get("role") != "manager" or current_user.school_id != school_id:
+            return error_response("Not authorized to add users to this school", status_code=403)
+
+        if not db.session.get(School, school_id):
+            return error_response("School not found", status_code=404)
+
+        upload = request.files.get("file")
+        raw = upload.read() if upload else request.get_data()
+        try:
+            rows = read_rows(raw.decode("utf-8-sig"))
+        except UnicodeDecodeError:
+            return error_response("The file must be UTF-8 encoded CSV", status_code=400)
+        except ImportFormatError as e:
+            return error_response(str(e), status_code=400)
+
+        valid, report = validate_rows(rows)
+        skip_invalid = request.args.get("skip_invalid", "false").lower() == "true"
+        if report and not skip_invalid:
+            return error_response(
+                "Import rejected: some rows are invalid",
+                {"rows": report, "valid_rows": len(valid)},
+                status_code=400,
+            )
+
+        job = Job.enqueue(
+            USER_IMPORT_JOB,
+            import_payload(valid, report, school_id, skip_invalid),
+            requested_by=current_user.public_id,
+        )
+        db.session.commit()
+        return job_accepted(job, "User import queued")
+
+
 class UserProfileResource(Resource):
     @jwt_required()
     def get(self):
         """Current user's profile"""
         try:
-            current_user_public_id = get_jwt_identity()
-            user = User.query.filter_by(public_id=current_user_public_id).first()
+            user = get_current_user()
 
             if not user:
                 return error_response("User not found", status_code=404)
@@ -304,8 +355,7 @@ class UserProfileResource(Resource):
     def put(self):
         """Update current user's profile (self or manager can update)"""
         try:
-            current_user_public_id = get_jwt_identity()
-            current_user = User.query.filter_by(public_id=current_user_public_id).first()
+            current_user = get_current_user()
             current_user_claims = get_jwt()
 
             if not current_user:
@@ -341,9 +391,8 @@ class UserDashboardResource(Resource):
     def get(self):
         """Dashboard per role"""
         try:
-            current_user_public_id = get_jwt_identity()
             current_user_claims = get_jwt()
-            user = User.query.filter_by(public_id=current_user_public_id).first()
+            user = get_current_user()
 
             if not user:
                 return error_response("User not found", status_code=404)
@@ -437,13 +486,82 @@ class UserDashboardResource(Resource):
             return error_response("Something went wrong", {"error": str(e)}, status_code=500)
 
 
+class UserCoursesResource(Resource):
+    @jwt_required()
+    def get(self):
+        """
+        Current user's courses (taught for educators, enrolled for students,
+        school-wide for managers). ?include=resources adds each course's
+        resources. Loads in a constant number of queries and honours
+        If-None-Match.
+        """
+        try:
+            user = get_current_user()
+            if not user:
+                return error_response("User not found", status_code=404)
+
+            include = {part.strip() for part in request.args.get("include", "").split(",") if part.strip()}
+            with_resources = "resources" in include
+
+            query = Course.query
+            if user.role == "educator":
+                query = query.filter(Course.educator_id == user.id)
+            elif user.role == "student":
+                query = query.join(Enrollment, Enrollment.course_id == Course.id).filter(
+                    Enrollment.user_public_id == user.public_id
+                )
+            elif user.school_id:
+                query = query.filter(Course.school_id == user.school_id)
+            else:
+                query = query.filter(db.false())
+
+            # Validate on aggregates so a 304 skips loading the tree entirely
+            validators = [list_validator(query)]
+            if with_resources:
+                validators.append(list_validator(
+                    ResourceModel.query.filter(ResourceModel.course_id.in_(query.with_entities(Course.id)))
+                ))
+            last_modified = max((stamp for _, stamp in validators if stamp), default=None)
+            etag = make_etag(validators, signing_window() if with_resources else None)
+            cached = not_modified(etag, last_modified, honor_if_modified_since=False)
+            if cached:
+                return cached
+
+            if with_resources:
+                query = query.options(
+                    selectinload(Course.resources).load_only(
+                        ResourceModel.id, ResourceModel.title, ResourceModel.url, ResourceModel.course_id
+                    )
+                )
+
+            courses = []
+            for course in query.order_by(Course.id).all():
+                course_data = {
+                    "id": course.id,
+                    "title": course.title,
+                    "description": course.description,
+                }
+                if with_resources:
+                    course_data["resources"] = [
+                        {"id": res.id, "title": res.title, "url": sign_upload_url(res.url)}
+                        for res in sorted(course.resources, key=lambda r: r.id)
+                    ]
+                courses.append(course_data)
+
+            return success_response(
+                "Courses retrieved successfully", {"courses": courses},
+                headers=cache_headers(etag, last_modified)
+            )
+        except Exception as e:
+            return error_response("Something went wrong", {"error": str(e)}, status_code=500)
+
+
 class UserPasswordChangeResource(Resource):
     @jwt_required()
     def put(self):
         """Change current user's password"""
         try:
-            current_user_public_id = get_jwt_identity()
-            user = User.query.filter_by(public_id=current_user_public_id).first()
+            user = get_current_user()
 
             if not user:
                 return error_response("User not found", status_code=404)
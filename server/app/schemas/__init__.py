@@ -14,6 +14,7 @@ from .auth import (
 from .base import BaseSchema
 from .course import CourseSchema, course_schema, courses_schema
 from .enrollment import EnrollmentSchema, enrollment_schema, enrollments_schema
+from .job import JobSchema, job_schema
 from .message import MessageSchema, message_schema, messages_schema
 from .resources import ResourceSchema, resource_schema, resources_schema
 from .schools import SchoolSchema
@@ -25,6 +26,7 @@ from .user import (
     UserListResponseSchema,
     UserStatsSchema,
     UserQuerySchema,
+    UserImportRowSchema,
 )
 
 __all__ = [
@@ -52,6 +54,10 @@ __all__ = [
     "enrollment_schema",
     "enrollments_schema",
 
+    # Job
+    "JobSchema",
+    "job_schema",
+
     # Message
     "MessageSchema",
     "message_schema",
@@ -73,4 +79,5 @@ __all__ = [
     "UserListResponseSchema",
     "UserStatsSchema",
     "UserQuerySchema",
+    "UserImportRowSchema",
 ]
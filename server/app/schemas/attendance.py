@@ -4,6 +4,9 @@ from app.schemas.base import BaseSchema
 from app.schemas.course import CourseSchema
 from marshmallow import validate, fields
 
+ATTENDANCE_STATUSES = ("present", "absent", "late")
+
+
 class UserBasicSchema(ma.Schema):
     """Basic user schema for nested display"""
     public_id = fields.String()
@@ -19,7 +22,7 @@ class AttendanceSchema(BaseSchema):
     user_public_id = ma.auto_field()
     course_id = ma.auto_field()
     date = ma.auto_field()
-    status = ma.auto_field(validate=validate.OneOf(["present", "absent", "late"]))
+    status = ma.auto_field(validate=validate.OneOf(ATTENDANCE_STATUSES))
     #verified_by = ma.auto_field()
 
     # Include nested course and user info
@@ -0,0 +1,32 @@
+from marshmallow import post_dump
+from app.extensions import ma
+from app.models.job import Job
+from app.utils.signing import sign_upload_url
+
+
+class JobSchema(ma.SQLAlchemySchema):
+    class Meta:
+        model = Job
+
+    id = ma.auto_field()
+    kind = ma.auto_field()
+    status = ma.auto_field()
+    attempts = ma.auto_field()
+    max_attempts = ma.auto_field()
+    result = ma.auto_field()
+    error = ma.auto_field()
+    run_at = ma.auto_field()
+    created_at = ma.auto_field()
+    started_at = ma.auto_field()
+    finished_at = ma.auto_field()
+
+    @post_dump
+    def sign_result_url(self, data, **kwargs):
+        # Jobs that produce a file (exports) return it as a signed download link
+        result = data.get("result")
+        if isinstance(result, dict) and result.get("url"):
+            data["result"] = {**result, "url": sign_upload_url(result["url"])}
+        return data
+
+
+job_schema = JobSchema()
@@ -1,8 +1,10 @@
 
-from marshmallow import validates, ValidationError, fields
+from marshmallow import post_dump, validates, ValidationError, fields
 from app.extensions import ma
 from app.models.resource import Resource
 from app.schemas.base import BaseSchema
+from app.utils.signing import sign_upload_url
+from app.utils.storage import get_storage
 
 
 class ResourceSchema(ma.SQLAlchemyAutoSchema):
@@ -10,6 +12,9 @@ class ResourceSchema(ma.SQLAlchemyAutoSchema):
         model = Resource
         include_fk = True
         load_instance = True
+        # Recorded by storage on upload
+        dump_only = ("sha256", "size", "mime_type")
+        exclude = ("preview_key",)
    
     # Auto fields
     id = ma.auto_field()
@@ -23,6 +28,20 @@ class ResourceSchema(ma.SQLAlchemyAutoSchema):
     # Nested user (uploader) and course (title)
     uploader = ma.Nested("UserSchema", only=("public_id", "name"), dump_only=True)
     course = ma.Nested("CourseSchema", only=("id", "title"), dump_only=True)
+    # Thumbnail or text excerpt; null until the preview worker has run
+    preview_url = fields.Method("get_preview_url", dump_only=True)
+
+    def get_preview_url(self, obj):
+        if not obj.preview_key:
+            return None
+        return sign_upload_url(get_storage().url(obj.preview_key))
+
+    @post_dump
+    def sign_url(self, data, **kwargs):
+        # Uploaded files are only downloadable through signed, expiring links
+        if "url" in data:
+            data["url"] = sign_upload_url(data["url"])
+        return data
 
     @validates('course_id')
     def validate_course_exists(self, value):
@@ -66,6 +66,19 @@ class UserCreateSchema(UserSchema):
         exclude = ["password_hash"]
 
 
+class UserImportRowSchema(Schema):
+    """One CSV row of a bulk user import (email uniqueness is checked for the whole file at once)"""
+    name = fields.String(required=True, validate=validate.Length(min=2, max=100))
+    email = fields.Email(required=True, validate=validate.Length(max=120))
+    role = fields.String(load_default="student", validate=validate.OneOf(ROLES))
+    password = fields.String(required=True, validate=validate.Length(min=6))
+
+    @validates("email")
+    def validate_email_format(self, value, **kwargs):
+        if not EMAIL_REGEX.match(value):
+            raise ValidationError("Invalid email format")
+
+
 class UserUpdateSchema(Schema):
     """Schema for updating users"""
     name = fields.String(validate=validate.Length(min=2, max=100))
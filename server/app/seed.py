@@ -8,6 +8,7 @@ import uuid
 from app.extensions import db
 from app.models import (
     Attendance,
+    AttendanceDailySummary,
     Course,
     Enrollment,
     Message,
@@ -226,6 +227,7 @@ def seed_clear():
     # delete in dependency-safe order
     Message.query.delete()
     Resource.query.delete()
+    AttendanceDailySummary.query.delete()
     Attendance.query.delete()
     Enrollment.query.delete()
     Course.query.delete()
@@ -0,0 +1,120 @@
+"""
+Conditional GET support (ETag / Last-Modified / 304).
+
+Validators are computed from cheap aggregates rather than the serialized
+body, so a 304 can be returned before anything is loaded or dumped:
+
+- lists: row count + max(updated_at) of the filtered query
+- details: the row's id + updated_at
+- embedded relations (a course's resources, its educator, ...): row count +
+  max(updated_at) of the related rows, see related_validator()
+
+All are mixed with the request path, query string and caller identity so
+different pages, filters and users never share an ETag.
+
+If-Modified-Since is only honoured where a date alone is enough: deleting
+one of several rows leaves max(updated_at) where it was, so listings and
+payloads embedding collections revalidate on the ETag only.
+"""
+import hashlib
+from datetime import timezone
+
+from flask import request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import func
+
+
+def _identity():
+    try:
+        return get_jwt_identity() or ""
+    except RuntimeError:
+        # Endpoint without jwt_required
+        return ""
+
+
+def make_etag(*parts):
+    raw = "|".join(str(part) for part in (request.full_path, _identity(), *parts))
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def _as_utc(value):
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def list_validator(query):
+    """(row count, newest updated_at) for the rows `query` selects."""
+    entity = query.column_descriptions[0]["entity"]
+    total, last_modified = (
+        query.order_by(None)
+        .with_entities(func.count(entity.id), func.max(entity.updated_at))
+        .one()
+    )
+    return total, _as_utc(last_modified)
+
+
+def related_validator(query, *relationships):
+    """
+    [(row count, newest updated_at)] of the rows reached from the rows `query`
+    selects through each of `relationships`. A relationship is an attribute
+    such as Course.resources, or a tuple of them for a nested path, e.g.
+    (Course.resources, Resource.uploader).
+    """
+    entity = query.column_descriptions[0]["entity"]
+    ids = query.order_by(None).with_entities(entity.id)
+    validators = []
+    for path in relationships:
+        path = path if isinstance(path, tuple) else (path,)
+        target = path[-1].property.mapper.class_
+        related = query.session.query(func.count(target.id), func.max(target.updated_at)).select_from(entity)
+        for relationship in path:
+            related = related.join(relationship)
+        total, last_modified = related.filter(entity.id.in_(ids)).one()
+        validators.append((total, _as_utc(last_modified)))
+    return validators
+
+
+def newest(validators):
+    """Latest timestamp across (count, updated_at) validators."""
+    return max((_as_utc(stamp) for _, stamp in validators if stamp), default=None)
+
+
+def cache_headers(etag, last_modified=None):
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = last_modified.strftime("%a, %d %b %Y %H:%M:%S GMT")
+    return headers
+
+
+def not_modified(etag, last_modified=None, honor_if_modified_since=True):
+    """
+    304 response tuple if the client's copy is current, else None.
+    If-None-Match wins over If-Modified-Since when both are sent; pass
+    honor_if_modified_since=False where a delete would not move last_modified.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return None
+
+    headers = cache_headers(etag, last_modified)
+    if request.if_none_match:
+        if request.if_none_match.contains_weak(etag.removeprefix("W/").strip('"')):
+            return "", 304, headers
+        return None
+
+    if honor_if_modified_since and last_modified is not None and request.if_modified_since is not None:
+        if last_modified.replace(microsecond=0) <= request.if_modified_since:
+            return "", 304, headers
+    return None
+
+
+def detail_validator(obj, *parts, related=()):
+    """
+    (etag, last_modified) for a single row; `parts` are mixed into the ETag,
+    and `related` relationships (see related_validator) the payload embeds.
+    """
+    validators = [(obj.id, _as_utc(obj.updated_at))]
+    if related:
+        validators += related_validator(type(obj).query.filter(type(obj).id == obj.id), *related)
+    last_modified = newest(validators)
+    return make_etag(type(obj).__name__, validators, *parts), last_modified
@@ -0,0 +1,136 @@
+"""
+Current-user loading for JWT-protected requests.
+
+flask_jwt_extended calls the lookup loader once per request and keeps the
+result on `g`, so handlers read it with `get_current_user()` instead of
+re-querying by `get_jwt_identity()`. The user is loaded with its school
+joined.
+
+Loaded users are also kept in a small process-local cache keyed by
+public_id (CURRENT_USER_CACHE_TTL seconds, at most CURRENT_USER_CACHE_SIZE
+entries). Cache hits are merged into the request session without a query.
+Entries are dropped when a User or School row is updated or deleted in this
+process; other workers see the change once the TTL runs out.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.extensions import db, jwt
+from app.models.school import School
+from app.models.user import User
+from app.utils.responses import error_response
+
+
+class IdentityCache:
+    """Size-bounded LRU of column snapshots with a per-entry TTL."""
+
+    def __init__(self, ttl=30, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _snapshot(obj):
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(type(obj)).column_attrs}
+
+
+def _restore(model, values):
+    """Attach a cached snapshot to the session as a clean, persistent row."""
+    obj = model()
+    # Set as committed state so validators don't run and nothing is dirty
+    for key, value in values.items():
+        set_committed_value(obj, key, value)
+    make_transient_to_detached(obj)
+    return db.session.merge(obj, load=False)
+
+
+def _cache():
+    return current_app.extensions.get("identity_cache")
+
+
+def _load_user(jwt_header, jwt_data):
+    public_id = jwt_data[current_app.config["JWT_IDENTITY_CLAIM"]]
+    cache = _cache()
+
+    cached = cache.get(public_id) if cache is not None else None
+    if cached is not None:
+        user_values, school_values = cached
+        user = _restore(User, user_values)
+        school = _restore(School, school_values) if school_values else None
+        set_committed_value(user, "school", school)
+        return user
+
+    user = User.query.options(joinedload(User.school)).filter_by(public_id=public_id).first()
+    if user is not None and cache is not None:
+        cache.set(public_id, (_snapshot(user), _snapshot(user.school) if user.school else None))
+    return user
+
+
+def _user_not_found(jwt_header, jwt_data):
+    return error_response("User not found", status_code=401)
+
+
+def _invalidate_user(mapper, connection, target):
+    cache = _cache()
+    if cache is not None:
+        cache.discard(target.public_id)
+
+
+def _invalidate_all(mapper, connection, target):
+    # Cached users carry their school; a school change drops everything
+    cache = _cache()
+    if cache is not None:
+        cache.clear()
+
+
+event.listen(User, "after_update", _invalidate_user)
+event.listen(User, "after_delete", _invalidate_user)
+event.listen(School, "after_update", _invalidate_all)
+event.listen(School, "after_delete", _invalidate_all)
+
+
+def init_identity(app):
+    app.config.setdefault("CURRENT_USER_CACHE_TTL", 30)
+    app.config.setdefault("CURRENT_USER_CACHE_SIZE", 1024)
+    app.extensions["identity_cache"] = IdentityCache(
+        ttl=app.config["CURRENT_USER_CACHE_TTL"],
+        max_size=app.config["CURRENT_USER_CACHE_SIZE"],
+    )
+    jwt.user_lookup_loader(_load_user)
+    jwt.user_lookup_error_loader(_user_not_found)
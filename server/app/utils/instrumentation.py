@@ -0,0 +1,123 @@
+"""
+Per-request SQL instrumentation.
+
+Counts queries and database time for every request through SQLAlchemy cursor
+events. Outside production the totals are returned as `X-Query-Count` and
+`Server-Timing` response headers, and statements that repeat within a single
+request (the usual N+1 signature) are logged as warnings.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_installed = False
+_collectors = []
+
+
+def fingerprint(statement):
+    """Normalize a SQL statement so repeats with different parameters match."""
+    sql = re.sub(r"\s+", " ", statement).strip()
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"%\(\w+\)s|:\w+|\$\d+|%s", "?", sql)
+    sql = re.sub(r"\b\d+\b", "?", sql)
+    # IN (?, ?, ?) -> IN (?) so batched lookups of different sizes match
+    sql = re.sub(r"\(\s*\?(?:\s*,\s*\?)*\s*\)", "(?)", sql)
+    return sql
+
+
+class QueryStats:
+    """Query count, total DB time and statement fingerprints for one unit of work."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold):
+        """Fingerprints executed at least `threshold` times, most frequent first."""
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n >= threshold]
+
+    def report(self):
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f}ms"]
+        lines.extend(f"  {n}x {sql}" for sql, n in self.fingerprints.most_common())
+        return "\n".join(lines)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    duration = time.perf_counter() - started
+
+    for stats in _collectors:
+        stats.record(statement, duration)
+    if has_request_context():
+        stats = g.get("query_stats")
+        if stats is not None:
+            stats.record(statement, duration)
+
+
+def install_listeners():
+    """Attach the cursor listeners to every engine (idempotent)."""
+    global _installed
+    if not _installed:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _installed = True
+
+
+@contextmanager
+def collect_queries():
+    """Collect every query executed inside the block, request or not."""
+    install_listeners()
+    stats = QueryStats()
+    _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _collectors.remove(stats)
+
+
+def _start_request_stats():
+    g.query_stats = QueryStats()
+
+
+def _finish_request_stats(response):
+    stats = g.pop("query_stats", None)
+    if stats is None:
+        return response
+
+    response.headers["X-Query-Count"] = str(stats.count)
+    response.headers.add(
+        "Server-Timing", f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"'
+    )
+
+    threshold = current_app.config["QUERY_REPEAT_THRESHOLD"]
+    for sql, n in stats.repeated(threshold):
+        current_app.logger.warning(
+            f"Possible N+1: statement ran {n}x during {request.method} {request.path}: {sql}"
+        )
+    return response
+
+
+def init_query_instrumentation(app):
+    """Enable per-request query stats when QUERY_INSTRUMENTATION is set."""
+    app.config.setdefault("QUERY_REPEAT_THRESHOLD", 5)
+    if not app.config.get("QUERY_INSTRUMENTATION"):
+        return
+
+    install_listeners()
+    app.before_request(_start_request_stats)
+    app.after_request(_finish_request_stats)
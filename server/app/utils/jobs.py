@@ -0,0 +1,237 @@
+"""
+Background jobs.
+
+Work that is too slow for a request (notification fan-out, exports,
+previews) is enqueued as a Job row and run by `flask worker`. A request
+handler enqueues, commits and answers 202 with the job's status URL:
+
+    job = Job.enqueue("attendance_export", {...}, requested_by=user_public_id)
+    db.session.commit()
+    return job_accepted(job)
+
+Handlers are plain functions registered with @job_handler(kind); they take
+the job's payload and return a JSON-serializable result. A handler that
+raises is retried with exponential backoff (JOB_BACKOFF_SECONDS, doubling,
+capped at JOB_MAX_BACKOFF_SECONDS) until the job's max_attempts is used up.
+Handlers are registered when their module is imported, which create_app()
+does for every module defining one.
+
+While a job runs, the worker bumps its updated_at every JOB_HEARTBEAT_SECONDS.
+Every worker loop requeues running jobs without a heartbeat for
+JOB_TIMEOUT_SECONDS (their worker was killed) every
+JOB_REQUEUE_INTERVAL_SECONDS, and runs the housekeeping registered with
+@periodic (e.g. purging expired token revocations). SIGTERM (a deploy) and
+Ctrl-C let each loop finish its current job and exit. Payload keys a handler declares
+`sensitive` (e.g. plaintext passwords) are removed from the stored job once
+it has finished, successfully or for good.
+"""
+import logging
+import signal
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from app.extensions import db
+from app.models.job import Job
+from app.utils.responses import success_response
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+SENSITIVE_KEYS = {}
+PERIODIC_TASKS = []
+
+
+def job_handler(kind, sensitive=()):
+    """
+    Register the decorated function as the handler for jobs of `kind`;
+    `sensitive` payload keys are scrubbed when the job finishes.
+    """
+    def decorator(fn):
+        JOB_HANDLERS[kind] = fn
+        SENSITIVE_KEYS[kind] = tuple(sensitive)
+        return fn
+    return decorator
+
+
+def periodic(interval_key, default_seconds):
+    """
+    Run the decorated function from every worker loop every `interval_key`
+    (config) seconds; 0 disables it. Several workers may run it around the
+    same time, so it must be idempotent.
+    """
+    def decorator(fn):
+        PERIODIC_TASKS.append((fn, interval_key, default_seconds))
+        return fn
+    return decorator
+
+
+def _run_periodic(next_runs):
+    """Run the periodic tasks that are due; `next_runs` holds each task's next time."""
+    now = time.monotonic()
+    for fn, interval_key, default_seconds in PERIODIC_TASKS:
+        interval = current_app.config.get(interval_key, default_seconds)
+        if not interval or now < next_runs.get(fn, 0):
+            continue
+        next_runs[fn] = now + interval
+        try:
+            fn()
+        except Exception:
+            logger.exception("Periodic task %s failed", fn.__name__)
+            db.session.rollback()
+
+
+def _scrub(job):
+    sensitive = SENSITIVE_KEYS.get(job.kind)
+    if sensitive and job.payload:
+        job.payload = {key: value for key, value in job.payload.items() if key not in sensitive}
+
+
+def job_url(job):
+    return f"/api/jobs/{job.id}"
+
+
+def job_accepted(job, message="Job queued"):
+    """202 response pointing at the job's status endpoint."""
+    from app.schemas.job import job_schema
+
+    return success_response(message, job_schema.dump(job), 202, headers={"Location": job_url(job)})
+
+
+def _heartbeat(job_id, interval):
+    """Keep a running job's updated_at fresh from a side thread; set the returned event to stop."""
+    engine = db.engine
+    table = Job.__table__
+    stopped = threading.Event()
+
+    def beat():
+        while not stopped.wait(interval):
+            try:
+                with engine.begin() as connection:
+                    connection.execute(
+                        table.update()
+                        .where(table.c.id == job_id, table.c.status == "running")
+                        .values(updated_at=datetime.now(timezone.utc))
+                    )
+            except Exception:
+                logger.exception("Heartbeat for job %s failed", job_id)
+
+    threading.Thread(target=beat, name=f"job-heartbeat-{job_id}", daemon=True).start()
+    return stopped
+
+
+def run_job(job):
+    """Run one claimed job and record the outcome; returns the job's new status."""
+    job_id = job.id
+    handler = JOB_HANDLERS.get(job.kind)
+    if handler is None:
+        job.mark_failed(f"No handler for job kind '{job.kind}'")
+        db.session.commit()
+        return job.status
+
+    try:
+        beating = _heartbeat(job_id, current_app.config.get("JOB_HEARTBEAT_SECONDS", 30))
+        try:
+            result = handler(job.payload or {})
+        finally:
+            beating.set()
+        job = db.session.get(Job, job_id)
+        job.mark_done(result)
+        _scrub(job)
+        db.session.commit()
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job_id, job.kind)
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        retrying = job.record_failure(
+            e,
+            backoff_seconds=current_app.config.get("JOB_BACKOFF_SECONDS", 10),
+            max_backoff_seconds=current_app.config.get("JOB_MAX_BACKOFF_SECONDS", 3600),
+        )
+        if not retrying:
+            _scrub(job)
+        db.session.commit()
+    return job.status
+
+
+def work(kinds=None, poll_seconds=1.0, once=False, stop=None):
+    """
+    Claim and run jobs one at a time until `stop` is set (or, with `once`,
+    until no job is due), requeueing stale jobs as it goes. Returns the
+    number of jobs run.
+    """
+    timeout = current_app.config.get("JOB_TIMEOUT_SECONDS", 300)
+    requeue_every = current_app.config.get("JOB_REQUEUE_INTERVAL_SECONDS", 60)
+    next_requeue = 0
+    next_runs = {}
+    processed = 0
+    while stop is None or not stop.is_set():
+        if time.monotonic() >= next_requeue:
+            Job.requeue_stale(timeout)
+            next_requeue = time.monotonic() + requeue_every
+        _run_periodic(next_runs)
+        jobs = Job.claim(kinds, limit=1)
+        if jobs:
+            run_job(jobs[0])
+            processed += 1
+            continue
+        if once:
+            break
+        db.session.remove()
+        if stop is not None:
+            stop.wait(poll_seconds)
+        else:
+            time.sleep(poll_seconds)
+    return processed
+
+
+def _stop_on_signals(stop):
+    """Set `stop` on SIGTERM/SIGINT; returns the previous handlers to restore."""
+    if threading.current_thread() is not threading.main_thread():
+        return {}
+
+    def handle(signum, frame):
+        logger.info("Received signal %s; finishing current jobs", signum)
+        stop.set()
+
+    return {signum: signal.signal(signum, handle) for signum in (signal.SIGTERM, signal.SIGINT)}
+
+
+def run_worker(concurrency=1, kinds=None, poll_seconds=1.0, once=False):
+    """
+    Run `concurrency` work() loops, each in its own thread with its own app
+    context and database session, until SIGTERM/SIGINT (or, with `once`,
+    until no job is due).
+    """
+    stop = threading.Event()
+    previous = _stop_on_signals(stop)
+    try:
+        if concurrency <= 1:
+            return work(kinds, poll_seconds, once, stop)
+        return _run_loops(concurrency, kinds, poll_seconds, once, stop)
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+def _run_loops(concurrency, kinds, poll_seconds, once, stop):
+    app = current_app._get_current_object()
+    counts = []
+
+    def loop():
+        with app.app_context():
+            try:
+                counts.append(work(kinds, poll_seconds, once, stop))
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=loop, name=f"job-worker-{n}", daemon=True) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    # Each loop finishes its current job once `stop` is set
+    for thread in threads:
+        while thread.is_alive():
+            thread.join(0.5)
+    return sum(counts)
@@ -0,0 +1,135 @@
+"""
+Notification fan-out.
+
+notify_course() / notify_school() resolve the recipients with one query and
+write one notification row per recipient with INSERT ... SELECT, so the rows
+are built in the database rather than in Python. Recipients are processed in
+chunks of NOTIFICATION_FANOUT_CHUNK_SIZE users (ordered by user id), each
+chunk in its own short transaction, and open notification streams are woken
+after every chunk.
+
+`link` may be a string, or a {role: link} mapping for audiences that mix
+students and educators.
+
+Request handlers should not fan out inline: enqueue_course_notification()
+queues a "notify_course" job for the worker instead.
+"""
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import case, false, insert, literal, null, or_, select
+
+from app.extensions import db
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.job import Job
+from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
+from app.models.user import User
+from app.utils.jobs import job_handler
+from app.utils.pubsub import publish_notification_changes
+
+DEFAULT_CHUNK_SIZE = 1000
+NOTIFY_COURSE_JOB = "notify_course"
+
+
+def _link_column(link):
+    if isinstance(link, dict):
+        if not link:
+            return null()
+        return case(*[(User.role == role, literal(url)) for role, url in link.items()], else_=null())
+    return literal(link) if link is not None else null()
+
+
+def _fan_out(recipients, title, message, type_, link, exclude):
+    """Insert one notification per user matched by `recipients` (a User filter); returns the count."""
+    if exclude:
+        recipients = recipients & User.public_id.notin_(list(exclude))
+
+    rows = (
+        db.session.query(User.id, User.public_id)
+        .filter(recipients)
+        .order_by(User.id)
+        .all()
+    )
+    if not rows:
+        return 0
+
+    chunk_size = current_app.config.get("NOTIFICATION_FANOUT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+    now = datetime.now(timezone.utc)
+    columns = ["user_public_id", "title", "message", "type", "is_read", "link", "created_at", "updated_at"]
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        source = (
+            select(
+                User.public_id,
+                literal(title),
+                literal(message) if message is not None else null(),
+                literal(type_),
+                false(),
+                _link_column(link),
+                literal(now, Notification.created_at.type),
+                literal(now, Notification.updated_at.type),
+            )
+            .where(recipients)
+            .where(User.id.between(chunk[0].id, chunk[-1].id))
+        )
+        db.session.execute(insert(Notification).from_select(columns, source))
+        # Bulk inserts skip the ORM events that maintain the unread counters
+        NotificationCounter.increment([public_id for _, public_id in chunk])
+        db.session.commit()
+        publish_notification_changes([public_id for _, public_id in chunk])
+
+    return len(rows)
+
+
+def notify_course(course, title, message=None, type="info", link=None, exclude=(), include_educator=True):
+    """Notify every student enrolled in `course` (and its educator)."""
+    enrolled = select(Enrollment.user_public_id).where(Enrollment.course_id == course.id)
+    recipients = User.public_id.in_(enrolled)
+    if include_educator:
+        recipients = or_(recipients, User.id == course.educator_id)
+    return _fan_out(recipients, title, message, type, link, exclude)
+
+
+def notify_school(school_id, title, message=None, type="info", link=None, exclude=(), roles=None):
+    """Notify every user of a school, optionally only those with `roles`."""
+    recipients = User.school_id == school_id
+    if roles:
+        recipients = recipients & User.role.in_(list(roles))
+    return _fan_out(recipients, title, message, type, link, exclude)
+
+
+def enqueue_course_notification(course, title, message=None, type="info", link=None, exclude=(),
+                                include_educator=True, requested_by=None):
+    """Queue notify_course() as a background job; the caller commits."""
+    payload = {
+        "course_id": course.id,
+        "title": title,
+        "message": message,
+        "type": type,
+        "link": link,
+        "exclude": list(exclude),
+        "include_educator": include_educator,
+    }
+    # Chunks commit as they go, so a retry after a partial run would notify
+    # some users twice: run once and leave failures for inspection
+    return Job.enqueue(NOTIFY_COURSE_JOB, payload, requested_by=requested_by, max_attempts=1)
+
+
+@job_handler(NOTIFY_COURSE_JOB)
+def run_course_notification(payload):
+    course = db.session.get(Course, payload["course_id"])
+    if course is None:
+        return {"recipients": 0}
+    recipients = notify_course(
+        course,
+        payload["title"],
+        message=payload.get("message"),
+        type=payload.get("type", "info"),
+        link=payload.get("link"),
+        exclude=payload.get("exclude") or (),
+        include_educator=payload.get("include_educator", True),
+    )
+    return {"recipients": recipients}
@@ -0,0 +1,124 @@
+"""
+Password hashing off the request thread.
+
+bcrypt is deliberately CPU-heavy, so hashing and verification can be handed
+to a shared executor instead of running inline in the view:
+
+- PASSWORD_HASHER_EXECUTOR: "inline" (default), "process" or "thread"
+- PASSWORD_HASHER_WORKERS: pool size, defaults to the number of CPU cores
+- BCRYPT_LOG_ROUNDS: bcrypt cost factor for new hashes
+
+A process pool caps concurrent bcrypt work at the core count no matter how
+many requests arrive at once, and leaves the worker's other threads free to
+serve requests that do not need a hash. That only pays off with a threaded
+gunicorn worker class (gthread/gevent): a sync worker blocks on the result
+anyway, and would just start an extra pool of processes per worker. Existing
+hashes keep verifying at the cost they were created with.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import bcrypt
+from flask import current_app, has_app_context
+
+DEFAULT_LOG_ROUNDS = 12
+
+_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+
+
+def _config(key, default):
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+
+def _encode(password):
+    # bcrypt only uses the first 72 bytes; newer releases raise instead of truncating
+    return password.encode("utf-8")[:72]
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _verify(password_hash, password):
+    try:
+        return bcrypt.checkpw(_encode(password), password_hash.encode("utf-8"))
+    except ValueError:
+        # Malformed or empty hash
+        return False
+
+
+def _get_executor():
+    """Shared pool for this process, or None when hashing runs inline."""
+    global _executor, _executor_pid
+    kind = _config("PASSWORD_HASHER_EXECUTOR", "inline")
+    if kind == "inline":
+        return None
+
+    with _lock:
+        # A pool inherited across fork (e.g. gunicorn --preload) is unusable
+        if _executor is None or _executor_pid != os.getpid():
+            workers = _config("PASSWORD_HASHER_WORKERS", None) or os.cpu_count() or 1
+            pool_class = ThreadPoolExecutor if kind == "thread" else ProcessPoolExecutor
+            _executor = pool_class(max_workers=workers)
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def shutdown_executor():
+    """Stop the pool; the next call creates one from the current config."""
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=True)
+        _executor = None
+        _executor_pid = None
+
+
+atexit.register(shutdown_executor)
+
+
+def _run(fn, *args):
+    executor = _get_executor()
+    if executor is None:
+        return fn(*args)
+    return executor.submit(fn, *args).result()
+
+
+def hash_password(password, rounds=None):
+    """bcrypt hash of `password` at BCRYPT_LOG_ROUNDS (or `rounds`)."""
+    rounds = rounds or _config("BCRYPT_LOG_ROUNDS", DEFAULT_LOG_ROUNDS)
+    return _run(_hash, password, rounds)
+
+
+def hash_passwords(passwords, rounds=None, processes=None):
+    """
+    Hash many passwords, preserving order: on the shared executor, or with
+    `processes` > 1 on a pool of that many processes started for this batch
+    (background jobs, whatever PASSWORD_HASHER_EXECUTOR is).
+    """
+    rounds = rounds or _config("BCRYPT_LOG_ROUNDS", DEFAULT_LOG_ROUNDS)
+    passwords = list(passwords)
+    if processes and processes > 1 and len(passwords) > 1:
+        processes = min(processes, len(passwords))
+        # spawn: children never inherit the caller's database connections
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+            chunksize = max(len(passwords) // (processes * 4), 1)
+            return list(pool.map(_hash, passwords, [rounds] * len(passwords), chunksize=chunksize))
+    executor = _get_executor()
+    if executor is None:
+        return [_hash(password, rounds) for password in passwords]
+    return list(executor.map(_hash, passwords, [rounds] * len(passwords)))
+
+
+def verify_password(password_hash, password):
+    """True if `password` matches `password_hash`."""
+    if not password_hash or password is None:
+        return False
+    return _run(_verify, password_hash, password)
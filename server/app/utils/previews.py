@@ -0,0 +1,177 @@
+"""
+Resource previews, generated in the background.
+
+Uploading a file enqueues a "resource_preview" job (see app.utils.jobs);
+the worker renders it in a process pool, so neither the upload request nor
+the worker's threads block on image decoding:
+
+- PDFs: first page as a PNG thumbnail (needs PyMuPDF)
+- images: downscaled JPEG thumbnail (needs Pillow)
+- text: plain-text excerpt of the opening paragraph(s)
+
+Previews are stored next to the content-addressed file they come from
+(<sha256[:2]>/<sha256>.thumb.png, ...), so a file uploaded to several
+courses is rendered once. Without the optional package for a type, the
+job finishes without a preview.
+"""
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+
+from app.extensions import db
+from app.models.job import Job
+from app.models.resource import Resource
+from app.utils.jobs import job_handler, run_worker
+from app.utils.storage import content_key, get_storage
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_JOB = "resource_preview"
+THUMBNAIL_SIZE = (320, 320)
+EXCERPT_CHARS = 500
+
+TEXT_TYPES = {"text/plain", "text/markdown", "text/csv"}
+
+
+def preview_kind(mime_type):
+    """Preview type ("pdf", "image" or "text") for a mime type; None if it gets no preview."""
+    if mime_type == "application/pdf":
+        return "pdf"
+    if mime_type and mime_type.startswith("image/") and mime_type != "image/svg+xml":
+        return "image"
+    if mime_type in TEXT_TYPES:
+        return "text"
+    return None
+
+
+def preview_key(sha256, kind):
+    suffix = {"pdf": ".thumb.png", "image": ".thumb.jpg", "text": ".excerpt.txt"}[kind]
+    return f"{sha256[:2]}/{sha256}{suffix}"
+
+
+# -----------------------------
+# Rendering (runs in pool processes: files in, files out, no app context)
+# -----------------------------
+def _render_pdf(source, target):
+    import fitz  # PyMuPDF
+
+    with fitz.open(source) as document:
+        if document.page_count == 0:
+            return False
+        page = document.load_page(0)
+        zoom = min(THUMBNAIL_SIZE[0] / page.rect.width, THUMBNAIL_SIZE[1] / page.rect.height)
+        page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False).save(target, output="png")
+    return True
+
+
+def _render_image(source, target):
+    from PIL import Image
+
+    with Image.open(source) as image:
+        # draft() lets JPEG decode at reduced size instead of full resolution
+        image.draft("RGB", THUMBNAIL_SIZE)
+        image.thumbnail(THUMBNAIL_SIZE)
+        image.convert("RGB").save(target, "JPEG", quality=80, optimize=True)
+    return True
+
+
+def _render_text(source, target):
+    with open(source, "rb") as f:
+        raw = f.read(EXCERPT_CHARS * 4)
+    text = re.sub(r"\s+", " ", raw.decode("utf-8", errors="replace")).strip()
+    if not text:
+        return False
+    if len(text) > EXCERPT_CHARS:
+        text = text[:EXCERPT_CHARS].rsplit(" ", 1)[0] + "…"
+    with open(target, "w", encoding="utf-8") as f:
+        f.write(text)
+    return True
+
+
+RENDERERS = {"pdf": _render_pdf, "image": _render_image, "text": _render_text}
+
+
+def render_preview(source, kind, target):
+    """Write the preview for `source` to `target`; False if none could be made."""
+    try:
+        return RENDERERS[kind](source, target)
+    except ImportError:
+        return False
+
+
+# -----------------------------
+# Scheduling and the worker
+# -----------------------------
+def schedule_preview(resource):
+    """
+    Queue a preview for a freshly uploaded resource (caller commits). Reuses
+    an existing preview of the same file instead when there is one.
+    """
+    if not resource.sha256 or preview_kind(resource.mime_type) is None:
+        return None
+    existing = (
+        db.session.query(Resource.preview_key)
+        .filter(Resource.sha256 == resource.sha256, Resource.preview_key.isnot(None))
+        .limit(1)
+        .scalar()
+    )
+    if existing:
+        resource.preview_key = existing
+        return None
+    return Job.enqueue(PREVIEW_JOB, {"resource_id": resource.id})
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _render_pool():
+    """Process pool shared by the worker's threads; created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            processes = current_app.config.get("PREVIEW_PROCESSES") or os.cpu_count() or 1
+            # spawn: pool processes never inherit the parent's database connections
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+@job_handler(PREVIEW_JOB)
+def generate_preview(payload):
+    """Render (or reuse) the preview for a resource's file and attach it."""
+    resource = db.session.get(Resource, payload.get("resource_id"))
+    kind = preview_kind(resource.mime_type) if resource and resource.sha256 else None
+    if kind is None:
+        return {"preview_key": None}
+
+    storage = get_storage()
+    key = preview_key(resource.sha256, kind)
+    if not storage.exists(key):
+        # Local storage: render inside the storage root so the final move is a rename
+        # Only the URL's path: a stored URL may carry a query string
+        with storage.local_copy(content_key(resource.sha256, urlsplit(resource.url).path)) as source, \
+                tempfile.TemporaryDirectory(dir=getattr(storage, "root", None)) as workdir:
+            target = os.path.join(workdir, os.path.basename(key))
+            if not _render_pool().submit(render_preview, source, kind, target).result():
+                return {"preview_key": None}
+            storage.put_file(key, target)
+
+    # Every resource sharing the file shares the preview
+    Resource.query.filter(
+        Resource.sha256 == resource.sha256, Resource.preview_key.is_(None)
+    ).update({"preview_key": key}, synchronize_session=False)
+    return {"preview_key": key}
+
+
+def run_preview_worker(processes=None, poll_seconds=2.0, once=False):
+    """Work through preview jobs only, `processes` at a time."""
+    processes = processes or os.cpu_count() or 1
+    current_app.config["PREVIEW_PROCESSES"] = processes
+    return run_worker(concurrency=processes, kinds=[PREVIEW_JOB], poll_seconds=poll_seconds, once=once)
@@ -0,0 +1,276 @@
+"""
+Notification pub/sub for the SSE stream.
+
+Each worker process keeps a NotificationHub: open streams subscribe by user
+public_id and are woken whenever that user's notifications change. A wake-up
+carries no data; the stream re-reads the user's new notifications and unread
+count itself, so duplicate or coalesced signals are harmless.
+
+Signals reach other workers through a broker (NOTIFICATION_BROKER):
+
+- "postgres": NOTIFY on a channel that every worker LISTENs on
+- "polling": each worker checks notifications.updated_at for its subscribed
+  users every NOTIFICATION_POLL_SECONDS (SQLite and other databases)
+- "auto" (default): postgres on PostgreSQL, polling otherwise
+
+Changes made through the ORM are published automatically after commit; bulk
+UPDATE/INSERT statements must call publish_notification_changes().
+"""
+import logging
+import os
+import select
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, text
+from sqlalchemy.orm import Session, object_session
+
+from app.extensions import db
+from app.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "notification_users"
+
+
+class Subscription:
+    """One open stream; `wait()` blocks until the user's notifications change."""
+
+    def __init__(self, user_public_id):
+        self.user_public_id = user_public_id
+        self._event = threading.Event()
+
+    def wake(self):
+        self._event.set()
+
+    def wait(self, timeout):
+        woken = self._event.wait(timeout)
+        self._event.clear()
+        return woken
+
+
+class PollingBroker:
+    """Cross-worker delivery by polling notifications.updated_at."""
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self._since = None
+
+    def publish(self, user_public_ids):
+        # Other workers pick the change up on their next poll
+        pass
+
+    def poll(self, user_public_ids):
+        """Subscribed users with notifications changed since the last poll."""
+        if self._since is None:
+            self._since = db.session.query(func.max(Notification.updated_at)).scalar()
+            return set()
+
+        rows = (
+            db.session.query(Notification.user_public_id, func.max(Notification.updated_at))
+            .filter(Notification.user_public_id.in_(user_public_ids))
+            .filter(Notification.updated_at > self._since)
+            .group_by(Notification.user_public_id)
+            .all()
+        )
+        if rows:
+            self._since = max(stamp for _, stamp in rows)
+        return {user_public_id for user_public_id, _ in rows}
+
+    def listen(self, app, hub):
+        while True:
+            time.sleep(self.interval)
+            try:
+                with app.app_context():
+                    users = hub.subscribed_users()
+                    if users:
+                        hub.dispatch(self.poll(users))
+                    elif self._since is not None:
+                        # Nobody listening; start from "now" when someone subscribes
+                        self._since = None
+                    db.session.remove()
+            except Exception:
+                logger.exception("Notification poll failed")
+
+
+class PostgresBroker:
+    """Cross-worker delivery through LISTEN/NOTIFY."""
+
+    channel = "jifunze_notifications"
+    # NOTIFY payloads are capped at 8000 bytes
+    max_payload = 7000
+
+    def publish(self, user_public_ids):
+        chunks, current = [], []
+        for user_public_id in sorted(user_public_ids):
+            if current and len(",".join(current + [user_public_id])) > self.max_payload:
+                chunks.append(current)
+                current = []
+            current.append(user_public_id)
+        if current:
+            chunks.append(current)
+
+        with db.engine.connect() as connection:
+            for chunk in chunks:
+                connection.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": self.channel, "payload": ",".join(chunk)},
+                )
+            connection.commit()
+
+    def listen(self, app, hub):
+        while True:
+            try:
+                with app.app_context():
+                    raw = db.engine.raw_connection()
+                try:
+                    connection = raw.driver_connection
+                    connection.autocommit = True
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"LISTEN {self.channel}")
+                    while True:
+                        if select.select([connection], [], [], 30) == ([], [], []):
+                            continue
+                        connection.poll()
+                        users = set()
+                        while connection.notifies:
+                            users.update(connection.notifies.pop(0).payload.split(","))
+                        hub.dispatch(users)
+                finally:
+                    raw.invalidate()
+            except Exception:
+                logger.exception("Notification listener lost its connection; reconnecting")
+                time.sleep(5)
+
+
+class NotificationHub:
+    """
+    Per-process registry of open streams, fed by the broker's listener thread.
+    Every stream holds a server thread, so at most `max_streams` are open at
+    once (None: no limit); subscribe() returns None past that.
+    """
+
+    def __init__(self, broker, max_streams=None):
+        self.broker = broker
+        self.max_streams = max_streams
+        self._subscriptions = defaultdict(set)
+        self._streams = 0
+        self._lock = threading.Lock()
+        self._listener_pid = None
+
+    def subscribe(self, user_public_id):
+        self._ensure_listener()
+        subscription = Subscription(user_public_id)
+        with self._lock:
+            if self.max_streams is not None and self._streams >= self.max_streams:
+                return None
+            self._subscriptions[user_public_id].add(subscription)
+            self._streams += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_public_id)
+            if subscriptions is not None and subscription in subscriptions:
+                subscriptions.discard(subscription)
+                self._streams -= 1
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_public_id]
+
+    def subscribed_users(self):
+        with self._lock:
+            return list(self._subscriptions)
+
+    def dispatch(self, user_public_ids):
+        """Wake this process's streams for `user_public_ids`."""
+        with self._lock:
+            subscriptions = [sub for uid in user_public_ids for sub in self._subscriptions.get(uid, ())]
+        for subscription in subscriptions:
+            subscription.wake()
+
+    def publish(self, user_public_ids):
+        """Wake streams for `user_public_ids` in every worker."""
+        user_public_ids = set(user_public_ids)
+        if not user_public_ids:
+            return
+        self.dispatch(user_public_ids)
+        try:
+            self.broker.publish(user_public_ids)
+        except Exception:
+            # Streams resync on their next heartbeat anyway
+            logger.exception("Failed to publish notification change")
+
+    def _ensure_listener(self):
+        # One listener per process; a thread started before a fork does not survive it
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+        app = current_app._get_current_object()
+        thread = threading.Thread(
+            target=self.broker.listen, args=(app, self), name="notification-listener", daemon=True
+        )
+        thread.start()
+
+
+def get_notification_hub():
+    return current_app.extensions["notification_hub"]
+
+
+def publish_notification_changes(user_public_ids):
+    """Call after committing bulk notification writes for these users."""
+    get_notification_hub().publish(user_public_ids)
+
+
+# -----------------------------
+# ORM changes are published after commit
+# -----------------------------
+def _collect(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(PENDING_KEY, set()).add(target.user_public_id)
+
+
+def _publish_after_commit(session):
+    users = session.info.pop(PENDING_KEY, None)
+    if users and has_app_context() and "notification_hub" in current_app.extensions:
+        publish_notification_changes(users)
+
+
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
+
+
+event.listen(Notification, "after_insert", _collect)
+event.listen(Notification, "after_update", _collect)
+event.listen(Notification, "after_delete", _collect)
+event.listen(Session, "after_commit", _publish_after_commit)
+event.listen(Session, "after_soft_rollback", _discard_after_rollback)
+
+
+def init_notification_hub(app):
+    app.config.setdefault("NOTIFICATION_BROKER", "auto")
+    app.config.setdefault("NOTIFICATION_POLL_SECONDS", 2)
+    app.config.setdefault("NOTIFICATION_STREAM_HEARTBEAT_SECONDS", 15)
+    app.config.setdefault("NOTIFICATION_STREAM_MAX_SECONDS", 300)
+    app.config.setdefault("NOTIFICATION_STREAM_TICKET_SECONDS", 30)
+    # Open streams per worker process; the rest poll the unread count
+    app.config.setdefault("NOTIFICATION_STREAM_MAX_PER_WORKER", 8)
+    app.config.setdefault("NOTIFICATION_STREAM_BUSY_RETRY_SECONDS", 60)
+    # Ids in flight at once: 1000-user fan-out chunks from up to 4 job threads
+    app.config.setdefault("NOTIFICATION_STREAM_ID_OVERLAP", 5000)
+
+    broker = app.config["NOTIFICATION_BROKER"]
+    if broker == "auto":
+        uri = app.config.get("SQLALCHEMY_DATABASE_URI") or ""
+        broker = "postgres" if uri.startswith("postgres") else "polling"
+
+    max_streams = app.config["NOTIFICATION_STREAM_MAX_PER_WORKER"] or None
+    if broker == "postgres":
+        app.extensions["notification_hub"] = NotificationHub(PostgresBroker(), max_streams=max_streams)
+    else:
+        app.extensions["notification_hub"] = NotificationHub(
+            PollingBroker(interval=app.config["NOTIFICATION_POLL_SECONDS"]), max_streams=max_streams
+        )
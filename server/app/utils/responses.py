@@ -1,10 +1,12 @@
-def success_response(message, data=None, status_code=200):
+def success_response(message, data=None, status_code=200, headers=None):
     """
     Standard success JSON response
     """
     response = {"success": True, "message": message}
     if data is not None:
         response["data"] = data
+    if headers:
+        return response, status_code, headers
     return response, status_code
 
 
@@ -0,0 +1,218 @@
+"""
+JWT revocation store.
+
+Revoked token ids live in a shared backend (the `revoked_tokens` table, or
+Redis) so a logout is honoured by every gunicorn worker and survives
+restarts. With the database backend each worker keeps a bloom filter of
+revoked jtis: a token that is not in the filter is accepted without touching
+the database, and only possible positives are confirmed with a lookup.
+
+The filter picks up other workers' revocations incrementally every
+JWT_REVOCATION_REFRESH_SECONDS, and is rebuilt from scratch every
+JWT_REVOCATION_REBUILD_SECONDS. Ids are assigned when a row is inserted, not
+when it commits, so a concurrent transaction can make a lower id visible after
+a higher one: each refresh re-reads the last JWT_REVOCATION_SYNC_OVERLAP ids
+below the highest one seen instead of starting strictly above it.
+
+Expired rows are deleted by the job worker every JWT_REVOCATION_PURGE_SECONDS
+(or on demand by `flask purge-revoked-tokens`), never from the request path.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db, jwt
+from app.models.revoked_token import RevokedToken
+from app.utils.jobs import periodic
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings; no false negatives."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(int(capacity), 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, value):
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+class DatabaseRevocationBackend:
+    """Revocations stored in the revoked_tokens table."""
+
+    supports_sync = True
+
+    def add(self, jti, token_type, expires_at):
+        try:
+            db.session.add(RevokedToken(jti=jti, token_type=token_type, expires_at=expires_at))
+            db.session.commit()
+        except IntegrityError:
+            # Already revoked (e.g. a double logout)
+            db.session.rollback()
+
+    def contains(self, jti):
+        return db.session.query(RevokedToken.id).filter_by(jti=jti).first() is not None
+
+    def rows_after(self, last_id):
+        """(id, jti) of unexpired revocations with an id above `last_id`."""
+        now = datetime.now(timezone.utc)
+        return (
+            db.session.query(RevokedToken.id, RevokedToken.jti)
+            .filter(RevokedToken.id > last_id)
+            .filter((RevokedToken.expires_at.is_(None)) | (RevokedToken.expires_at >= now))
+            .order_by(RevokedToken.id)
+            .all()
+        )
+
+
+class RedisRevocationBackend:
+    """Revocations stored as Redis keys that expire together with the token."""
+
+    supports_sync = False
+    prefix = "jifunze:revoked:"
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("JWT_REVOCATION_BACKEND=redis requires the 'redis' package")
+        self.client = redis.Redis.from_url(url)
+
+    def add(self, jti, token_type, expires_at):
+        key = self.prefix + jti
+        if expires_at is None:
+            self.client.set(key, token_type)
+            return
+        ttl = int((expires_at - datetime.now(timezone.utc)).total_seconds())
+        if ttl > 0:
+            self.client.set(key, token_type, ex=ttl)
+
+    def contains(self, jti):
+        return bool(self.client.exists(self.prefix + jti))
+
+
+class RevocationStore:
+    """Revoke tokens and answer "is this jti revoked?" for the JWT loader."""
+
+    def __init__(self, backend, refresh_interval=2.0, rebuild_interval=3600.0,
+                 capacity=10000, error_rate=0.001, sync_overlap=100):
+        self.backend = backend
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.sync_overlap = sync_overlap
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_id = 0
+        self._refreshed_at = 0.0
+        self._rebuilt_at = 0.0
+
+    def revoke(self, jti, token_type="access", expires_at=None):
+        self.backend.add(jti, token_type, expires_at)
+        if self._bloom is not None:
+            with self._lock:
+                self._bloom.add(jti)
+
+    def revoke_payload(self, payload):
+        """Revoke a decoded JWT (as returned by get_jwt())."""
+        exp = payload.get("exp")
+        expires_at = datetime.fromtimestamp(exp, tz=timezone.utc) if exp else None
+        self.revoke(payload["jti"], payload.get("type", "access"), expires_at)
+
+    def is_revoked(self, jti):
+        if not self.backend.supports_sync:
+            return self.backend.contains(jti)
+
+        self._sync()
+        if jti not in self._bloom:
+            return False
+        return self.backend.contains(jti)
+
+    def rebuild(self):
+        """Reload the filter from the backend; returns the number of revocations loaded."""
+        rows = self.backend.rows_after(0)
+        bloom = BloomFilter(max(self.capacity, len(rows) * 2), self.error_rate)
+        for _, jti in rows:
+            bloom.add(jti)
+        with self._lock:
+            self._bloom = bloom
+            self._last_id = rows[-1][0] if rows else 0
+            self._refreshed_at = self._rebuilt_at = time.monotonic()
+        return len(rows)
+
+    def _sync(self):
+        now = time.monotonic()
+        if self._bloom is None or now - self._rebuilt_at >= self.rebuild_interval:
+            self.rebuild()
+            return
+        if now - self._refreshed_at < self.refresh_interval:
+            return
+
+        rows = self.backend.rows_after(max(self._last_id - self.sync_overlap, 0))
+        with self._lock:
+            for row_id, jti in rows:
+                # The overlap re-reads rows already added; don't count them twice
+                if jti not in self._bloom:
+                    self._bloom.add(jti)
+                self._last_id = max(self._last_id, row_id)
+            self._refreshed_at = now
+        if self._bloom.count > self.capacity * 2:
+            # Filter is filling up; resize before false positives pile up
+            self.rebuild()
+
+
+def get_revocation_store():
+    return current_app.extensions["jwt_revocation"]
+
+
+@periodic("JWT_REVOCATION_PURGE_SECONDS", 3600)
+def purge_expired_revocations():
+    """Drop revocations of tokens that have expired anyway (database backend; Redis keys expire)."""
+    if current_app.config.get("JWT_REVOCATION_BACKEND", "database") != "database":
+        return 0
+    return RevokedToken.purge_expired()
+
+
+def _token_is_revoked(jwt_header, jwt_payload):
+    return get_revocation_store().is_revoked(jwt_payload["jti"])
+
+
+def init_revocation_store(app):
+    app.config.setdefault("JWT_REVOCATION_BACKEND", "database")
+    app.config.setdefault("JWT_REVOCATION_REFRESH_SECONDS", 2)
+    app.config.setdefault("JWT_REVOCATION_REBUILD_SECONDS", 3600)
+    app.config.setdefault("JWT_REVOCATION_SYNC_OVERLAP", 100)
+    app.config.setdefault("JWT_REVOCATION_PURGE_SECONDS", 3600)
+
+    if app.config["JWT_REVOCATION_BACKEND"] == "redis":
+        backend = RedisRevocationBackend(app.config["JWT_REVOCATION_REDIS_URL"])
+    else:
+        backend = DatabaseRevocationBackend()
+
+    app.extensions["jwt_revocation"] = RevocationStore(
+        backend,
+        refresh_interval=app.config["JWT_REVOCATION_REFRESH_SECONDS"],
+        rebuild_interval=app.config["JWT_REVOCATION_REBUILD_SECONDS"],
+        sync_overlap=app.config["JWT_REVOCATION_SYNC_OVERLAP"],
+    )
+    jwt.token_in_blocklist_loader(_token_is_revoked)
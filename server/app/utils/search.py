@@ -0,0 +1,285 @@
+"""
+Full-text search over users, courses, resources and messages.
+
+All searchable rows share one `search_index` table keyed by a document key
+(entity id * 4 + type), kept in sync by mapper events on the four models:
+
+- SQLite: an FTS5 virtual table, ranked with bm25()
+- PostgreSQL: a table with a weighted tsvector column and a GIN index,
+  ranked with ts_rank()
+- anything else: a plain table matched with LIKE (no ranking)
+
+Every query term is matched as a prefix, and all terms must match.
+Documents carry school_id and course_id so results can be scoped to the
+caller.
+"""
+import re
+
+from sqlalchemy import bindparam, event, inspect, select, text, Integer
+
+from app.extensions import db
+from app.models.course import Course
+from app.models.message import Message
+from app.models.resource import Resource
+from app.models.user import User
+
+SEARCH_TABLE = "search_index"
+ENTITY_TYPES = ("user", "course", "resource", "message")
+MAX_TERMS = 8
+
+# Title matches outrank body matches
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+
+def _doc_key(entity_type, entity_id):
+    return entity_id * len(ENTITY_TYPES) + ENTITY_TYPES.index(entity_type)
+
+
+def _dialect(connection):
+    name = connection.dialect.name
+    return name if name in ("sqlite", "postgresql") else "generic"
+
+
+# -----------------------------
+# DDL
+# -----------------------------
+def create_search_table(connection):
+    dialect = _dialect(connection)
+    if dialect == "sqlite":
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "entity_type UNINDEXED, entity_id UNINDEXED, school_id UNINDEXED, course_id UNINDEXED, "
+            "title, body, tokenize='unicode61 remove_diacritics 2')"
+        ))
+        return
+
+    document = ", document TSVECTOR" if dialect == "postgresql" else ""
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "doc_key BIGINT PRIMARY KEY, entity_type VARCHAR(20) NOT NULL, entity_id INTEGER NOT NULL, "
+        f"school_id INTEGER, course_id INTEGER, title TEXT, body TEXT{document})"
+    ))
+    connection.execute(text(
+        f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_school_id ON {SEARCH_TABLE} (school_id)"
+    ))
+    if dialect == "postgresql":
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)"
+        ))
+
+
+def drop_search_table(connection):
+    connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+
+
+# -----------------------------
+# Documents
+# -----------------------------
+def _user_document(connection, user):
+    email = user.email or ""
+    # Index the email both whole and split, so "jane" finds jane.doe@school.org
+    return user.school_id, None, user.name, f"{email} {re.sub(r'[^\w]+', ' ', email)}"
+
+
+def _course_document(connection, course):
+    return course.school_id, course.id, course.title, course.description
+
+
+def _course_school_id(connection, course_id):
+    return connection.execute(select(Course.school_id).where(Course.id == course_id)).scalar()
+
+
+def _resource_document(connection, resource):
+    return _course_school_id(connection, resource.course_id), resource.course_id, resource.title, resource.type
+
+
+def _message_document(connection, message):
+    return _course_school_id(connection, message.course_id), message.course_id, None, message.content
+
+
+# model -> (entity type, document builder, attributes that feed the document)
+INDEXED_MODELS = {
+    User: ("user", _user_document, ("name", "email", "school_id")),
+    Course: ("course", _course_document, ("title", "description", "school_id")),
+    Resource: ("resource", _resource_document, ("title", "type", "course_id")),
+    Message: ("message", _message_document, ("content", "course_id")),
+}
+
+
+def index_document(connection, entity_type, entity_id, school_id, course_id, title, body):
+    params = {
+        "doc_key": _doc_key(entity_type, entity_id), "entity_type": entity_type,
+        "entity_id": entity_id, "school_id": school_id, "course_id": course_id,
+        "title": title or "", "body": body or "",
+    }
+    dialect = _dialect(connection)
+    if dialect == "sqlite":
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :doc_key"), params)
+        connection.execute(text(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, entity_type, entity_id, school_id, course_id, title, body) "
+            "VALUES (:doc_key, :entity_type, :entity_id, :school_id, :course_id, :title, :body)"
+        ), params)
+    elif dialect == "postgresql":
+        connection.execute(text(
+            f"INSERT INTO {SEARCH_TABLE} "
+            "(doc_key, entity_type, entity_id, school_id, course_id, title, body, document) "
+            "VALUES (:doc_key, :entity_type, :entity_id, :school_id, :course_id, :title, :body, "
+            "setweight(to_tsvector('simple', :title), 'A') || setweight(to_tsvector('simple', :body), 'B')) "
+            "ON CONFLICT (doc_key) DO UPDATE SET school_id = EXCLUDED.school_id, "
+            "course_id = EXCLUDED.course_id, title = EXCLUDED.title, body = EXCLUDED.body, "
+            "document = EXCLUDED.document"
+        ), params)
+    else:
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE doc_key = :doc_key"), params)
+        connection.execute(text(
+            f"INSERT INTO {SEARCH_TABLE} (doc_key, entity_type, entity_id, school_id, course_id, title, body) "
+            "VALUES (:doc_key, :entity_type, :entity_id, :school_id, :course_id, :title, :body)"
+        ), params)
+
+
+def remove_document(connection, entity_type, entity_id):
+    key_column = "rowid" if _dialect(connection) == "sqlite" else "doc_key"
+    connection.execute(
+        text(f"DELETE FROM {SEARCH_TABLE} WHERE {key_column} = :doc_key"),
+        {"doc_key": _doc_key(entity_type, entity_id)},
+    )
+
+
+def _index_target(connection, target):
+    entity_type, build, _ = INDEXED_MODELS[type(target)]
+    index_document(connection, entity_type, target.id, *build(connection, target))
+
+
+def index_objects(objects, connection=None):
+    """Index rows written by bulk statements, which skip the mapper events."""
+    connection = connection or db.session.connection()
+    for obj in objects:
+        _index_target(connection, obj)
+
+
+def _after_insert(mapper, connection, target):
+    _index_target(connection, target)
+
+
+def _after_update(mapper, connection, target):
+    entity_type, _, attrs = INDEXED_MODELS[type(target)]
+    state = inspect(target)
+    if not any(state.attrs[attr].history.has_changes() for attr in attrs):
+        return
+    _index_target(connection, target)
+
+    if entity_type == "course" and state.attrs.school_id.history.has_changes():
+        # Resources and messages inherit the course's school
+        connection.execute(
+            text(f"UPDATE {SEARCH_TABLE} SET school_id = :school_id WHERE course_id = :course_id "
+                 "AND entity_type IN ('resource', 'message')"),
+            {"school_id": target.school_id, "course_id": target.id},
+        )
+
+
+def _after_delete(mapper, connection, target):
+    remove_document(connection, INDEXED_MODELS[type(target)][0], target.id)
+
+
+def _create_on_metadata_create(target, connection, **kw):
+    create_search_table(connection)
+
+
+def _drop_on_metadata_drop(target, connection, **kw):
+    drop_search_table(connection)
+
+
+def register_search_events():
+    """Keep search_index in sync with model writes and create_all/drop_all (idempotent)."""
+    if event.contains(db.metadata, "after_create", _create_on_metadata_create):
+        return
+    event.listen(db.metadata, "after_create", _create_on_metadata_create)
+    event.listen(db.metadata, "before_drop", _drop_on_metadata_drop)
+    for model in INDEXED_MODELS:
+        event.listen(model, "after_insert", _after_insert)
+        event.listen(model, "after_update", _after_update)
+        event.listen(model, "after_delete", _after_delete)
+
+
+def reindex():
+    """Rebuild search_index from the source tables; returns the number of documents."""
+    connection = db.session.connection()
+    drop_search_table(connection)
+    create_search_table(connection)
+    count = 0
+    for model in INDEXED_MODELS:
+        for row in db.session.query(model).yield_per(500):
+            _index_target(connection, row)
+            count += 1
+    db.session.commit()
+    return count
+
+
+# -----------------------------
+# Queries
+# -----------------------------
+def _terms(q):
+    return re.findall(r"\w+", (q or "").lower())[:MAX_TERMS]
+
+
+def _match_clause(dialect, terms, params):
+    """WHERE fragment + rank expression for `terms` (all must match, as prefixes)."""
+    if dialect == "sqlite":
+        params["match"] = " ".join(f'"{term}"*' for term in terms)
+        rank = f"-bm25({SEARCH_TABLE}, 0, 0, 0, 0, {TITLE_WEIGHT}, {BODY_WEIGHT})"
+        return f"{SEARCH_TABLE} MATCH :match", rank
+    if dialect == "postgresql":
+        params["match"] = " & ".join(f"{term}:*" for term in terms)
+        return ("document @@ to_tsquery('simple', :match)",
+                "ts_rank(document, to_tsquery('simple', :match))")
+
+    clauses = []
+    for i, term in enumerate(terms):
+        params[f"term_{i}"] = f"%{term}%"
+        clauses.append(f"(lower(title) LIKE :term_{i} OR lower(body) LIKE :term_{i})")
+    return " AND ".join(clauses), "0"
+
+
+def matching_ids(q, entity_type):
+    """
+    Selectable of entity ids whose document matches `q`, for use in
+    `Model.id.in_(...)`. Returns None when `q` has no searchable terms.
+    """
+    terms = _terms(q)
+    if not terms:
+        return None
+    params = {"entity_type": entity_type}
+    where, _ = _match_clause(_dialect(db.session.connection()), terms, params)
+    return (
+        text(f"SELECT entity_id FROM {SEARCH_TABLE} WHERE {where} AND entity_type = :entity_type")
+        .bindparams(**params)
+        .columns(entity_id=Integer)
+    )
+
+
+def search(q, types=ENTITY_TYPES, school_ids=(), course_ids=None, limit=20, offset=0):
+    """
+    Ranked (entity_type, entity_id, score) matches for `q` within `school_ids`.
+    When `course_ids` is given, resources and messages are further limited to
+    those courses.
+    """
+    terms = _terms(q)
+    if not terms or not school_ids or not types:
+        return []
+
+    params = {"types": list(types), "school_ids": list(school_ids), "limit": limit, "offset": offset}
+    where, rank = _match_clause(_dialect(db.session.connection()), terms, params)
+    clauses = [where, "entity_type IN :types", "school_id IN :school_ids"]
+    bind = [bindparam("types", expanding=True), bindparam("school_ids", expanding=True)]
+    if course_ids is not None:
+        params["course_ids"] = list(course_ids) or [-1]
+        clauses.append("(entity_type IN ('user', 'course') OR course_id IN :course_ids)")
+        bind.append(bindparam("course_ids", expanding=True))
+
+    sql = text(
+        f"SELECT entity_type, entity_id, {rank} AS score FROM {SEARCH_TABLE} "
+        f"WHERE {' AND '.join(clauses)} ORDER BY score DESC, entity_id LIMIT :limit OFFSET :offset"
+    ).bindparams(*bind)
+    return [(row.entity_type, int(row.entity_id), float(row.score))
+            for row in db.session.execute(sql, params)]
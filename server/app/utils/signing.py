@@ -0,0 +1,80 @@
+"""
+Signed download URLs for /uploads.
+
+Resource responses carry upload URLs with an expiry and an HMAC-SHA256
+signature over (file key, expiry):
+
+    /uploads/<key>?expires=<unix time>&signature=<base64url>
+
+serve_upload() recomputes the signature and compares it in constant time, so
+access control on file downloads needs no JWT and no database query: being
+able to read the resource through the API is what grants the link.
+
+Expiries are aligned to UPLOAD_URL_TTL_SECONDS windows, so the same file gets
+the same URL for a whole window (browser caches keep working) and every link
+stays valid for between one and two windows. Response ETags that embed signed
+URLs must include signing_window() so a 304 never revives an expired link.
+"""
+import base64
+import hashlib
+import hmac
+import time
+from urllib.parse import urlencode
+
+from flask import current_app
+
+UPLOAD_PREFIX = "/uploads/"
+DEFAULT_TTL_SECONDS = 3600
+
+
+def _signing_key():
+    key = current_app.config.get("UPLOAD_SIGNING_KEY")
+    if key:
+        return key.encode("utf-8") if isinstance(key, str) else key
+    # Derived so the app secret itself is never used directly as an HMAC key
+    secret = current_app.config["SECRET_KEY"]
+    secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+    return hmac.new(secret, b"jifunze-upload-urls", hashlib.sha256).digest()
+
+
+def _signature(key, expires):
+    digest = hmac.new(_signing_key(), f"{key}\n{expires}".encode("utf-8"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def _ttl():
+    return current_app.config.get("UPLOAD_URL_TTL_SECONDS", DEFAULT_TTL_SECONDS)
+
+
+def signing_window(now=None):
+    """Index of the current signing window; changes whenever minted URLs do."""
+    return int(now if now is not None else time.time()) // _ttl()
+
+
+def sign_upload_url(url, now=None):
+    """Signed version of an /uploads URL; any other URL is returned unchanged."""
+    if not url or not url.startswith(UPLOAD_PREFIX):
+        return url
+    key = url[len(UPLOAD_PREFIX):]
+    expires = (signing_window(now) + 2) * _ttl()
+    return f"{url}?{urlencode({'expires': expires, 'signature': _signature(key, expires)})}"
+
+
+def strip_upload_signature(url):
+    """Stored form of an /uploads URL that may have come back signed from a client."""
+    if url and url.startswith(UPLOAD_PREFIX):
+        return url.split("?", 1)[0]
+    return url
+
+
+def verify_upload_signature(key, expires, signature, now=None):
+    """True if `signature` is valid for `key` and `expires` has not passed."""
+    if not expires or not signature:
+        return False
+    try:
+        expires = int(expires)
+    except ValueError:
+        return False
+    if expires < (now if now is not None else time.time()):
+        return False
+    return hmac.compare_digest(_signature(key, expires), signature)
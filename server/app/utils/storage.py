@@ -0,0 +1,309 @@
+"""
+Content-addressed file storage for uploads.
+
+Uploads are copied in STORAGE_CHUNK_SIZE chunks to a temporary file while
+being hashed, then stored under their SHA-256:
+
+    <sha256[:2]>/<sha256><ext>
+
+so identical files uploaded to different courses are stored once, and two
+different files with the same name never overwrite each other. Files are
+immutable once stored, which is what lets /uploads cache them forever.
+
+Text documents also get precompressed .gz (and .br, when the optional
+`brotli` package is installed) siblings, kept only when smaller, for
+/uploads to serve to clients that accept them (UPLOAD_PRECOMPRESS).
+
+Backends (STORAGE_BACKEND):
+
+- "local" (default): files under UPLOAD_FOLDER, served from /uploads/<key>
+- "s3": any S3-compatible store (AWS, MinIO, ...) via boto3, configured with
+  STORAGE_S3_BUCKET, STORAGE_S3_ENDPOINT_URL and STORAGE_S3_PUBLIC_URL. Without
+  a public URL, objects are also linked as /uploads/<key>, which redirects to
+  a presigned URL minted per download (STORAGE_S3_PRESIGN_SECONDS), so what
+  is stored on the resource is short and never expires.
+"""
+import gzip
+import hashlib
+import importlib.util
+import mimetypes
+import os
+import tempfile
+from collections import namedtuple
+from contextlib import contextmanager
+
+from flask import current_app
+from werkzeug.utils import secure_filename
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/rtf",
+    "application/xml",
+    "image/svg+xml",
+}
+# Smaller files gain too little to be worth a second copy
+MIN_COMPRESS_SIZE = 1024
+
+StoredFile = namedtuple("StoredFile", ["key", "url", "sha256", "size", "mime_type"])
+
+
+def _extension(filename):
+    ext = os.path.splitext(secure_filename(filename or ""))[1].lower()
+    # Keep keys predictable: short alphanumeric extensions only
+    return ext if 1 < len(ext) <= 10 and ext[1:].isalnum() else ""
+
+
+def _mime_type(filename, content_type=None):
+    guessed, _ = mimetypes.guess_type(filename or "")
+    if guessed:
+        return guessed
+    if content_type and content_type != "application/octet-stream":
+        return content_type
+    return "application/octet-stream"
+
+
+def is_compressible(mime_type):
+    return bool(mime_type) and (mime_type.startswith("text/") or mime_type in COMPRESSIBLE_TYPES)
+
+
+def _gzip_writer(out):
+    return gzip.GzipFile(fileobj=out, mode="wb", compresslevel=9, mtime=0)
+
+
+def _brotli_writer(out):
+    import brotli
+
+    class _Writer:
+        def __init__(self):
+            self._compressor = brotli.Compressor(quality=11)
+
+        def write(self, data):
+            out.write(self._compressor.process(data))
+
+        def close(self):
+            out.write(self._compressor.finish())
+
+    return _Writer()
+
+
+def _encoders():
+    encoders = [("gzip", ".gz", _gzip_writer)]
+    if importlib.util.find_spec("brotli") is not None:
+        encoders.insert(0, ("br", ".br", _brotli_writer))
+    return encoders
+
+
+def precompress(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Write compressed siblings of `path`; returns the encodings kept."""
+    size = os.path.getsize(path)
+    kept = []
+    if size < MIN_COMPRESS_SIZE:
+        return kept
+    for encoding, suffix, writer in _encoders():
+        target = path + suffix
+        if os.path.exists(target):
+            kept.append(encoding)
+            continue
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".compress-")
+        try:
+            with os.fdopen(fd, "wb") as out, open(path, "rb") as src:
+                compressor = writer(out)
+                for chunk in iter(lambda: src.read(chunk_size), b""):
+                    compressor.write(chunk)
+                compressor.close()
+            if os.path.getsize(tmp_path) < size:
+                os.replace(tmp_path, target)
+                kept.append(encoding)
+            else:
+                os.unlink(tmp_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return kept
+
+
+def content_key(sha256, filename):
+    return f"{sha256[:2]}/{sha256}{_extension(filename)}"
+
+
+def _spool(stream, directory, chunk_size):
+    """Copy `stream` to a temp file in `directory`; returns (path, sha256, size)."""
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest(), size
+
+
+class LocalStorage:
+    """Files on the local filesystem under `root`."""
+
+    def __init__(self, root, chunk_size=DEFAULT_CHUNK_SIZE, url_prefix="/uploads", precompress=True):
+        self.root = root
+        self.chunk_size = chunk_size
+        self.url_prefix = url_prefix
+        self.precompress = precompress
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def url(self, key):
+        return f"{self.url_prefix}/{key}"
+
+    def download_url(self, key):
+        """Where /uploads should redirect to; None as the file is served from disk."""
+        return None
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def open(self, key):
+        return open(self.path(key), "rb")
+
+    @contextmanager
+    def local_copy(self, key):
+        """Filesystem path holding the object's bytes."""
+        yield self.path(key)
+
+    def put_file(self, key, path):
+        """Move the file at `path` into storage under `key` (derived files such as previews)."""
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+
+    def save(self, stream, filename, content_type=None):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path, sha256, size = _spool(stream, self.root, self.chunk_size)
+        key = content_key(sha256, filename)
+        target = self.path(key)
+        mime_type = _mime_type(filename, content_type)
+        if os.path.exists(target):
+            # Same content already stored
+            os.unlink(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Atomic: readers never see a half-written file
+            os.replace(tmp_path, target)
+            if self.precompress and is_compressible(mime_type):
+                precompress(target, self.chunk_size)
+        return StoredFile(key, self.url(key), sha256, size, mime_type)
+
+
+class S3Storage:
+    """Files in an S3-compatible bucket."""
+
+    def __init__(self, bucket, endpoint_url=None, public_url=None, prefix="",
+                 chunk_size=DEFAULT_CHUNK_SIZE, url_prefix="/uploads", presign_seconds=300):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the 'boto3' package")
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.prefix = prefix
+        self.chunk_size = chunk_size
+        self.url_prefix = url_prefix
+        self.presign_seconds = presign_seconds
+
+    def _object_key(self, key):
+        return f"{self.prefix}{key}"
+
+    def url(self, key):
+        """Stable URL to store on the resource (never a presigned one, which expires)."""
+        if self.public_url:
+            return f"{self.public_url}/{self._object_key(key)}"
+        return f"{self.url_prefix}/{key}"
+
+    def download_url(self, key):
+        """Presigned URL for /uploads to redirect to, minted per download."""
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self._object_key(key)},
+            ExpiresIn=self.presign_seconds,
+        )
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError:
+            return False
+
+    def open(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))["Body"]
+
+    @contextmanager
+    def local_copy(self, key):
+        """Temporary local file holding the object's bytes."""
+        fd, tmp_path = tempfile.mkstemp(prefix=".download-")
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, self._object_key(key), tmp_path)
+            yield tmp_path
+        finally:
+            os.unlink(tmp_path)
+
+    def put_file(self, key, path):
+        """Upload the file at `path` under `key` (derived files such as previews)."""
+        mime_type = _mime_type(key)
+        self.client.upload_file(
+            path, self.bucket, self._object_key(key),
+            ExtraArgs={"ContentType": mime_type, "CacheControl": "public, max-age=31536000, immutable"},
+        )
+        os.unlink(path)
+
+    def save(self, stream, filename, content_type=None):
+        tmp_path, sha256, size = _spool(stream, tempfile.gettempdir(), self.chunk_size)
+        key = content_key(sha256, filename)
+        mime_type = _mime_type(filename, content_type)
+        try:
+            if not self.exists(key):
+                self.client.upload_file(
+                    tmp_path, self.bucket, self._object_key(key),
+                    ExtraArgs={"ContentType": mime_type, "CacheControl": "public, max-age=31536000, immutable"},
+                )
+        finally:
+            os.unlink(tmp_path)
+        return StoredFile(key, self.url(key), sha256, size, mime_type)
+
+
+def get_storage():
+    return current_app.extensions["storage"]
+
+
+def init_storage(app):
+    app.config.setdefault("STORAGE_BACKEND", "local")
+    app.config.setdefault("UPLOAD_FOLDER", os.path.join(os.getcwd(), "uploads"))
+    app.config.setdefault("STORAGE_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+    app.config.setdefault("UPLOAD_PRECOMPRESS", True)
+
+    chunk_size = app.config["STORAGE_CHUNK_SIZE"]
+    if app.config["STORAGE_BACKEND"] == "s3":
+        storage = S3Storage(
+            app.config["STORAGE_S3_BUCKET"],
+            endpoint_url=app.config.get("STORAGE_S3_ENDPOINT_URL"),
+            public_url=app.config.get("STORAGE_S3_PUBLIC_URL"),
+            prefix=app.config.get("STORAGE_S3_PREFIX", ""),
+            chunk_size=chunk_size,
+            presign_seconds=app.config.get("STORAGE_S3_PRESIGN_SECONDS", 300),
+        )
+    else:
+        storage = LocalStorage(
+            app.config["UPLOAD_FOLDER"], chunk_size=chunk_size, precompress=app.config["UPLOAD_PRECOMPRESS"]
+        )
+    app.extensions["storage"] = storage
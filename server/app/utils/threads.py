@@ -0,0 +1,81 @@
+"""
+Message threads.
+
+A thread is a message plus every reply below it. load_threads() fetches the
+subtrees under any number of root messages with one recursive CTE, walking
+parent_id downwards level by level, so the rows come back breadth-first and
+a size cap keeps whole upper levels rather than one deep branch.
+build_threads() then nests them in a single pass.
+
+Depth and size are capped by MESSAGE_THREAD_MAX_DEPTH and
+MESSAGE_THREAD_MAX_NODES; callers may ask for less, never more.
+"""
+from flask import current_app
+from sqlalchemy import literal, select
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db
+from app.models.message import Message
+
+DEFAULT_MAX_DEPTH = 10
+DEFAULT_MAX_NODES = 500
+
+
+def thread_limits(max_depth=None, max_nodes=None):
+    """Requested (max_depth, max_nodes) clamped to the configured caps."""
+    depth_cap = current_app.config.get("MESSAGE_THREAD_MAX_DEPTH", DEFAULT_MAX_DEPTH)
+    nodes_cap = current_app.config.get("MESSAGE_THREAD_MAX_NODES", DEFAULT_MAX_NODES)
+    depth = depth_cap if max_depth is None else min(max(max_depth, 0), depth_cap)
+    nodes = nodes_cap if max_nodes is None else min(max(max_nodes, 1), nodes_cap)
+    return depth, nodes
+
+
+def load_threads(root_ids, max_depth, max_nodes):
+    """
+    ([(message, depth)], truncated) for the roots and their replies down to
+    `max_depth` levels, at most `max_nodes` rows. Rows are ordered by depth,
+    then timestamp.
+    """
+    root_ids = list(root_ids)
+    if not root_ids:
+        return [], False
+
+    tree = (
+        select(Message.id, Message.parent_id, literal(0).label("depth"))
+        .where(Message.id.in_(root_ids))
+        .cte("thread", recursive=True)
+    )
+    tree = tree.union_all(
+        select(Message.id, Message.parent_id, tree.c.depth + 1)
+        .join(tree, Message.parent_id == tree.c.id)
+        .where(tree.c.depth < max_depth)
+    )
+
+    rows = (
+        db.session.query(Message, tree.c.depth)
+        .join(tree, Message.id == tree.c.id)
+        .options(joinedload(Message.user), joinedload(Message.course))
+        .order_by(tree.c.depth, Message.timestamp, Message.id)
+        .limit(max_nodes + 1)
+        .all()
+    )
+    truncated = len(rows) > max_nodes
+    return rows[:max_nodes], truncated
+
+
+def build_threads(rows, schema, root_ids):
+    """
+    Nest (message, depth) rows into trees; returns the roots in `root_ids`
+    order, each serialized with `schema` plus `depth` and `replies`.
+    """
+    messages = [message for message, _ in rows]
+    nodes = {}
+    for (message, depth), data in zip(rows, schema.dump(messages, many=True)):
+        data["depth"] = depth
+        data["replies"] = []
+        nodes[message.id] = data
+        # Parents always come first (rows are ordered by depth)
+        if depth > 0 and message.parent_id in nodes:
+            nodes[message.parent_id]["replies"].append(data)
+
+    return [nodes[root_id] for root_id in root_ids if root_id in nodes]
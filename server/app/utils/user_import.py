@@ -0,0 +1,173 @@
+"""
+Bulk user import from CSV.
+
+    name,email,role,password
+    Jane Doe,jane@school.ac.ke,student,secret123
+
+`role` may be omitted (defaults to student). Every row is validated before
+anything is written: per-row field checks, duplicates within the file, and
+existing accounts with a single IN query for all emails. The valid rows are
+then handed to the job worker (USER_IMPORT_JOB): thousands of bcrypt hashes
+would hold a request worker for minutes. The job checks the emails again,
+hashes passwords in parallel across USER_IMPORT_PROCESSES processes (default:
+one per CPU), and inserts users in chunks of USER_IMPORT_CHUNK_SIZE with
+bulk_insert_mappings in one transaction. The rows, passwords included, are
+removed from the stored job once it finishes.
+"""
+import csv
+import io
+import os
+import uuid
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models.user import User
+from app.schemas.user import UserImportRowSchema
+from app.utils.jobs import job_handler
+from app.utils.passwords import hash_passwords
+from app.utils.search import index_objects
+
+DEFAULT_MAX_ROWS = 5000
+DEFAULT_CHUNK_SIZE = 500
+COLUMNS = ("name", "email", "role", "password")
+USER_IMPORT_JOB = "user_import"
+
+row_schema = UserImportRowSchema()
+
+
+class ImportFormatError(ValueError):
+    """The upload is not a CSV file this importer can read."""
+
+
+def read_rows(text):
+    """[(line number, {column: value})] from CSV text with a header row."""
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    if not reader.fieldnames:
+        raise ImportFormatError("The file is empty.")
+    reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames]
+    missing = [column for column in ("name", "email", "password") if column not in reader.fieldnames]
+    if missing:
+        raise ImportFormatError(f"Missing column(s): {', '.join(missing)}.")
+
+    max_rows = current_app.config.get("USER_IMPORT_MAX_ROWS", DEFAULT_MAX_ROWS)
+    rows = []
+    try:
+        for record in reader:
+            values = {
+                column: (record.get(column) or "").strip()
+                for column in COLUMNS if record.get(column) not in (None, "")
+            }
+            if not values:
+                # Blank line
+                continue
+            rows.append((reader.line_num, values))
+            if len(rows) > max_rows:
+                raise ImportFormatError(f"At most {max_rows} rows per import.")
+    except csv.Error as e:
+        raise ImportFormatError(f"Line {reader.line_num}: {e}")
+    if not rows:
+        raise ImportFormatError("The file has no rows.")
+    return rows
+
+
+def validate_rows(rows):
+    """
+    (valid rows, error report). Valid rows are (line, data) with the email
+    lowercased; the report has one entry per rejected line.
+    """
+    errors = {}
+    loaded = []
+    for line, values in rows:
+        messages = row_schema.validate(values)
+        if messages:
+            errors[line] = {"line": line, "email": values.get("email"), "errors": messages}
+            continue
+        data = row_schema.load(values)
+        data["email"] = data["email"].lower()
+        loaded.append((line, data))
+
+    # Duplicates within the file: the first occurrence wins
+    first_line = {}
+    for line, data in loaded:
+        if data["email"] in first_line:
+            errors[line] = {
+                "line": line, "email": data["email"],
+                "errors": {"email": [f"Duplicate of line {first_line[data['email']]}"]},
+            }
+        else:
+            first_line[data["email"]] = line
+
+    # Existing accounts: one query for every email in the file
+    taken = set()
+    if first_line:
+        # Stored emails are lowercased by the model, so the unique index serves this
+        taken = set(db.session.execute(
+            select(User.email).where(User.email.in_(list(first_line)))
+        ).scalars())
+    for email in taken:
+        line = first_line[email]
+        errors[line] = {"line": line, "email": email, "errors": {"email": ["Email already registered"]}}
+
+    valid = [(line, data) for line, data in loaded if line not in errors]
+    return valid, [errors[line] for line in sorted(errors)]
+
+
+def create_users(rows, school_id):
+    """Hash and insert validated rows; the caller commits. Returns the new users' public_ids."""
+    if not rows:
+        return []
+    processes = current_app.config.get("USER_IMPORT_PROCESSES") or os.cpu_count()
+    hashes = hash_passwords([data["password"] for _, data in rows], processes=processes)
+    now = datetime.now(timezone.utc)
+    mappings = [
+        {
+            "public_id": str(uuid.uuid4()),
+            "name": data["name"],
+            "email": data["email"],
+            "role": data["role"],
+            "school_id": school_id,
+            "password_hash": password_hash,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for (_, data), password_hash in zip(rows, hashes)
+    ]
+
+    chunk_size = current_app.config.get("USER_IMPORT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+    for start in range(0, len(mappings), chunk_size):
+        chunk = mappings[start:start + chunk_size]
+        db.session.bulk_insert_mappings(User, chunk)
+        # Bulk inserts skip the mapper events that maintain the search index
+        public_ids = [mapping["public_id"] for mapping in chunk]
+        index_objects(User.query.filter(User.public_id.in_(public_ids)).all())
+    return [mapping["public_id"] for mapping in mappings]
+
+
+def import_payload(valid, report, school_id, skip_invalid):
+    """Job payload for validated rows; `report` holds the rows already rejected."""
+    return {
+        "school_id": school_id,
+        "skip_invalid": skip_invalid,
+        "rows": [[line, data] for line, data in valid],
+        "errors": report,
+    }
+
+
+@job_handler(USER_IMPORT_JOB, sensitive=("rows",))
+def run_user_import(payload):
+    """
+    Create the queued users. Emails registered since the upload was checked
+    are rejected like any other invalid row: nothing is created unless the
+    import was started with skip_invalid.
+    """
+    valid, late = validate_rows([(line, data) for line, data in payload["rows"]])
+    report = sorted(payload["errors"] + late, key=lambda entry: entry["line"])
+    if late and not payload["skip_invalid"]:
+        return {"created": 0, "skipped": len(report), "public_ids": [], "errors": report}
+
+    public_ids = create_users(valid, payload["school_id"])
+    db.session.commit()
+    return {"created": len(public_ids), "skipped": len(report), "public_ids": public_ids, "errors": report}
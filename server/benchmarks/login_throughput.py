@@ -0,0 +1,89 @@
+"""
+Login throughput under concurrent load, per password-hashing executor.
+
+Creates a throwaway SQLite database with a handful of users, then fires
+`--requests` logins at POST /api/auth/login from `--concurrency` client threads
+for each executor mode and prints requests/second.
+
+    cd server
+    python benchmarks/login_throughput.py --rounds 12 --concurrency 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+USERS = 8
+PASSWORD = "password123"
+
+
+def build_app(db_path, rounds):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("FLASK_ENV", "development")
+    os.environ["QUERY_INSTRUMENTATION"] = "false"
+
+    from app import create_app
+    from app.extensions import db
+    from app.models import User
+
+    app = create_app()
+    app.config["BCRYPT_LOG_ROUNDS"] = rounds
+    app.config["PASSWORD_HASHER_EXECUTOR"] = "inline"
+    with app.app_context():
+        db.create_all()
+        for i in range(USERS):
+            user = User(name=f"Bench User {i}", email=f"bench{i}@example.com", role="student")
+            user.set_password(PASSWORD)
+            db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def run(app, executor, total, concurrency):
+    from app.utils.passwords import shutdown_executor
+
+    shutdown_executor()
+    app.config["PASSWORD_HASHER_EXECUTOR"] = executor
+
+    def login(i):
+        client = app.test_client()
+        response = client.post(
+            "/api/auth/login",
+            json={"email": f"bench{i % USERS}@example.com", "password": PASSWORD},
+        )
+        return response.status_code
+
+    # Warm the pool so worker start-up is not counted
+    login(0)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        statuses = list(pool.map(login, range(total)))
+    elapsed = time.perf_counter() - started
+
+    failures = sum(status != 200 for status in statuses)
+    print(f"{executor:>8}: {total / elapsed:8.1f} logins/s  ({elapsed:.2f}s, {failures} failed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--executors", default="inline,thread,process")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"), args.rounds)
+        print(f"{args.requests} logins, {args.concurrency} concurrent, bcrypt rounds={args.rounds}, "
+              f"{os.cpu_count()} cores")
+        for executor in args.executors.split(","):
+            run(app, executor.strip(), args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
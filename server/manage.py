@@ -1,8 +1,8 @@
 from flask.cli import FlaskGroup
 
 from app import create_app
-from app.models import (Attendance, Course, Enrollment, Message,  # noqa: F401
-                        Resource, School, User, reset_password)
+from app.models import (Attendance, AttendanceDailySummary, Course,  # noqa: F401
+                        Enrollment, Message, Resource, School, User, reset_password)
 
 app = create_app()
 cli = FlaskGroup(app)
@@ -11,5 +11,15 @@ cli = FlaskGroup(app)
 from app.seed import seed as seed_cli  # noqa: E402
 cli.add_command(seed_cli, name="seed")
 
+from app.commands import (preview_worker, purge_revoked_tokens,  # noqa: E402
+                          rebuild_attendance_summary, reconcile_notification_counters,
+                          reindex_search, worker)
+cli.add_command(rebuild_attendance_summary)
+cli.add_command(purge_revoked_tokens)
+cli.add_command(reindex_search)
+cli.add_command(reconcile_notification_counters)
+cli.add_command(preview_worker)
+cli.add_command(worker)
+
 if __name__ == "__main__":
     cli()
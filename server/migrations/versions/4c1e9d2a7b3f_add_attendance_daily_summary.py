@@ -0,0 +1,49 @@
+"""add attendance daily summary
+
+Revision ID: 4c1e9d2a7b3f
+Revises: a2fd796da55c
+Create Date: 2026-10-17 09:12:41.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1e9d2a7b3f'
+down_revision = 'a2fd796da55c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('attendance_daily_summary',
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('present_count', sa.Integer(), nullable=False),
+    sa.Column('absent_count', sa.Integer(), nullable=False),
+    sa.Column('late_count', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('course_id', 'date', name='unique_attendance_summary_day')
+    )
+
+    # Backfill from existing attendance rows
+    op.execute("""
+        INSERT INTO attendance_daily_summary
+            (course_id, date, present_count, absent_count, late_count, created_at, updated_at)
+        SELECT course_id, date,
+               SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status = 'absent' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status = 'late' THEN 1 ELSE 0 END),
+               CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+        FROM attendance
+        GROUP BY course_id, date
+    """)
+
+
+def downgrade():
+    op.drop_table('attendance_daily_summary')
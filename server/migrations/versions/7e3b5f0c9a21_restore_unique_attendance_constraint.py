@@ -0,0 +1,43 @@
+"""restore unique attendance constraint
+
+Revision ID: 7e3b5f0c9a21
+Revises: 4c1e9d2a7b3f
+Create Date: 2026-10-17 10:02:55.340671
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e3b5f0c9a21'
+down_revision = '4c1e9d2a7b3f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The model declared this constraint under a misspelled __table_args__, so
+    # a2fd796da55c autogenerated a drop. Refuse to proceed over duplicate rows
+    # rather than silently deleting attendance history.
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT COUNT(*) FROM (
+            SELECT user_public_id, course_id, date
+            FROM attendance
+            GROUP BY user_public_id, course_id, date
+            HAVING COUNT(*) > 1
+        ) dup
+    """)).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} duplicate (user_public_id, course_id, date) attendance groups found; "
+            "resolve them before applying unique_attendance."
+        )
+
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.create_unique_constraint('unique_attendance', ['user_public_id', 'course_id', 'date'])
+
+
+def downgrade():
+    with op.batch_alter_table('attendance', schema=None) as batch_op:
+        batch_op.drop_constraint('unique_attendance', type_='unique')
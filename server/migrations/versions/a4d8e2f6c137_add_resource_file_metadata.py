@@ -0,0 +1,32 @@
+"""add resource file metadata
+
+Revision ID: a4d8e2f6c137
+Revises: f1a7c3d9e248
+Create Date: 2026-10-17 16:02:41.518230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d8e2f6c137'
+down_revision = 'f1a7c3d9e248'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('resources', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sha256', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('size', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('mime_type', sa.String(length=100), nullable=True))
+        batch_op.create_index('ix_resources_sha256', ['sha256'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('resources', schema=None) as batch_op:
+        batch_op.drop_index('ix_resources_sha256')
+        batch_op.drop_column('mime_type')
+        batch_op.drop_column('size')
+        batch_op.drop_column('sha256')
@@ -0,0 +1,43 @@
+"""add list query indexes
+
+Revision ID: b58d0e6f1c47
+Revises: 7e3b5f0c9a21
+Create Date: 2026-10-17 10:41:07.902314
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b58d0e6f1c47'
+down_revision = '7e3b5f0c9a21'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns) — composite orders follow the route query shapes:
+# equality filters first, then the ORDER BY column.
+INDEXES = [
+    ('ix_attendance_course_id_date', 'attendance', ['course_id', 'date']),
+    ('ix_attendance_user_public_id_date', 'attendance', ['user_public_id', 'date']),
+    ('ix_enrollments_course_id', 'enrollments', ['course_id']),
+    ('ix_messages_course_id_timestamp', 'messages', ['course_id', 'timestamp']),
+    ('ix_messages_user_public_id_timestamp', 'messages', ['user_public_id', 'timestamp']),
+    ('ix_messages_parent_id', 'messages', ['parent_id']),
+    ('ix_resources_course_id_created_at', 'resources', ['course_id', 'created_at']),
+    ('ix_resources_created_at', 'resources', ['created_at']),
+    ('ix_notifications_user_public_id_is_read_created_at', 'notifications', ['user_public_id', 'is_read', 'created_at']),
+    ('ix_courses_school_id_created_at', 'courses', ['school_id', 'created_at']),
+    ('ix_courses_educator_id', 'courses', ['educator_id']),
+    ('ix_users_school_id_role', 'users', ['school_id', 'role']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,40 @@
+"""add job retries and results
+
+Revision ID: c2f8d4b6e193
+Revises: b7e1c5a9d284
+Create Date: 2026-10-17 18:20:47.660512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2f8d4b6e193'
+down_revision = 'b7e1c5a9d284'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='5'))
+        batch_op.add_column(sa.Column('run_at', sa.DateTime(timezone=True), nullable=False,
+                                      server_default=sa.func.current_timestamp()))
+        batch_op.add_column(sa.Column('result', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('requested_by_public_id', sa.String(length=50), nullable=True))
+        batch_op.create_foreign_key('fk_jobs_requested_by_public_id_users', 'users',
+                                    ['requested_by_public_id'], ['public_id'])
+        batch_op.drop_index('ix_jobs_status_kind_id')
+        batch_op.create_index('ix_jobs_status_run_at_id', ['status', 'run_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_status_run_at_id')
+        batch_op.create_index('ix_jobs_status_kind_id', ['status', 'kind', 'id'], unique=False)
+        batch_op.drop_constraint('fk_jobs_requested_by_public_id_users', type_='foreignkey')
+        batch_op.drop_column('requested_by_public_id')
+        batch_op.drop_column('result')
+        batch_op.drop_column('run_at')
+        batch_op.drop_column('max_attempts')
@@ -0,0 +1,74 @@
+"""add search index
+
+Revision ID: e6f2b8a4d915
+Revises: d3a9c4e1f702
+Create Date: 2026-10-17 13:02:37.540912
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6f2b8a4d915'
+down_revision = 'd3a9c4e1f702'
+branch_labels = None
+depends_on = None
+
+
+# doc_key = entity id * 4 + position in (user, course, resource, message)
+DOCUMENTS = [
+    ("user", 0, "users", "u.school_id", "NULL", "u.name", "{email_body}", ""),
+    ("course", 1, "courses", "u.school_id", "u.id", "u.title", "COALESCE(u.description, '')", ""),
+    ("resource", 2, "resources", "c.school_id", "u.course_id", "u.title", "u.type",
+     "JOIN courses c ON c.id = u.course_id"),
+    ("message", 3, "messages", "c.school_id", "u.course_id", "''", "u.content",
+     "JOIN courses c ON c.id = u.course_id"),
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "entity_type UNINDEXED, entity_id UNINDEXED, school_id UNINDEXED, course_id UNINDEXED, "
+            "title, body, tokenize='unicode61 remove_diacritics 2')"
+        )
+        key_column, document_column, document = "rowid", "", ""
+        email_body = "u.email"
+    else:
+        is_pg = dialect == 'postgresql'
+        op.execute(
+            "CREATE TABLE search_index ("
+            "doc_key BIGINT PRIMARY KEY, entity_type VARCHAR(20) NOT NULL, entity_id INTEGER NOT NULL, "
+            "school_id INTEGER, course_id INTEGER, title TEXT, body TEXT"
+            + (", document TSVECTOR" if is_pg else "") + ")"
+        )
+        op.execute("CREATE INDEX ix_search_index_school_id ON search_index (school_id)")
+        if is_pg:
+            op.execute("CREATE INDEX ix_search_index_document ON search_index USING GIN (document)")
+        key_column = "doc_key"
+        document_column = ", document" if is_pg else ""
+        document = (
+            ", setweight(to_tsvector('simple', {title}), 'A') || setweight(to_tsvector('simple', {body}), 'B')"
+            if is_pg else ""
+        )
+        # The default parser keeps emails as one token; index the parts too
+        email_body = ("u.email || ' ' || regexp_replace(u.email, '\\W+', ' ', 'g')"
+                      if is_pg else "u.email")
+
+    # Backfill existing rows
+    for entity_type, position, table, school_id, course_id, title, body, join in DOCUMENTS:
+        body = body.format(email_body=email_body)
+        op.execute(
+            f"INSERT INTO search_index ({key_column}, entity_type, entity_id, school_id, course_id, "
+            f"title, body{document_column}) "
+            f"SELECT u.id * 4 + {position}, '{entity_type}', u.id, {school_id}, {course_id}, "
+            f"{title}, {body}{document.format(title=title, body=body)} "
+            f"FROM {table} u {join}"
+        )
+
+
+def downgrade():
+    op.execute("DROP TABLE search_index")
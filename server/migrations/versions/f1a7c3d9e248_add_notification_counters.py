@@ -0,0 +1,42 @@
+"""add notification counters
+
+Revision ID: f1a7c3d9e248
+Revises: e6f2b8a4d915
+Create Date: 2026-10-17 14:26:11.093275
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a7c3d9e248'
+down_revision = 'e6f2b8a4d915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_counters',
+    sa.Column('user_public_id', sa.String(length=50), nullable=False),
+    sa.Column('unread_count', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_public_id'], ['users.public_id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_public_id')
+    )
+
+    # Backfill from existing notifications
+    op.execute("""
+        INSERT INTO notification_counters (user_public_id, unread_count, created_at, updated_at)
+        SELECT user_public_id, COUNT(*), CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+        FROM notifications
+        WHERE is_read = false OR is_read IS NULL
+        GROUP BY user_public_id
+    """)
+
+
+def downgrade():
+    op.drop_table('notification_counters')
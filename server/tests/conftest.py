@@ -1,8 +1,10 @@
 import pytest
+from contextlib import contextmanager
 from flask_jwt_extended import create_access_token
 from app import create_app
 from app.extensions import db
 from app.models import Course, Resource, User, School
+from app.utils.instrumentation import collect_queries
 
 
 @pytest.fixture(scope="session")
@@ -27,6 +29,24 @@ def setup_database(app):
         db.drop_all()
 
 
+@pytest.fixture
+def query_budget():
+    """
+    Fail when the block runs more SQL queries than allowed:
+
+        with query_budget(4) as stats:
+            client.get("/api/...")
+    """
+    @contextmanager
+    def _budget(max_queries):
+        with collect_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"Query budget exceeded ({stats.count} > {max_queries}):\n{stats.report()}"
+        )
+    return _budget
+
+
 @pytest.fixture(scope="function")
 def sample_data(app):
     """Create sample data for tests"""
@@ -88,8 +108,12 @@ def auth_headers(app, sample_data):
                 school = School.query.first()
                 school_id = school.id if school else 1
 
+            # Tokens carry the user's public_id, as issued at login
+            user = db.session.get(User, user_id)
+            identity = user.public_id if user else str(user_id)
+
             token = create_access_token(
-                identity=str(user_id),
+                identity=identity,
                 additional_claims={"role": role, "school_id": school_id}
             )
         return {"Authorization": f"Bearer {token}"}
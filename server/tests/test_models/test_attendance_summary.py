@@ -0,0 +1,96 @@
+"""Tests for AttendanceDailySummary model"""
+import pytest
+from datetime import date
+from app.models.attendance import Attendance
+from app.models.attendance_summary import AttendanceDailySummary
+from app.models.course import Course
+from app.models.user import User
+from app.models.school import School
+from app.extensions import db
+
+
+class TestAttendanceDailySummary:
+    """Test summary rows follow Attendance inserts, updates and deletes"""
+
+    @pytest.fixture
+    def setup_data(self, app):
+        with app.app_context():
+            owner = User(name="Owner", email="owner@test.com", role="manager")
+            owner.set_password("password123")
+            db.session.add(owner)
+            db.session.commit()
+
+            school = School(name="Test School", address="Test Address", owner_id=owner.id)
+            db.session.add(school)
+            db.session.commit()
+
+            students = []
+            for i in range(3):
+                student = User(name=f"Student {i}", email=f"student{i}@test.com", role="student", school_id=school.id)
+                student.set_password("password123")
+                db.session.add(student)
+                students.append(student)
+
+            course = Course(title="Test Course", educator_id=owner.id, school_id=school.id)
+            db.session.add(course)
+            db.session.commit()
+
+            yield {"course": course, "students": students}
+
+    def _summary(self, course_id, day):
+        return AttendanceDailySummary.query.filter_by(course_id=course_id, date=day).first()
+
+    def test_summary_tracks_attendance_writes(self, app, setup_data):
+        with app.app_context():
+            course = setup_data["course"]
+            day = date(2025, 3, 1)
+            records = [
+                Attendance(user_public_id=s.public_id, course_id=course.id, date=day, status=status)
+                for s, status in zip(setup_data["students"], ("present", "present", "absent"))
+            ]
+            db.session.add_all(records)
+            db.session.commit()
+
+            summary = self._summary(course.id, day)
+            assert (summary.present_count, summary.absent_count, summary.late_count) == (2, 1, 0)
+
+            # status change moves one count between buckets
+            records[0].status = "late"
+            db.session.commit()
+            db.session.refresh(summary)
+            assert (summary.present_count, summary.absent_count, summary.late_count) == (1, 1, 1)
+
+            # date change moves the record to another day
+            records[1].date = date(2025, 3, 2)
+            db.session.commit()
+            db.session.refresh(summary)
+            assert summary.present_count == 0
+            assert self._summary(course.id, date(2025, 3, 2)).present_count == 1
+
+            db.session.delete(records[2])
+            db.session.commit()
+            db.session.refresh(summary)
+            assert summary.total_count == 1
+
+    def test_rebuild_matches_incremental_counts(self, app, setup_data):
+        with app.app_context():
+            course = setup_data["course"]
+            for i, student in enumerate(setup_data["students"]):
+                db.session.add(Attendance(
+                    user_public_id=student.public_id,
+                    course_id=course.id,
+                    date=date(2025, 3, 1 + i % 2),
+                    status=("present", "late", "absent")[i]
+                ))
+            db.session.commit()
+
+            def snapshot():
+                return sorted(
+                    (s.date, s.present_count, s.absent_count, s.late_count)
+                    for s in AttendanceDailySummary.query.all()
+                )
+
+            incremental = snapshot()
+            assert AttendanceDailySummary.rebuild() == 2
+            assert snapshot() == incremental
+            assert all(s.created_at is not None for s in AttendanceDailySummary.query.all())
@@ -0,0 +1,71 @@
+"""Tests that the main list queries are served by the secondary indexes"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import joinedload
+from app.models import Attendance, Course, Enrollment, Message, Notification, Resource, User
+from app.extensions import db
+
+
+def query_plan(query):
+    """Return SQLite's EXPLAIN QUERY PLAN detail lines for an ORM query."""
+    sql = str(query.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+class TestQueryIndexes:
+    """EXPLAIN QUERY PLAN checks for the route query shapes"""
+
+    @pytest.mark.parametrize("build, index", [
+        (
+            lambda: Attendance.query.options(joinedload(Attendance.course), joinedload(Attendance.user))
+            .filter_by(course_id=1).order_by(Attendance.date.desc()).limit(10),
+            "ix_attendance_course_id_date",
+        ),
+        (
+            lambda: Attendance.query.filter_by(user_public_id="abc").order_by(Attendance.date.desc()).limit(10),
+            "ix_attendance_user_public_id_date",
+        ),
+        (
+            lambda: Enrollment.query.filter_by(course_id=1),
+            "ix_enrollments_course_id",
+        ),
+        (
+            lambda: Message.query.filter_by(course_id=1).order_by(Message.timestamp.desc()).limit(10),
+            "ix_messages_course_id_timestamp",
+        ),
+        (
+            lambda: Message.query.filter_by(user_public_id="abc").order_by(Message.timestamp.desc()).limit(5),
+            "ix_messages_user_public_id_timestamp",
+        ),
+        (
+            lambda: Resource.query.filter_by(course_id=1).order_by(Resource.created_at.desc()).limit(10),
+            "ix_resources_course_id_created_at",
+        ),
+        (
+            lambda: Resource.query.order_by(Resource.created_at.desc()).limit(10),
+            "ix_resources_created_at",
+        ),
+        (
+            lambda: Notification.query.filter_by(user_public_id="abc", is_read=False)
+            .order_by(Notification.created_at.desc()).limit(20),
+            "ix_notifications_user_public_id_is_read_created_at",
+        ),
+        (
+            lambda: Course.query.filter_by(school_id=1).order_by(Course.created_at.desc()).limit(10),
+            "ix_courses_school_id_created_at",
+        ),
+        (
+            lambda: Course.query.filter_by(educator_id=1),
+            "ix_courses_educator_id",
+        ),
+        (
+            lambda: User.query.filter(User.school_id == 1, User.role == "student"),
+            "ix_users_school_id_role",
+        ),
+    ])
+    def test_list_query_uses_index(self, app, build, index):
+        with app.app_context():
+            plan = query_plan(build())
+            assert index in plan, plan
+            assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+from app.extensions import db
+from app.models import Job
+
+
+def test_claim_marks_jobs_running_once(app):
+    with app.app_context():
+        for n in range(3):
+            Job.enqueue("resource_preview", {"resource_id": n})
+        Job.enqueue("other", {})
+        db.session.commit()
+
+        first = Job.claim("resource_preview", limit=2)
+        assert [job.payload["resource_id"] for job in first] == [0, 1]
+        assert all(job.status == "running" and job.attempts == 1 for job in first)
+
+        second = Job.claim("resource_preview", limit=2)
+        assert [job.payload["resource_id"] for job in second] == [2]
+        assert Job.claim("resource_preview") == []
+
+
+def test_mark_failed_records_error(app):
+    with app.app_context():
+        job = Job.enqueue("resource_preview")
+        db.session.commit()
+        job.mark_failed(ValueError("broken file"))
+        db.session.commit()
+        assert (job.status, job.error) == ("failed", "broken file")
+        assert job.finished_at is not None
+
+
+def test_failed_job_retries_with_backoff_then_fails(app):
+    with app.app_context():
+        job = Job.enqueue("resource_preview", max_attempts=2)
+        db.session.commit()
+
+        [job] = Job.claim("resource_preview")
+        before = datetime.now(timezone.utc)
+        assert job.record_failure(RuntimeError("busy"), backoff_seconds=60) is True
+        db.session.commit()
+        assert (job.status, job.error) == ("queued", "busy")
+        # Half to all of the backoff, and not due yet
+        run_at = job.run_at.replace(tzinfo=job.run_at.tzinfo or timezone.utc)
+        assert before + timedelta(seconds=29) <= run_at <= before + timedelta(seconds=61)
+        assert Job.claim("resource_preview") == []
+
+        job.run_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.session.commit()
+        [job] = Job.claim("resource_preview")
+        assert job.attempts == 2
+        assert job.record_failure(RuntimeError("still busy")) is False
+        assert job.status == "failed"
+
+
+def test_requeue_stale_running_jobs(app):
+    with app.app_context():
+        job = Job.enqueue("resource_preview")
+        db.session.commit()
+        [job] = Job.claim("resource_preview")
+        # Claimed long ago, but the heartbeat is recent: still running
+        job.started_at = datetime.now(timezone.utc) - timedelta(hours=2)
+        db.session.commit()
+        assert Job.requeue_stale(300) == 0
+
+        job.updated_at = datetime.now(timezone.utc) - timedelta(minutes=10)
+        db.session.commit()
+        assert Job.requeue_stale(300) == 1
+        assert db.session.get(Job, job.id).status == "queued"
@@ -0,0 +1,49 @@
+"""Tests for NotificationCounter model"""
+from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
+from app.models.user import User
+from app.extensions import db
+
+
+class TestNotificationCounter:
+    """Test unread counters follow Notification inserts, updates and deletes"""
+
+    def _student(self):
+        return User.query.filter_by(email="student@test.com").first().public_id
+
+    def test_counter_tracks_notification_writes(self, app, sample_data):
+        with app.app_context():
+            public_id = self._student()
+            first, second = (Notification(user_public_id=public_id, title=t) for t in ("A", "B"))
+            db.session.add_all([first, second, Notification(user_public_id=public_id, title="C", is_read=True)])
+            db.session.commit()
+            assert NotificationCounter.unread_for(public_id) == 2
+
+            first.is_read = True
+            db.session.commit()
+            assert NotificationCounter.unread_for(public_id) == 1
+
+            # Re-saving an unchanged flag doesn't move the counter
+            first.is_read = True
+            first.title = "A (edited)"
+            db.session.commit()
+            assert NotificationCounter.unread_for(public_id) == 1
+
+            db.session.delete(second)
+            db.session.delete(first)
+            db.session.commit()
+            assert NotificationCounter.unread_for(public_id) == 0
+
+    def test_rebuild_matches_notifications(self, app, sample_data):
+        with app.app_context():
+            public_id = self._student()
+            db.session.add_all([Notification(user_public_id=public_id, title=str(i)) for i in range(3)])
+            db.session.commit()
+
+            # Drift the counter, as a write outside the ORM would
+            NotificationCounter.increment([public_id], 5)
+            db.session.commit()
+            assert NotificationCounter.unread_for(public_id) == 8
+
+            assert NotificationCounter.rebuild() == 1
+            assert NotificationCounter.unread_for(public_id) == 3
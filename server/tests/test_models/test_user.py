@@ -0,0 +1,44 @@
+"""Tests for User password hashing"""
+import bcrypt
+from app.models.user import User
+from app.utils.passwords import hash_passwords, shutdown_executor, verify_password
+
+
+class TestUserPassword:
+    """Test password hashing goes through the configured executor and cost"""
+
+    def test_set_and_check_password(self, app):
+        """Test a set password verifies and a wrong one does not"""
+        with app.app_context():
+            user = User(name="Student", email="student@test.com", role="student")
+            user.set_password("password123")
+
+            assert user.password_hash.startswith("$2b$04$")
+            assert user.check_password("password123") is True
+            assert user.check_password("wrong") is False
+
+    def test_existing_hashes_still_verify(self, app):
+        """Test hashes created at the old default cost keep working"""
+        with app.app_context():
+            legacy_hash = bcrypt.hashpw(b"password123", bcrypt.gensalt(5)).decode("utf-8")
+            user = User(name="Student", email="student@test.com", role="student", password_hash=legacy_hash)
+
+            assert user.check_password("password123") is True
+
+    def test_malformed_hash_does_not_verify(self, app):
+        """Test an empty or invalid stored hash fails closed"""
+        with app.app_context():
+            assert verify_password("", "password123") is False
+            assert verify_password("not-a-hash", "password123") is False
+
+    def test_thread_executor(self, app):
+        """Test batch hashing through a pool preserves order"""
+        with app.app_context():
+            app.config["PASSWORD_HASHER_EXECUTOR"] = "thread"
+            try:
+                hashes = hash_passwords(["one", "two", "three"])
+                assert [verify_password(h, p) for h, p in zip(hashes, ["one", "two", "three"])] == [True] * 3
+                assert verify_password(hashes[0], "two") is False
+            finally:
+                app.config["PASSWORD_HASHER_EXECUTOR"] = "inline"
+                shutdown_executor()
@@ -1,4 +1,5 @@
 """Tests for Attendance routes"""
+import json
 import pytest
 from datetime import date
 from app.models.attendance import Attendance
@@ -163,3 +164,251 @@ class TestAttendanceRoutes:
 
             response = client.post("/api/attendance", json=data, headers=headers)
             assert response.status_code == 403
+
+    def test_list_attendance_with_cursor(self, app, client, setup_data):
+        """Test walking attendance with keyset cursors (ties broken on id)"""
+        with app.app_context():
+            educator = setup_data["educator"]
+            student = setup_data["student"]
+            course = setup_data["course"]
+
+            other = User(
+                name="Other Student",
+                email="other@test.com",
+                role="student",
+                school_id=setup_data["school"].id
+            )
+            other.set_password("password123")
+            db.session.add(other)
+            db.session.commit()
+
+            # Two students on the same three dates -> duplicate sort keys
+            for day in (date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)):
+                for user in (student, other):
+                    db.session.add(Attendance(
+                        user_public_id=user.public_id,
+                        course_id=course.id,
+                        date=day,
+                        status="present"
+                    ))
+            db.session.commit()
+
+            token = create_access_token(
+                identity=educator.public_id,
+                additional_claims={"role": "educator", "school_id": setup_data["school"].id}
+            )
+            headers = {"Authorization": f"Bearer {token}"}
+
+            seen = []
+            cursor = ""
+            while True:
+                response = client.get(
+                    "/api/attendance",
+                    query_string={"cursor": cursor, "per_page": 4, "course_id": course.id},
+                    headers=headers
+                )
+                assert response.status_code == 200
+                data = response.json["data"]
+                assert "total" not in data["meta"]
+                seen.extend(record["id"] for record in data["attendance"])
+                cursor = data["meta"]["next_cursor"]
+                if not cursor:
+                    assert data["links"]["next"] is None
+                    break
+                assert f"course_id={course.id}" in data["links"]["next"]
+
+            assert len(seen) == 6
+            assert len(set(seen)) == 6
+
+            dates = [db.session.get(Attendance, i).date for i in seen]
+            assert dates == sorted(dates, reverse=True)
+
+    def test_list_attendance_cursor_total_and_invalid(self, app, client, setup_data):
+        """Test cursor mode only counts on request and rejects bad cursors"""
+        with app.app_context():
+            educator = setup_data["educator"]
+
+            token = create_access_token(
+                identity=educator.public_id,
+                additional_claims={"role": "educator", "school_id": setup_data["school"].id}
+            )
+            headers = {"Authorization": f"Bearer {token}"}
+
+            response = client.get("/api/attendance?cursor=&include_total=true", headers=headers)
+            assert response.status_code == 200
+            assert response.json["data"]["meta"]["total"] == 0
+
+            response = client.get("/api/attendance?cursor=not-a-cursor", headers=headers)
+            assert response.status_code == 400
+
+    def test_bulk_roll_call(self, app, client, setup_data):
+        """Test a whole-class roll call creates, updates and reports per row"""
+        with app.app_context():
+            from app.models.enrollment import Enrollment
+            from app.models.attendance_summary import AttendanceDailySummary
+            from datetime import datetime
+
+            educator = setup_data["educator"]
+            course = setup_data["course"]
+            school = setup_data["school"]
+
+            students = [setup_data["student"]]
+            for i in range(3):
+                student = User(name=f"Student {i}", email=f"student{i}@test.com", role="student", school_id=school.id)
+                student.set_password("password123")
+                db.session.add(student)
+                students.append(student)
+            db.session.commit()
+
+            # Last student is not enrolled
+            for student in students[:3]:
+                db.session.add(Enrollment(
+                    user_public_id=student.public_id,
+                    course_id=course.id,
+                    date_enrolled=datetime.utcnow()
+                ))
+            db.session.add(Attendance(
+                user_public_id=students[0].public_id,
+                course_id=course.id,
+                date=date(2025, 2, 3),
+                status="absent"
+            ))
+            db.session.commit()
+
+            token = create_access_token(
+                identity=educator.public_id,
+                additional_claims={"role": "educator", "school_id": school.id}
+            )
+            headers = {"Authorization": f"Bearer {token}"}
+
+            data = {
+                "course_id": course.id,
+                "date": "2025-02-03",
+                "records": [
+                    {"user_public_id": students[0].public_id, "status": "present"},
+                    {"user_public_id": students[1].public_id, "status": "late"},
+                    {"user_public_id": students[2].public_id, "status": "excused"},
+                    {"user_public_id": students[3].public_id, "status": "present"},
+                    {"user_public_id": students[1].public_id, "status": "absent"},
+                ]
+            }
+
+            response = client.post("/api/attendance/bulk", json=data, headers=headers)
+            assert response.status_code == 200
+            payload = response.json["data"]
+            assert [r["result"] for r in payload["results"]] == ["updated", "created", "error", "error", "error"]
+            assert payload["summary"] == {"created": 1, "updated": 1, "unchanged": 0, "error": 3}
+            assert payload["results"][1]["id"] is not None
+
+            records = Attendance.query.filter_by(course_id=course.id, date=date(2025, 2, 3)).all()
+            assert sorted(r.status for r in records) == ["late", "present"]
+
+            summary = AttendanceDailySummary.query.filter_by(course_id=course.id, date=date(2025, 2, 3)).one()
+            assert (summary.present_count, summary.absent_count, summary.late_count) == (1, 0, 1)
+
+            # Re-submitting the same roll call is idempotent
+            data["records"] = data["records"][:2]
+            response = client.post("/api/attendance/bulk", json=data, headers=headers)
+            assert response.json["data"]["summary"]["unchanged"] == 2
+
+    def test_bulk_roll_call_validation(self, app, client, setup_data):
+        """Test bulk roll call rejects malformed payloads and other schools"""
+        with app.app_context():
+            educator = setup_data["educator"]
+            course = setup_data["course"]
+
+            token = create_access_token(
+                identity=educator.public_id,
+                additional_claims={"role": "educator", "school_id": setup_data["school"].id}
+            )
+            headers = {"Authorization": f"Bearer {token}"}
+
+            response = client.post("/api/attendance/bulk", json={"course_id": course.id}, headers=headers)
+            assert response.status_code == 400
+            assert set(response.json["errors"]) == {"date", "records"}
+
+            response = client.post("/api/attendance/bulk", json={"course_id": True}, headers=headers)
+            assert response.status_code == 400
+            assert "course_id" in response.json["errors"]
+
+            response = client.post(
+                "/api/attendance/bulk",
+                json={"course_id": course.id, "date": "2025-02-03",
+                      "records": [{"user_public_id": ["x"], "status": "present"},
+                                  {"user_public_id": {"id": "x"}, "status": "present"}]},
+                headers=headers
+            )
+            assert response.status_code == 200
+            assert [r["error"] for r in response.json["data"]["results"]] == ["user_public_id must be a string."] * 2
+
+            other_token = create_access_token(
+                identity=educator.public_id,
+                additional_claims={"role": "educator", "school_id": 999}
+            )
+            response = client.post(
+                "/api/attendance/bulk",
+                json={"course_id": course.id, "date": "2025-02-03", "records": [{"user_public_id": "x"}]},
+                headers={"Authorization": f"Bearer {other_token}"}
+            )
+            assert response.status_code == 403
+
+
+class TestAttendanceExport:
+    """Streaming CSV / NDJSON export"""
+
+    @pytest.fixture
+    def records(self, app, sample_data):
+        with app.app_context():
+            educator = User.query.filter_by(role="educator").first()
+            student = User.query.filter_by(role="student").first()
+            course = Course(title="Biology", educator_id=educator.id, school_id=educator.school_id)
+            db.session.add(course)
+            db.session.commit()
+            for day in range(1, 6):
+                db.session.add(Attendance(user_public_id=student.public_id, course_id=course.id,
+                                          date=date(2025, 2, day), status="present" if day % 2 else "late"))
+
+            # Another school's records must never be exported
+            outsider = User(name="Outsider", email="outsider@test.com", role="manager")
+            outsider.set_password("password123")
+            db.session.add(outsider)
+            db.session.commit()
+            other_school = School(name="Other", address="Elsewhere", owner_id=outsider.id)
+            db.session.add(other_school)
+            db.session.commit()
+            other_course = Course(title="Other", educator_id=outsider.id, school_id=other_school.id)
+            db.session.add(other_course)
+            db.session.commit()
+            db.session.add(Attendance(user_public_id=student.public_id, course_id=other_course.id,
+                                      date=date(2025, 2, 1), status="absent"))
+            db.session.commit()
+            return course.id
+
+    def test_csv_export_streams_school_rows(self, client, records, auth_headers, monkeypatch):
+        import app.routes.attendance as attendance_routes
+        monkeypatch.setattr(attendance_routes, "EXPORT_BATCH_SIZE", 2)
+
+        response = client.get("/api/attendance/export?format=csv", headers=auth_headers("manager"))
+        assert response.status_code == 200
+        assert response.mimetype == "text/csv"
+        assert "attachment" in response.headers["Content-Disposition"]
+
+        lines = response.get_data(as_text=True).strip().splitlines()
+        assert lines[0].startswith("id,date,status,course_id,course_title")
+        assert len(lines) == 6
+        assert all(",Biology," in line for line in lines[1:])
+
+    def test_ndjson_export_filters_by_date(self, client, records, auth_headers):
+        response = client.get(
+            f"/api/attendance/export?format=ndjson&course_id={records}&from=2025-02-02&to=2025-02-03",
+            headers=auth_headers("educator"),
+        )
+        assert response.status_code == 200
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [(r["date"], r["status"]) for r in rows] == [("2025-02-02", "late"), ("2025-02-03", "present")]
+        assert rows[0]["student_email"] == "student@test.com"
+
+    def test_export_validation(self, client, records, auth_headers):
+        assert client.get("/api/attendance/export", headers=auth_headers("student")).status_code == 403
+        assert client.get("/api/attendance/export?format=xml", headers=auth_headers("manager")).status_code == 400
+        assert client.get("/api/attendance/export?from=tomorrow", headers=auth_headers("manager")).status_code == 400
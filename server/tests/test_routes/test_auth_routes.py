@@ -153,6 +153,15 @@ class TestLogoutRoute:
         
         assert response.status_code == 401
 
+    def test_logout_revokes_token(self, app, client, auth_headers):
+        """Test a logged-out token is rejected afterwards"""
+        with app.app_context():
+            response = client.post("/api/auth/logout", headers=auth_headers)
+            assert response.status_code == 200
+
+            response = client.post("/api/auth/logout", headers=auth_headers)
+            assert response.status_code == 401
+
 class TestTokenRefreshRoute:
     """Test token refresh endpoint"""
 
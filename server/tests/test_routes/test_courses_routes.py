@@ -1,4 +1,8 @@
 import json
+import time
+from app.extensions import db
+from app.models import Course, Resource, School, User
+from app.utils import signing
 
 
 def test_get_courses_list(client):
@@ -17,3 +21,131 @@ def test_get_courses_with_filters(client):
     data = resp.get_json()
     assert "data" in data
     assert "items" in data["data"]
+
+
+def _add_course(title="Algebra"):
+    school = School.query.first()
+    educator = User.query.filter_by(role="educator").first()
+    course = Course(title=title, educator_id=educator.id, school_id=school.id)
+    db.session.add(course)
+    db.session.commit()
+    return course
+
+
+def test_courses_list_conditional_get(app, client, sample_data):
+    """Test the course list answers If-None-Match with 304 until a course changes"""
+    with app.app_context():
+        course = _add_course()
+
+        resp = client.get("/api/courses")
+        assert resp.status_code == 200
+        etag = resp.headers["ETag"]
+        assert "Last-Modified" in resp.headers
+
+        resp = client.get("/api/courses", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.headers["ETag"] == etag
+
+        # Different page parameters never share a validator
+        resp = client.get("/api/courses?per_page=5", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+
+        course.title = "Geometry"
+        db.session.commit()
+        resp = client.get("/api/courses", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.get_json()["data"]["items"][0]["title"] == "Geometry"
+
+
+def test_courses_cursor_conditional_get(app, client, sample_data):
+    """Test cursor pages carry an ETag and revalidate"""
+    with app.app_context():
+        _add_course()
+
+        resp = client.get("/api/courses?cursor=")
+        etag = resp.headers["ETag"]
+        resp = client.get("/api/courses?cursor=", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+        _add_course("Biology")
+        resp = client.get("/api/courses?cursor=", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert len(resp.get_json()["data"]["items"]) == 2
+
+
+def test_course_detail_ignores_if_modified_since(app, client, sample_data):
+    """Test course detail revalidates on the ETag only (a deleted resource keeps the date)"""
+    with app.app_context():
+        course = _add_course()
+
+        resp = client.get(f"/api/courses/{course.id}")
+        assert resp.status_code == 200
+        etag = resp.headers["ETag"]
+        last_modified = resp.headers["Last-Modified"]
+
+        resp = client.get(f"/api/courses/{course.id}", headers={"If-Modified-Since": last_modified})
+        assert resp.status_code == 200
+
+        resp = client.get(f"/api/courses/{course.id}", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+
+
+def test_course_etags_cover_embedded_rows(app, client, sample_data, auth_headers):
+    """Test adding a resource or renaming the educator invalidates every course listing"""
+    headers = auth_headers("manager")
+    with app.app_context():
+        course = _add_course()
+        urls = [
+            f"/api/courses/{course.id}",
+            "/api/courses",
+            "/api/courses?cursor=",
+            f"/api/schools/{course.school_id}/courses",
+        ]
+        course_id = course.id
+
+    def get(url, **extra):
+        # A fresh app context per request, so no decoded JWT lingers on g between them
+        with app.app_context():
+            return client.get(url, headers={**headers, **extra})
+
+    def etags():
+        return {url: get(url).headers["ETag"] for url in urls}
+
+    def revalidate(old):
+        return {url: get(url, **{"If-None-Match": etag}).status_code for url, etag in old.items()}
+
+    before = etags()
+    assert set(revalidate(before).values()) == {304}
+
+    with app.app_context():
+        educator = User.query.filter_by(role="educator").first()
+        db.session.add(Resource(title="Notes", url="https://example.com/n.pdf", type="pdf",
+                                course_id=course_id, uploaded_by_public_id=educator.public_id))
+        db.session.commit()
+    assert set(revalidate(before).values()) == {200}
+
+    before = etags()
+    with app.app_context():
+        User.query.filter_by(role="educator").first().name = "Renamed Educator"
+        db.session.commit()
+    assert set(revalidate(before).values()) == {200}
+
+
+def test_course_etags_change_with_signing_window(app, client, sample_data, auth_headers, monkeypatch):
+    """Test a new signing window invalidates course ETags (embedded resource URLs are re-signed)"""
+    headers = auth_headers("manager")
+    with app.app_context():
+        course = _add_course()
+        urls = [f"/api/courses/{course.id}", "/api/courses", "/api/courses?cursor=",
+                f"/api/schools/{course.school_id}/courses"]
+
+    def get(url, **extra):
+        with app.app_context():
+            return client.get(url, headers={**headers, **extra})
+
+    before = {url: get(url).headers["ETag"] for url in urls}
+    ttl = app.config.get("UPLOAD_URL_TTL_SECONDS", 3600)
+    later = time.time() + ttl
+    monkeypatch.setattr(signing.time, "time", lambda: later)
+    for url, etag in before.items():
+        assert get(url, **{"If-None-Match": etag}).status_code == 200, url
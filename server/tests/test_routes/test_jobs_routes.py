@@ -0,0 +1,143 @@
+import os
+import signal
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from app.extensions import db
+from app.models import Attendance, Course, Job, User
+from app.utils.jobs import _heartbeat, job_handler, run_worker, work
+
+
+def _attendance(app):
+    with app.app_context():
+        educator = User.query.filter_by(email="educator@test.com").first()
+        student = User.query.filter_by(email="student@test.com").first()
+        course = Course(title="Biology", educator_id=educator.id, school_id=educator.school_id)
+        db.session.add(course)
+        db.session.flush()
+        for day in (1, 2):
+            db.session.add(Attendance(
+                user_public_id=student.public_id, course_id=course.id,
+                date=date(2025, 3, day), status="present",
+            ))
+        db.session.commit()
+
+
+def test_export_job_returns_202_and_reports_status(app, client, auth_headers):
+    _attendance(app)
+    headers = auth_headers("manager")
+
+    resp = client.post("/api/attendance/export?format=csv", headers=headers)
+    assert resp.status_code == 202
+    job = resp.get_json()["data"]
+    assert job["status"] == "queued"
+    assert resp.headers["Location"] == f"/api/jobs/{job['id']}"
+
+    status = client.get(f"/api/jobs/{job['id']}", headers=headers)
+    assert status.status_code == 200
+    assert status.get_json()["data"]["status"] == "queued"
+    assert status.headers["Retry-After"] == "2"
+
+    # Other users can't see the job
+    assert client.get(f"/api/jobs/{job['id']}", headers=auth_headers("educator")).status_code == 404
+
+    with app.app_context():
+        assert work(kinds=["attendance_export"], once=True) == 1
+
+    done = client.get(f"/api/jobs/{job['id']}", headers=headers).get_json()["data"]
+    assert done["status"] == "done"
+    assert done["result"]["filename"].endswith(".csv")
+
+    download = client.get(done["result"]["url"])
+    assert download.status_code == 200
+    streamed = client.get("/api/attendance/export?format=csv", headers=headers)
+    assert download.data == streamed.data
+    assert len(download.data.decode().splitlines()) == 3
+    download.close()
+
+
+def test_export_job_checks_role_before_queueing(app, client, auth_headers):
+    resp = client.post("/api/attendance/export", headers=auth_headers("student"))
+    assert resp.status_code == 403
+    with app.app_context():
+        assert Job.query.count() == 0
+
+
+def test_failing_handler_is_retried_then_failed(app):
+    calls = []
+
+    @job_handler("test_flaky")
+    def flaky(payload):
+        calls.append(payload)
+        raise RuntimeError("boom")
+
+    app.config["JOB_BACKOFF_SECONDS"] = 0
+    try:
+        with app.app_context():
+            job = Job.enqueue("test_flaky", {"n": 1}, max_attempts=3)
+            db.session.commit()
+            assert work(kinds=["test_flaky"], once=True) == 3
+
+            job = db.session.get(Job, job.id)
+            assert (job.status, job.attempts, job.error) == ("failed", 3, "boom")
+            assert calls == [{"n": 1}] * 3
+    finally:
+        app.config.pop("JOB_BACKOFF_SECONDS")
+
+
+def test_unknown_kind_fails_without_retry(app):
+    with app.app_context():
+        job = Job.enqueue("no_such_kind")
+        db.session.commit()
+        assert work(once=True) == 1
+        job = db.session.get(Job, job.id)
+        assert job.status == "failed"
+        assert "No handler" in job.error
+
+
+def test_worker_requeues_stale_jobs_and_heartbeats_keep_running_ones(app):
+    ran = []
+
+    @job_handler("test_stale")
+    def stale(payload):
+        ran.append(payload)
+
+    with app.app_context():
+        job = Job.enqueue("test_stale", {"n": 1})
+        db.session.commit()
+        [job] = Job.claim("test_stale")
+        job.updated_at = datetime.now(timezone.utc) - timedelta(minutes=10)
+        db.session.commit()
+
+        # A live worker's heartbeat keeps the job from being taken away
+        beating = _heartbeat(job.id, 0.01)
+        time.sleep(0.2)
+        beating.set()
+        assert Job.requeue_stale(300) == 0
+
+        # Its worker was killed: the next worker loop picks it up again, no restart needed
+        job = db.session.get(Job, job.id)
+        job.updated_at = datetime.now(timezone.utc) - timedelta(minutes=10)
+        db.session.commit()
+        assert work(kinds=["test_stale"], once=True) == 1
+        job = db.session.get(Job, job.id)
+        assert (job.status, job.attempts) == ("done", 2)
+        assert ran == [{"n": 1}]
+
+
+def test_sigterm_lets_the_current_job_finish(app):
+    @job_handler("test_deploy")
+    def deploy(payload):
+        os.kill(os.getpid(), signal.SIGTERM)
+        return {"n": payload["n"]}
+
+    previous = signal.getsignal(signal.SIGTERM)
+    with app.app_context():
+        first = Job.enqueue("test_deploy", {"n": 1})
+        second = Job.enqueue("test_deploy", {"n": 2})
+        db.session.commit()
+        assert run_worker(kinds=["test_deploy"], poll_seconds=0.01) == 1
+
+        assert db.session.get(Job, first.id).status == "done"
+        assert db.session.get(Job, second.id).status == "queued"
+    assert signal.getsignal(signal.SIGTERM) is previous
@@ -2,10 +2,13 @@
 import pytest
 from datetime import datetime
 from app.models.message import Message
+from app.models.notification import Notification
 from app.models.course import Course
 from app.models.user import User
 from app.models.school import School
 from app.models.enrollment import Enrollment
+from app.models.job import Job
+from app.utils.jobs import work
 from app.extensions import db
 from flask_jwt_extended import create_access_token
 
@@ -112,6 +115,35 @@ class TestMessageRoutes:
             response = client.post("/api/messages", json=data, headers=headers)
             assert response.status_code == 201
 
+    def test_create_message_notifies_course(self, app, client, setup_data):
+        """Posting a message notifies the rest of the course, not the sender"""
+        with app.app_context():
+            student = setup_data["student"]
+            educator = setup_data["educator"]
+            course = setup_data["course"]
+
+            token = create_access_token(
+                identity=student.public_id,
+                additional_claims={"role": "student", "school_id": setup_data["school"].id}
+            )
+            response = client.post(
+                "/api/messages",
+                json={"course_id": course.id, "content": "Is there class tomorrow?"},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            assert response.status_code == 201
+
+            # Fanned out by the job worker, not the request
+            assert Notification.query.count() == 0
+            assert [job.kind for job in Job.query.all()] == ["notify_course"]
+            assert work(once=True) == 1
+
+            notifications = Notification.query.all()
+            assert [n.user_public_id for n in notifications] == [educator.public_id]
+            assert notifications[0].title == "New message in Test Course"
+            assert notifications[0].link == "/educator/messages"
+            assert notifications[0].is_read is False
+
     def test_list_messages_for_course(self, app, client, setup_data):
         """Test listing messages for a course"""
         with app.app_context():
@@ -137,4 +169,76 @@ class TestMessageRoutes:
             response = client.get(f"/api/messages?course_id={course.id}", headers=headers)
             assert response.status_code == 200
 
-   
\ No newline at end of file
+
+class TestMessageThreads:
+    """Thread endpoint and threaded course listings"""
+
+    @pytest.fixture
+    def thread(self, app, sample_data):
+        """root -> (a -> (a1 -> a1x), b) in one course, plus a second root"""
+        with app.app_context():
+            educator = User.query.filter_by(role="educator").first()
+            course = Course(title="Threads", educator_id=educator.id, school_id=educator.school_id)
+            db.session.add(course)
+            db.session.commit()
+
+            def post(content, parent=None, minute=0):
+                message = Message(
+                    user_public_id=educator.public_id, course_id=course.id, content=content,
+                    parent_id=parent.id if parent else None, timestamp=datetime(2025, 1, 1, 9, minute),
+                )
+                db.session.add(message)
+                db.session.commit()
+                return message
+
+            root = post("root", minute=0)
+            a = post("a", root, 1)
+            b = post("b", root, 2)
+            a1 = post("a1", a, 3)
+            post("a1x", a1, 4)
+            other = post("other root", minute=10)
+            return {"course_id": course.id, "root": root.id, "a": a.id, "b": b.id, "other": other.id}
+
+    def test_thread_nests_replies(self, client, thread):
+        response = client.get(f"/api/messages/{thread['root']}/thread")
+        assert response.status_code == 200
+        data = response.json["data"]
+        root = data["thread"]
+        assert root["content"] == "root" and root["depth"] == 0
+        assert [r["content"] for r in root["replies"]] == ["a", "b"]
+        assert root["replies"][0]["replies"][0]["replies"][0]["content"] == "a1x"
+        assert data["count"] == 5 and data["truncated"] is False
+
+    def test_thread_depth_and_size_caps(self, client, thread):
+        data = client.get(f"/api/messages/{thread['root']}/thread?max_depth=1").json["data"]
+        assert data["count"] == 3
+        assert all(reply["replies"] == [] for reply in data["thread"]["replies"])
+
+        # Breadth-first: the cap keeps whole upper levels
+        data = client.get(f"/api/messages/{thread['root']}/thread?max_nodes=3").json["data"]
+        assert data["truncated"] is True
+        assert [r["content"] for r in data["thread"]["replies"]] == ["a", "b"]
+
+        assert client.get("/api/messages/99999/thread").status_code == 404
+
+    def test_thread_is_one_query(self, client, thread, query_budget):
+        client.get(f"/api/messages/{thread['a']}/thread")  # warm-up
+        with query_budget(1):
+            client.get(f"/api/messages/{thread['root']}/thread")
+
+    def test_threaded_course_listing(self, client, thread):
+        response = client.get(f"/api/messages?course_id={thread['course_id']}&threaded=true")
+        assert response.status_code == 200
+        data = response.json["data"]
+        # Newest root first, replies nested rather than listed
+        assert [m["content"] for m in data["messages"]] == ["other root", "root"]
+        assert len(data["messages"][1]["replies"]) == 2
+        assert data["meta"]["total"] == 2
+
+        etag = response.headers["ETag"]
+        assert client.get(
+            f"/api/messages?course_id={thread['course_id']}&threaded=true",
+            headers={"If-None-Match": etag},
+        ).status_code == 304
+
+        assert client.get("/api/messages?threaded=true").status_code == 400
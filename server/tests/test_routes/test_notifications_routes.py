@@ -0,0 +1,250 @@
+"""Tests for notification routes and the notification stream"""
+import json
+import time
+from datetime import datetime, timezone
+
+from app.extensions import db
+from app.models import Course, User
+from app.models.enrollment import Enrollment
+from app.models.notification import Notification
+from app.models.notification_counter import NotificationCounter
+from app.routes.notifications import _event_stream
+from app.utils.notifications import notify_course, notify_school
+from app.utils.pubsub import PollingBroker
+
+
+def _events(body):
+    """Parse an SSE body into (event, id, data) tuples, skipping comments."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+    return events
+
+
+def _student_public_id(app):
+    with app.app_context():
+        return User.query.filter_by(email="student@test.com").first().public_id
+
+
+class TestNotificationStream:
+    def _add(self, app, public_id, title, is_read=False):
+        with app.app_context():
+            notification = Notification(user_public_id=public_id, title=title, is_read=is_read)
+            db.session.add(notification)
+            db.session.commit()
+            return notification.id
+
+    def test_stream_replays_after_last_event_id(self, client, app, auth_headers, monkeypatch):
+        monkeypatch.setitem(app.config, "NOTIFICATION_STREAM_MAX_SECONDS", 0)
+        public_id = _student_public_id(app)
+        first = self._add(app, public_id, "Old", is_read=True)
+        second = self._add(app, public_id, "New assignment")
+
+        headers = {**auth_headers("student"), "Last-Event-ID": str(first)}
+        response = client.get("/api/notifications/stream", headers=headers)
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+
+        *notifications, unread = _events(response.get_data(as_text=True))
+        # The recent id window is sent again; the client drops ids it has seen
+        assert [(kind, data["id"]) for kind, _, data in notifications] == [
+            ("notification", first), ("notification", second)
+        ]
+        assert notifications[-1][1] == str(second)
+        assert unread[0] == "unread_count" and unread[2] == {"unread_count": 1}
+
+        monkeypatch.setitem(app.config, "NOTIFICATION_STREAM_ID_OVERLAP", 0)
+        response = client.get("/api/notifications/stream", headers=headers)
+        (kind, event_id, data), unread = _events(response.get_data(as_text=True))
+        assert (kind, event_id, data["title"]) == ("notification", str(second), "New assignment")
+
+    def test_stream_pushes_lower_id_committed_late(self, app, sample_data, monkeypatch):
+        monkeypatch.setitem(app.config, "NOTIFICATION_STREAM_HEARTBEAT_SECONDS", 0)
+        public_id = _student_public_id(app)
+        with app.app_context():
+            hub = app.extensions["notification_hub"]
+            stream = _event_stream(public_id, hub.subscribe(public_id), 0, time.monotonic() + 60)
+            try:
+                # A fan-out chunk holding id 5 commits after the one holding id 10
+                db.session.add(Notification(id=10, user_public_id=public_id, title="Second chunk"))
+                db.session.commit()
+                body = "".join(next(stream) for _ in range(3))
+                assert [data["id"] for kind, _, data in _events(body) if kind == "notification"] == [10]
+
+                db.session.add(Notification(id=5, user_public_id=public_id, title="First chunk"))
+                db.session.commit()
+                body = "".join(next(stream) for _ in range(3))
+                events = _events(body)
+                assert [(kind, event_id, data.get("id")) for kind, event_id, data in events] == [
+                    ("notification", "10", 5), ("unread_count", "10", None)
+                ]
+
+                # Neither is sent twice
+                assert next(stream) == ": keepalive\n\n"
+                assert "notification" not in next(stream)
+            finally:
+                stream.close()
+            assert hub.subscribed_users() == []
+
+    def test_fresh_stream_skips_existing_and_accepts_ticket(self, client, app, auth_headers, monkeypatch):
+        monkeypatch.setitem(app.config, "NOTIFICATION_STREAM_MAX_SECONDS", 0)
+        self._add(app, _student_public_id(app), "Already seen")
+
+        response = client.post("/api/notifications/stream/ticket", headers=auth_headers("student"))
+        assert response.status_code == 200
+        ticket = response.json["data"]["ticket"]
+
+        response = client.get(f"/api/notifications/stream?ticket={ticket}")
+        assert response.status_code == 200
+        assert [event for event, _, _ in _events(response.get_data(as_text=True))] == ["unread_count"]
+
+    def test_stream_rejects_tokens_in_url_and_bad_tickets(self, client, app, auth_headers, monkeypatch):
+        token = auth_headers("student")["Authorization"].split()[1]
+        assert client.get(f"/api/notifications/stream?jwt={token}").status_code == 401
+        assert client.get(f"/api/notifications/stream?ticket={token}").status_code == 401
+
+        ticket = client.post("/api/notifications/stream/ticket", headers=auth_headers("student")).json["data"]["ticket"]
+        monkeypatch.setitem(app.config, "NOTIFICATION_STREAM_TICKET_SECONDS", -1)
+        assert client.get(f"/api/notifications/stream?ticket={ticket}").status_code == 401
+
+    def test_stream_over_capacity_tells_client_to_poll(self, client, app, auth_headers, monkeypatch):
+        monkeypatch.setitem(app.config, "NOTIFICATION_STREAM_MAX_SECONDS", 0)
+        public_id = _student_public_id(app)
+        self._add(app, public_id, "Unread")
+        hub = app.extensions["notification_hub"]
+        monkeypatch.setattr(hub, "max_streams", 1)
+
+        with app.app_context():
+            held = hub.subscribe("someone-else")
+        try:
+            assert hub.subscribe(public_id) is None
+            response = client.get("/api/notifications/stream", headers=auth_headers("student"))
+            assert response.status_code == 200
+            assert response.headers["Retry-After"] == "60"
+            assert _events(response.get_data(as_text=True)) == [
+                ("busy", None, {"retry_after": 60, "unread_count": 1})
+            ]
+        finally:
+            hub.unsubscribe(held)
+
+        # A slot is free again
+        response = client.get("/api/notifications/stream", headers=auth_headers("student"))
+        assert [event for event, _, _ in _events(response.get_data(as_text=True))] == ["unread_count"]
+        assert hub.subscribed_users() == []
+
+    def test_stream_requires_token(self, client):
+        assert client.get("/api/notifications/stream").status_code == 401
+
+    def test_commit_wakes_subscribers(self, app, sample_data):
+        public_id = _student_public_id(app)
+        with app.app_context():
+            hub = app.extensions["notification_hub"]
+            subscription = hub.subscribe(public_id)
+            try:
+                db.session.add(Notification(user_public_id=public_id, title="Ping"))
+                db.session.commit()
+                assert subscription.wait(0)
+                # Nothing new since: no wake-up
+                assert not subscription.wait(0)
+            finally:
+                hub.unsubscribe(subscription)
+            assert hub.subscribed_users() == []
+
+    def test_polling_broker_reports_changed_users(self, app, sample_data):
+        public_id = _student_public_id(app)
+        with app.app_context():
+            broker = PollingBroker()
+            self._add(app, public_id, "Before")
+            assert broker.poll([public_id]) == set()
+
+            notification_id = self._add(app, public_id, "After")
+            assert broker.poll([public_id]) == {public_id}
+            assert broker.poll([public_id]) == set()
+
+            notification = db.session.get(Notification, notification_id)
+            notification.is_read = True
+            db.session.commit()
+            assert broker.poll([public_id]) == {public_id}
+
+
+class TestNotificationFanOut:
+    def _add_students(self, school_id, count):
+        students = [
+            User(name=f"Student {i}", email=f"fanout{i}@test.com", role="student", school_id=school_id)
+            for i in range(count)
+        ]
+        for student in students:
+            student.set_password("password123")
+        db.session.add_all(students)
+        db.session.commit()
+        return students
+
+    def test_school_fan_out_in_chunks(self, app, sample_data, monkeypatch):
+        monkeypatch.setitem(app.config, "NOTIFICATION_FANOUT_CHUNK_SIZE", 2)
+        with app.app_context():
+            school_id = User.query.filter_by(email="manager@test.com").first().school_id
+            self._add_students(school_id, 3)
+            manager = User.query.filter_by(role="manager").first()
+
+            sent = notify_school(school_id, "Closed Friday", roles=["student"], exclude=[manager.public_id])
+
+            # sample student + 3 new ones
+            assert sent == 4
+            assert Notification.query.filter_by(title="Closed Friday").count() == 4
+            assert Notification.query.filter_by(user_public_id=manager.public_id).count() == 0
+            assert NotificationCounter.unread_for(User.query.filter_by(email="fanout0@test.com").first().public_id) == 1
+
+    def test_course_fan_out_reaches_enrolled_students_and_educator(self, app, sample_data):
+        with app.app_context():
+            educator = User.query.filter_by(role="educator").first()
+            course = Course(title="Physics", educator_id=educator.id, school_id=educator.school_id)
+            db.session.add(course)
+            enrolled, not_enrolled = self._add_students(educator.school_id, 2)
+            db.session.add(Enrollment(user_public_id=enrolled.public_id, course_id=course.id,
+                                      date_enrolled=datetime.now(timezone.utc)))
+            db.session.commit()
+
+            sent = notify_course(course, "Lab moved", link={"student": "/student/courses"})
+
+            assert sent == 2
+            rows = {n.user_public_id: n.link for n in Notification.query.all()}
+            assert rows == {enrolled.public_id: "/student/courses", educator.public_id: None}
+
+
+class TestUnreadCount:
+    def test_unread_count_follows_reads_without_touching_notifications(self, client, app, auth_headers, query_budget):
+        headers = auth_headers("student")
+        public_id = _student_public_id(app)
+        with app.app_context():
+            db.session.add_all([Notification(user_public_id=public_id, title=str(i)) for i in range(3)])
+            db.session.commit()
+            first_id = Notification.query.first().id
+
+        client.get("/api/notifications/unread-count", headers=headers)  # warm-up
+        # revocation refresh + user + counter
+        with query_budget(3) as stats:
+            response = client.get("/api/notifications/unread-count", headers=headers)
+        assert response.json["data"]["unread_count"] == 3
+        assert not any("FROM notifications" in sql for sql in stats.fingerprints)
+
+        client.patch(f"/api/notifications/{first_id}", headers=headers)
+        assert client.get("/api/notifications/unread-count", headers=headers).json["data"]["unread_count"] == 2
+
+        client.post("/api/notifications/mark-all-read", headers=headers)
+        assert client.get("/api/notifications/unread-count", headers=headers).json["data"]["unread_count"] == 0
+        assert client.get("/api/notifications", headers=headers).json["data"]["unread_count"] == 0
+
+    def test_mark_all_read_keeps_concurrent_increments(self, client, app, auth_headers):
+        headers = auth_headers("student")
+        public_id = _student_public_id(app)
+        with app.app_context():
+            db.session.add_all([Notification(user_public_id=public_id, title=str(i)) for i in range(2)])
+            db.session.commit()
+            # A fan-out chunk's +1 whose notification row the bulk update will not see
+            NotificationCounter.increment([public_id])
+            db.session.commit()
+
+        client.post("/api/notifications/mark-all-read", headers=headers)
+        assert client.get("/api/notifications/unread-count", headers=headers).json["data"]["unread_count"] == 1
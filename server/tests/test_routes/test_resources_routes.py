@@ -1,4 +1,15 @@
-import json
+import gzip
+import hashlib
+import io
+import os
+import time
+from datetime import datetime, timezone
+
+from app.extensions import db
+from app.models import Course, Enrollment, Job, Resource, School, User
+from app.utils.previews import run_preview_worker
+from app.utils.signing import sign_upload_url
+from app.utils.storage import S3Storage, get_storage
 
 
 def test_get_resources_list(client, auth_headers):
@@ -23,3 +34,288 @@ def test_get_resources_with_pagination(client, auth_headers):
     data = resp.get_json()
     assert "data" in data
     assert "resources" in data["data"]
+
+
+def _upload(client, headers, course_id, content, filename="notes.pdf"):
+    return client.post(
+        "/api/resources",
+        headers=headers,
+        data={
+            "title": filename,
+            "type": "pdf",
+            "course_id": str(course_id),
+            "file": (io.BytesIO(content), filename),
+        },
+        content_type="multipart/form-data",
+    )
+
+
+def test_upload_is_content_addressed(app, client, auth_headers):
+    """Identical uploads are stored once under their SHA-256"""
+    with app.app_context():
+        educator = User.query.filter_by(email="educator@test.com").first()
+        courses = [
+            Course(title=f"Course {n}", educator_id=educator.id, school_id=educator.school_id)
+            for n in range(2)
+        ]
+        db.session.add_all(courses)
+        db.session.commit()
+        course_ids = [course.id for course in courses]
+
+    content = b"%PDF-1.4 lecture notes" * 1000
+    digest = hashlib.sha256(content).hexdigest()
+    headers = auth_headers("educator")
+
+    first = _upload(client, headers, course_ids[0], content)
+    second = _upload(client, headers, course_ids[1], content, filename="copy.pdf")
+    assert first.status_code == 201
+    assert second.status_code == 201
+
+    a, b = first.get_json()["data"], second.get_json()["data"]
+    assert a["id"] != b["id"]
+    assert a["sha256"] == b["sha256"] == digest
+    assert a["size"] == len(content)
+    assert a["mime_type"] == "application/pdf"
+    assert a["url"] == b["url"]
+    assert a["url"].startswith(f"/uploads/{digest[:2]}/{digest}.pdf?")
+
+    folder = os.path.join(app.config["UPLOAD_FOLDER"], digest[:2])
+    assert os.listdir(folder) == [f"{digest}.pdf"]
+
+    served = client.get(a["url"])
+    assert served.data == content
+    served.close()
+
+
+def test_uploads_with_same_name_do_not_overwrite(app, client, auth_headers):
+    with app.app_context():
+        educator = User.query.filter_by(email="educator@test.com").first()
+        course = Course(title="Names", educator_id=educator.id, school_id=educator.school_id)
+        db.session.add(course)
+        db.session.commit()
+        course_id = course.id
+
+    headers = auth_headers("educator")
+    first = _upload(client, headers, course_id, b"first version").get_json()["data"]
+    second = _upload(client, headers, course_id, b"second version").get_json()["data"]
+    assert first["url"] != second["url"]
+    assert client.get(first["url"]).data == b"first version"
+
+
+def _store(app, content, filename):
+    """(stored file, signed download URL)"""
+    with app.test_request_context():
+        stored = get_storage().save(io.BytesIO(content), filename)
+        return stored, sign_upload_url(stored.url)
+
+
+def test_uploads_are_cached_as_immutable(app, client):
+    stored, url = _store(app, b"video bytes" * 100, "lecture.mp4")
+
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] == f'"{stored.sha256}"'
+    cache_control = resp.headers["Cache-Control"]
+    assert "immutable" in cache_control and "max-age=31536000" in cache_control
+    resp.close()
+
+    resp = client.get(url, headers={"If-None-Match": f'"{stored.sha256}"'})
+    assert resp.status_code == 304
+
+
+def test_uploads_support_range_requests(app, client):
+    content = bytes(range(256)) * 40
+    stored, url = _store(app, content, "clip.mp4")
+
+    resp = client.get(url, headers={"Range": "bytes=100-199"})
+    assert resp.status_code == 206
+    assert resp.data == content[100:200]
+    assert resp.headers["Content-Range"] == f"bytes 100-199/{len(content)}"
+    resp.close()
+
+
+def test_text_uploads_served_precompressed(app, client):
+    content = b"week 1 reading list\n" * 200
+    stored, url = _store(app, content, "notes.txt")
+
+    resp = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Content-Type"].startswith("text/plain")
+    assert resp.headers["ETag"] == f'"{stored.sha256}-gzip"'
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert gzip.decompress(resp.data) == content
+    resp.close()
+
+    resp = client.get(url)
+    assert "Content-Encoding" not in resp.headers
+    assert resp.data == content
+    resp.close()
+
+
+def test_uploads_offloaded_with_accel_redirect(app, client):
+    stored, url = _store(app, b"handout" * 300, "handout.pdf")
+
+    app.config["UPLOAD_ACCEL_REDIRECT"] = "/protected-uploads/"
+    try:
+        resp = client.get(url)
+    finally:
+        app.config["UPLOAD_ACCEL_REDIRECT"] = None
+    assert resp.status_code == 200
+    assert resp.headers["X-Accel-Redirect"] == f"/protected-uploads/{stored.key}"
+    assert resp.data == b""
+    assert "immutable" in resp.headers["Cache-Control"]
+
+
+def test_uploads_require_a_valid_signature(app, client):
+    stored, url = _store(app, b"exam paper" * 100, "exam.pdf")
+
+    assert client.get(stored.url).status_code == 403
+    tampered = url[:-4] + ("AAAA" if not url.endswith("AAAA") else "BBBB")
+    assert client.get(tampered).status_code == 403
+
+    with app.test_request_context():
+        expired = sign_upload_url(stored.url, now=time.time() - 3 * app.config.get("UPLOAD_URL_TTL_SECONDS", 3600))
+    assert client.get(expired).status_code == 403
+
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert "private" in resp.headers["Cache-Control"]
+    resp.close()
+
+
+class _FakeS3Client:
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://bucket.example/{Params['Key']}?X-Amz-Expires={ExpiresIn}&X-Amz-Signature=abc"
+
+
+def _fake_s3(**kwargs):
+    # Skips __init__, which needs boto3
+    storage = S3Storage.__new__(S3Storage)
+    storage.client, storage.bucket, storage.prefix = _FakeS3Client(), "jifunze", "uploads/"
+    storage.public_url, storage.url_prefix, storage.presign_seconds = None, "/uploads", 300
+    for name, value in kwargs.items():
+        setattr(storage, name, value)
+    return storage
+
+
+def test_s3_uploads_store_a_stable_url_and_redirect_to_presigned(app, client, monkeypatch):
+    storage = _fake_s3()
+    key = f"ab/{'ab' * 32}.pdf"
+    # Short enough for Resource.url and never expires; no query string to leak into the key
+    assert storage.url(key) == f"/uploads/{key}"
+    assert _fake_s3(public_url="https://cdn.example").url(key) == f"https://cdn.example/uploads/{key}"
+
+    monkeypatch.setitem(app.extensions, "storage", storage)
+    with app.test_request_context():
+        url = sign_upload_url(storage.url(key))
+    resp = client.get(url)
+    assert resp.status_code == 302
+    assert resp.headers["Location"].startswith(f"https://bucket.example/uploads/{key}?X-Amz-Expires=300")
+    assert "no-store" in resp.headers["Cache-Control"]
+
+    assert client.get(storage.url(key)).status_code == 403
+
+
+def test_resource_detail_returns_signed_url(app, client, auth_headers):
+    stored, _ = _store(app, b"slides" * 200, "slides.pdf")
+    with app.app_context():
+        educator = User.query.filter_by(email="educator@test.com").first()
+        course = Course(title="Signed", educator_id=educator.id, school_id=educator.school_id)
+        db.session.add(course)
+        db.session.flush()
+        resource = Resource(title="Slides", type="pdf", url=stored.url, course_id=course.id,
+                            uploaded_by_public_id=educator.public_id)
+        db.session.add(resource)
+        db.session.commit()
+        resource_id = resource.id
+
+    headers = auth_headers("educator")
+    url = client.get(f"/api/resources/{resource_id}", headers=headers).get_json()["data"]["url"]
+    assert url.startswith(stored.url + "?expires=")
+    resp = client.get(url)
+    assert resp.status_code == 200
+    resp.close()
+
+    # A signed URL sent back on update is stored unsigned
+    client.put(f"/api/resources/{resource_id}", headers=headers, json={"url": url})
+    with app.app_context():
+        assert db.session.get(Resource, resource_id).url == stored.url
+
+
+def test_resources_only_readable_in_callers_courses(app, client, auth_headers):
+    stored, _ = _store(app, b"answers" * 200, "answers.pdf")
+    with app.app_context():
+        educator = User.query.filter_by(email="educator@test.com").first()
+        course = Course(title="Private", educator_id=educator.id, school_id=educator.school_id)
+        other_school = School(name="Other School", address="Elsewhere", owner_id=99)
+        db.session.add_all([course, other_school])
+        db.session.flush()
+        outsider = User(name="Other Manager", email="other@test.com", role="manager", school_id=other_school.id)
+        outsider.set_password("password123")
+        db.session.add(outsider)
+        resource = Resource(title="Answers", type="pdf", url=stored.url, course_id=course.id,
+                            uploaded_by_public_id=educator.public_id)
+        db.session.add(resource)
+        db.session.commit()
+        resource_id, course_id = resource.id, course.id
+        student = User.query.filter_by(email="student@test.com").first()
+        student_public_id, outsider_id, other_school_id = student.public_id, outsider.id, other_school.id
+
+    def fetch(headers):
+        with app.app_context():
+            detail = client.get(f"/api/resources/{resource_id}", headers=headers)
+        with app.app_context():
+            listing = client.get("/api/resources", headers=headers).get_json()["data"]["resources"]
+        return detail, listing
+
+    # A student who is not enrolled, and a manager of another school, get no link
+    for headers in (auth_headers("student"),
+                    auth_headers("manager", school_id=other_school_id, user_id=outsider_id)):
+        detail, listing = fetch(headers)
+        assert detail.status_code == 404
+        assert "url" not in detail.get_data(as_text=True)
+        assert listing == []
+
+    with app.app_context():
+        db.session.add(Enrollment(user_public_id=student_public_id, course_id=course_id,
+                                  date_enrolled=datetime.now(timezone.utc)))
+        db.session.commit()
+    detail, listing = fetch(auth_headers("student"))
+    assert detail.status_code == 200
+    assert detail.get_json()["data"]["url"].startswith(stored.url + "?expires=")
+    assert [row["id"] for row in listing] == [resource_id]
+
+
+def test_text_upload_gets_preview_from_worker(app, client, auth_headers):
+    with app.app_context():
+        educator = User.query.filter_by(email="educator@test.com").first()
+        course = Course(title="Previews", educator_id=educator.id, school_id=educator.school_id)
+        db.session.add(course)
+        db.session.commit()
+        course_id = course.id
+
+    content = ("Week one covers   photosynthesis.\n\n" + "Light reactions and the Calvin cycle. " * 40).encode()
+    digest = hashlib.sha256(content).hexdigest()
+    headers = auth_headers("educator")
+    created = _upload(client, headers, course_id, content, filename="week1.txt").get_json()["data"]
+    # Rendered in the background, not during the upload
+    assert created["preview_url"] is None
+    with app.app_context():
+        job = Job.query.filter_by(kind="resource_preview").one()
+        assert (job.status, job.payload) == ("queued", {"resource_id": created["id"]})
+
+        assert run_preview_worker(processes=1, once=True) == 1
+        job = db.session.get(Job, job.id)
+        assert (job.status, job.result) == ("done", {"preview_key": f"{digest[:2]}/{digest}.excerpt.txt"})
+
+    preview_url = client.get(f"/api/resources/{created['id']}", headers=headers).get_json()["data"]["preview_url"]
+    assert preview_url.startswith(f"/uploads/{digest[:2]}/{digest}.excerpt.txt?")
+    excerpt = client.get(preview_url).get_data(as_text=True)
+    assert excerpt.startswith("Week one covers photosynthesis. Light reactions")
+    assert len(excerpt) <= 501
+
+    # The same file uploaded again reuses the preview without a new job
+    again = _upload(client, headers, course_id, content, filename="copy.txt").get_json()["data"]
+    assert again["preview_url"] is not None
+    with app.app_context():
+        assert Job.query.filter_by(kind="resource_preview").count() == 1
@@ -1,7 +1,11 @@
 """Tests for School routes"""
 import pytest
+from datetime import date
 from app.models.user import User
 from app.models.school import School
+from app.models.course import Course
+from app.models.attendance import Attendance
+from app.models.resource import Resource
 from app.extensions import db
 from flask_jwt_extended import create_access_token
 
@@ -146,3 +150,169 @@ class TestSchoolRoutes:
 
             response = client.post("/api/schools", json=data, headers=headers)
             assert response.status_code == 403
+
+    def test_dashboard_query_count_constant(self, app, client, query_budget):
+        """Test dashboard issues the same number of queries for 1 or 10 schools"""
+        with app.app_context():
+            manager = User(name="Manager", email="manager@test.com", role="manager")
+            manager.set_password("password123")
+            db.session.add(manager)
+            db.session.commit()
+
+            token = create_access_token(
+                identity=manager.public_id,
+                additional_claims={"role": "manager"}
+            )
+            headers = {"Authorization": f"Bearer {token}"}
+
+            def add_school(n):
+                school = School(name=f"School {n}", address="Test Address", owner_id=manager.id)
+                db.session.add(school)
+                db.session.commit()
+                for i, role in enumerate(("student", "student", "educator")):
+                    user = User(name=f"User {n}-{i}", email=f"user{n}-{i}@test.com", role=role, school_id=school.id)
+                    user.password_hash = "x"
+                    db.session.add(user)
+                db.session.commit()
+                educator = User.query.filter_by(email=f"user{n}-2@test.com").first()
+                db.session.add(Course(title=f"Course {n}", educator_id=educator.id, school_id=school.id))
+                db.session.commit()
+
+            def dashboard_query_count():
+                with query_budget(5) as stats:
+                    response = client.get("/api/schools/dashboard", headers=headers)
+                assert response.status_code == 200
+                assert response.headers["X-Query-Count"] == str(stats.count)
+                return stats.count, response.json["data"]["dashboard"]
+
+            add_school(0)
+            client.get("/api/schools/dashboard", headers=headers)  # warm per-process caches
+            single_count, dashboard = dashboard_query_count()
+            assert dashboard["schools"][0]["students"] == 2
+            assert dashboard["schools"][0]["educators"] == 1
+            assert dashboard["schools"][0]["total_courses"] == 1
+
+            for n in range(1, 10):
+                add_school(n)
+            many_count, dashboard = dashboard_query_count()
+
+            assert many_count == single_count
+            assert dashboard["total_schools"] == 10
+            assert dashboard["stats"]["students"] == 20
+            assert dashboard["stats"]["total_users"] == 30
+            assert dashboard["stats"]["total_courses"] == 10
+            assert dashboard["recent_activity"]["new_users_this_week"] == 30
+
+    def test_school_stats_course_rollups(self, app, client):
+        """Test per-course and school attendance rates from one grouped query"""
+        with app.app_context():
+            manager = User(name="Manager", email="manager@test.com", role="manager")
+            manager.set_password("password123")
+            db.session.add(manager)
+            db.session.commit()
+
+            school = School(name="Test School", address="Test Address", owner_id=manager.id)
+            db.session.add(school)
+            db.session.commit()
+
+            student = User(name="Student", email="student@test.com", role="student", school_id=school.id)
+            student.set_password("password123")
+            db.session.add(student)
+            db.session.commit()
+
+            busy = Course(title="Busy Course", educator_id=manager.id, school_id=school.id)
+            empty = Course(title="Empty Course", educator_id=manager.id, school_id=school.id)
+            db.session.add_all([busy, empty])
+            db.session.commit()
+
+            for day, status in ((1, "present"), (2, "present"), (3, "absent"), (4, "late")):
+                db.session.add(Attendance(
+                    user_public_id=student.public_id,
+                    course_id=busy.id,
+                    date=date(2025, 1, day),
+                    status=status
+                ))
+            db.session.commit()
+
+            token = create_access_token(
+                identity=manager.public_id,
+                additional_claims={"role": "manager"}
+            )
+            headers = {"Authorization": f"Bearer {token}"}
+
+            response = client.get(f"/api/schools/{school.id}/stats", headers=headers)
+            assert response.status_code == 200
+            data = response.json["data"]
+            assert data["attendance"] == 50.0
+            assert data["courses"] == [
+                {"course": "Busy Course", "avg_attendance": 50.0},
+                {"course": "Empty Course", "avg_attendance": 0},
+            ]
+
+    def test_school_courses_filtered_and_paginated(self, app, client, query_budget):
+        """Test school courses filter in SQL, paginate, and load nested data per page"""
+        with app.app_context():
+            manager = User(name="Manager", email="manager@test.com", role="manager")
+            manager.set_password("password123")
+            db.session.add(manager)
+            db.session.commit()
+
+            school = School(name="Test School", address="Test Address", owner_id=manager.id)
+            db.session.add(school)
+            db.session.commit()
+            manager.school_id = school.id
+
+            educators = []
+            for i in range(2):
+                educator = User(name=f"Educator {i}", email=f"educator{i}@test.com", role="educator", school_id=school.id)
+                educator.password_hash = "x"
+                educators.append(educator)
+            db.session.add_all(educators)
+            db.session.commit()
+
+            def add_course(title, educator):
+                course = Course(title=title, description="Intro course", educator_id=educator.id, school_id=school.id)
+                db.session.add(course)
+                db.session.commit()
+                db.session.add(Resource(course_id=course.id, uploaded_by_public_id=educator.public_id,
+                                        title=f"{title} notes", url="/uploads/notes.pdf", type="pdf"))
+                db.session.commit()
+
+            token = create_access_token(
+                identity=manager.public_id,
+                additional_claims={"role": "manager", "school_id": school.id}
+            )
+            headers = {"Authorization": f"Bearer {token}"}
+            url = f"/api/schools/{school.id}/courses"
+
+            add_course("Algebra", educators[0])
+            client.get(url, headers=headers)  # warm per-process caches
+            with query_budget(10) as single:
+                response = client.get(url, headers=headers)
+            assert response.status_code == 200
+
+            for title, educator in [("Geometry", educators[0]), ("Biology", educators[1]),
+                                    ("Chemistry", educators[1]), ("Linear Algebra", educators[1])]:
+                add_course(title, educator)
+            with query_budget(10) as many:
+                response = client.get(url, headers=headers)
+            data = response.json["data"]
+            assert many.count == single.count
+            assert data["school"] == {"id": school.id, "name": "Test School"}
+            assert data["meta"]["total"] == 5
+            assert data["courses"][0]["resources"][0]["uploader"]["name"].startswith("Educator")
+
+            response = client.get(f"{url}?search=algebra", headers=headers)
+            assert sorted(c["title"] for c in response.json["data"]["courses"]) == ["Algebra", "Linear Algebra"]
+
+            response = client.get(f"{url}?educator_id={educators[0].id}&search=algebra", headers=headers)
+            assert [c["title"] for c in response.json["data"]["courses"]] == ["Algebra"]
+
+            response = client.get(f"{url}?per_page=2", headers=headers)
+            data = response.json["data"]
+            assert len(data["courses"]) == 2
+            assert data["meta"]["pages"] == 3
+            assert data["links"]["next"] is not None
+
+            response = client.get(f"{url}?educator_id=abc", headers=headers)
+            assert response.status_code == 400
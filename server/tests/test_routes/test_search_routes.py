@@ -0,0 +1,103 @@
+"""Tests for the search endpoint"""
+from datetime import datetime, timezone
+
+from app.extensions import db
+from app.models import Course, Resource, School, User
+from app.models.enrollment import Enrollment
+from app.models.message import Message
+
+
+def _ids(response, entity_type):
+    return [hit["id"] for hit in response.json["data"]["results"] if hit["type"] == entity_type]
+
+
+class TestSearchResource:
+    @staticmethod
+    def _seed(app):
+        with app.app_context():
+            school = School.query.first()
+            educator = User.query.filter_by(email="educator@test.com").first()
+            student = User.query.filter_by(email="student@test.com").first()
+
+            algebra = Course(title="Algebra Basics", description="Linear equations",
+                             educator_id=educator.id, school_id=school.id)
+            history = Course(title="World History", description="Ancient algebraic texts",
+                             educator_id=educator.id, school_id=school.id)
+            db.session.add_all([algebra, history])
+            db.session.commit()
+
+            db.session.add(Enrollment(user_public_id=student.public_id, course_id=algebra.id,
+                                      date_enrolled=datetime.now(timezone.utc)))
+            db.session.add(Resource(title="Algebra worksheet", url="https://example.com/a.pdf", type="pdf",
+                                    course_id=algebra.id, uploaded_by_public_id=educator.public_id))
+            db.session.add(Resource(title="Algebra in antiquity", url="https://example.com/h.pdf", type="pdf",
+                                    course_id=history.id, uploaded_by_public_id=educator.public_id))
+            db.session.add(Message(content="Homework on quadratic equations", course_id=algebra.id,
+                                   user_public_id=educator.public_id, timestamp=datetime.now(timezone.utc)))
+
+            # Another school's course must never show up
+            other_owner = User(name="Other Manager", email="other@test.com", role="manager")
+            other_owner.set_password("password123")
+            db.session.add(other_owner)
+            db.session.commit()
+            other = School(name="Other School", address="Elsewhere", owner_id=other_owner.id)
+            db.session.add(other)
+            db.session.commit()
+            db.session.add(Course(title="Algebra Elsewhere", educator_id=other_owner.id, school_id=other.id))
+            db.session.commit()
+            return algebra.id, history.id
+
+    def test_prefix_match_ranks_titles_first(self, client, app, auth_headers):
+        algebra_id, history_id = self._seed(app)
+
+        response = client.get("/api/search?q=alg&type=course", headers=auth_headers("educator"))
+        assert response.status_code == 200
+        # Title match outranks a description match; other school excluded
+        assert _ids(response, "course") == [algebra_id, history_id]
+
+    def test_all_terms_must_match(self, client, app, auth_headers):
+        algebra_id, _ = self._seed(app)
+
+        response = client.get("/api/search?q=algebra+lin", headers=auth_headers("educator"))
+        assert _ids(response, "course") == [algebra_id]
+
+    def test_type_filter_and_validation(self, client, app, auth_headers):
+        self._seed(app)
+        headers = auth_headers("educator")
+
+        response = client.get("/api/search?q=equations&type=message", headers=headers)
+        assert {hit["type"] for hit in response.json["data"]["results"]} == {"message"}
+
+        assert client.get("/api/search?q=x&type=grades", headers=headers).status_code == 400
+        assert client.get("/api/search", headers=headers).status_code == 400
+
+    def test_students_only_see_enrolled_course_content(self, client, app, auth_headers):
+        self._seed(app)
+
+        response = client.get("/api/search?q=algebra&type=resource", headers=auth_headers("student"))
+        titles = [hit["title"] for hit in response.json["data"]["results"]]
+        assert titles == ["Algebra worksheet"]
+
+    def test_index_follows_updates_and_deletes(self, client, app, auth_headers):
+        algebra_id, history_id = self._seed(app)
+        headers = auth_headers("educator")
+
+        with app.app_context():
+            db.session.get(Course, history_id).title = "Geometry"
+            db.session.commit()
+            db.session.delete(db.session.get(Course, history_id))
+            db.session.commit()
+
+        response = client.get("/api/search?q=geometry", headers=headers)
+        assert response.json["data"]["results"] == []
+
+        with app.app_context():
+            db.session.get(Course, algebra_id).title = "Trigonometry"
+            db.session.commit()
+        response = client.get("/api/search?q=trig&type=course", headers=headers)
+        assert _ids(response, "course") == [algebra_id]
+
+    def test_user_listing_search_uses_index(self, client, app, auth_headers):
+        response = client.get("/api/schools/1/users?search=educ", headers=auth_headers("manager"))
+        assert response.status_code == 200
+        assert [u["email"] for u in response.json["data"]["users"]] == ["educator@test.com"]
@@ -0,0 +1,149 @@
+"""Tests for bulk CSV user import"""
+import io
+
+from app.extensions import db
+from app.models import Job, School, User
+from app.utils.jobs import work
+
+GOOD_CSV = (
+    "name,email,role,password\n"
+    "Jane Wanjiru,Jane@Import.test,educator,secret123\n"
+    "Otieno Kamau,otieno@import.test,,secret123\n"
+)
+
+
+def _url(app):
+    with app.app_context():
+        return f"/api/schools/{School.query.first().id}/users/import"
+
+
+def _post_csv(client, url, headers, text):
+    data = {"file": (io.BytesIO(text.encode("utf-8")), "users.csv")}
+    return client.post(url, data=data, headers=headers, content_type="multipart/form-data")
+
+
+def _run_import(app, client, headers, response):
+    """Run the queued import job; returns its result."""
+    assert response.status_code == 202
+    with app.app_context():
+        assert work(kinds=["user_import"], once=True) == 1
+    job = client.get(response.headers["Location"], headers=headers)
+    assert job.json["data"]["status"] == "done"
+    return job.json["data"]["result"]
+
+
+class TestUserImport:
+    def test_import_creates_users(self, app, client, auth_headers):
+        url = _url(app)
+        headers = auth_headers("manager")
+        response = _post_csv(client, url, headers, GOOD_CSV)
+        with app.app_context():
+            # Nothing is hashed or inserted in the request
+            assert User.query.filter_by(email="jane@import.test").first() is None
+        result = _run_import(app, client, headers, response)
+        assert result["created"] == 2
+        assert result["errors"] == []
+
+        with app.app_context():
+            jane = User.query.filter_by(email="jane@import.test").first()
+            otieno = User.query.filter_by(email="otieno@import.test").first()
+            assert jane.role == "educator"
+            assert otieno.role == "student"
+            assert jane.school_id == School.query.first().id
+            assert jane.public_id in result["public_ids"]
+            # Plaintext passwords are not kept on the finished job
+            assert "rows" not in Job.query.one().payload
+
+        login = client.post("/api/auth/login", json={"email": "otieno@import.test", "password": "secret123"})
+        assert login.status_code == 200
+
+        # Bulk-inserted users are in the search index
+        hits = client.get("/api/search?q=wanjiru&type=user", headers=auth_headers("manager"))
+        assert [hit["name"] for hit in hits.json["data"]["results"]] == ["Jane Wanjiru"]
+
+    def test_accepts_raw_csv_body(self, app, client, auth_headers):
+        headers = {**auth_headers("manager"), "Content-Type": "text/csv"}
+        response = client.post(_url(app), data="\ufeff" + GOOD_CSV, headers=headers)
+        assert _run_import(app, client, headers, response)["created"] == 2
+
+    def test_invalid_rows_reported_and_nothing_imported(self, app, client, auth_headers):
+        csv_text = (
+            "name,email,role,password\n"
+            "Good Row,good@import.test,student,secret123\n"
+            "Bad Email,not-an-email,student,secret123\n"
+            "Again,GOOD@import.test,student,secret123\n"
+            "Existing,student@test.com,student,secret123\n"
+            "Short,short@import.test,student,123\n"
+            "Wrong Role,role@import.test,admin,secret123\n"
+        )
+        with app.app_context():
+            before = User.query.count()
+
+        response = _post_csv(client, _url(app), auth_headers("manager"), csv_text)
+        assert response.status_code == 400
+        rows = {row["line"]: row["errors"] for row in response.json["errors"]["rows"]}
+        assert sorted(rows) == [3, 4, 5, 6, 7]
+        assert "email" in rows[3]
+        assert rows[4]["email"] == ["Duplicate of line 2"]
+        assert rows[5]["email"] == ["Email already registered"]
+        assert "password" in rows[6]
+        assert "role" in rows[7]
+        assert response.json["errors"]["valid_rows"] == 1
+
+        with app.app_context():
+            assert User.query.count() == before
+            assert Job.query.count() == 0
+
+    def test_skip_invalid_imports_valid_rows(self, app, client, auth_headers):
+        csv_text = (
+            "name,email,password\n"
+            "Good Row,good@import.test,secret123\n"
+            "Existing,manager@test.com,secret123\n"
+        )
+        headers = auth_headers("manager")
+        response = _post_csv(client, _url(app) + "?skip_invalid=true", headers, csv_text)
+        result = _run_import(app, client, headers, response)
+        assert result["created"] == 1
+        assert result["skipped"] == 1
+        assert result["errors"][0]["line"] == 3
+
+        with app.app_context():
+            assert User.query.filter_by(email="good@import.test").count() == 1
+
+    def test_email_registered_after_upload_rejects_import(self, app, client, auth_headers):
+        headers = auth_headers("manager")
+        response = _post_csv(client, _url(app), headers, GOOD_CSV)
+        with app.app_context():
+            early = User(name="Early Bird", email="otieno@import.test", role="student")
+            early.set_password("secret123")
+            db.session.add(early)
+            db.session.commit()
+            before = User.query.count()
+
+        result = _run_import(app, client, headers, response)
+        assert result["created"] == 0
+        assert result["errors"][0]["line"] == 3
+        assert result["errors"][0]["errors"]["email"] == ["Email already registered"]
+        with app.app_context():
+            assert User.query.count() == before
+
+    def test_missing_columns_rejected(self, app, client, auth_headers):
+        response = _post_csv(client, _url(app), auth_headers("manager"), "name,email\nA B,a@b.test\n")
+        assert response.status_code == 400
+        assert "password" in response.json["message"]
+
+    def test_requires_manager_of_school(self, app, client, auth_headers):
+        url = _url(app)
+        response = _post_csv(client, url, auth_headers("educator"), GOOD_CSV)
+        assert response.status_code == 403
+
+        with app.app_context():
+            other = School(name="Other School", address="Elsewhere", owner_id=1)
+            db.session.add(other)
+            db.session.commit()
+            other_url = f"/api/schools/{other.id}/users/import"
+        response = _post_csv(client, other_url, auth_headers("manager"), GOOD_CSV)
+        assert response.status_code == 403
+
+        with app.app_context():
+            assert User.query.filter_by(email="jane@import.test").first() is None
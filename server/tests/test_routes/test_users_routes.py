@@ -3,8 +3,12 @@ from uuid import uuid4
 from datetime import datetime, timedelta, timezone
 from app.models.user import User
 from app.models.school import School
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.resource import Resource
 from app.models.reset_password import ResetPassword
 from app import db
+from flask_jwt_extended import create_access_token
 
 @pytest.fixture
 def manager_user(app, school):
@@ -202,3 +206,147 @@ class TestUserDashboardResource:
             assert response.json["success"] is True
             assert "user_stats" in response.json["data"]["dashboard"]
 
+
+class TestUserCoursesResource:
+    """Test /users/me/courses endpoint"""
+
+    @pytest.fixture
+    def educator_data(self, app):
+        with app.app_context():
+            owner = User(name="Owner", email="owner@example.com", role="manager", password_hash="x")
+            db.session.add(owner)
+            db.session.commit()
+            school = School(name="Courses School", owner_id=owner.id)
+            db.session.add(school)
+            db.session.commit()
+
+            educator = User(name="Educator", email="educator@example.com", role="educator", school_id=school.id)
+            educator.set_password("password123")
+            student = User(name="Student", email="enrolled@example.com", role="student", school_id=school.id)
+            student.set_password("password123")
+            db.session.add_all([educator, student])
+            db.session.commit()
+            yield {"educator": educator, "student": student, "school": school}
+
+    def _add_course(self, educator, school, n):
+        course = Course(title=f"Course {n}", educator_id=educator.id, school_id=school.id)
+        db.session.add(course)
+        db.session.commit()
+        for i in range(2):
+            db.session.add(Resource(
+                course_id=course.id, uploaded_by_public_id=educator.public_id,
+                title=f"Resource {n}-{i}", url=f"/uploads/{n}-{i}.pdf", type="pdf"
+            ))
+        db.session.commit()
+        return course
+
+    def _login(self, client, email):
+        response = client.post("/api/auth/login", json={"email": email, "password": "password123"})
+        assert response.status_code == 200
+        assert "courses" not in response.json["data"]["user"]
+        return {"Authorization": f"Bearer {response.json['data']['access_token']}"}
+
+    def test_educator_courses_constant_queries(self, app, client, educator_data, query_budget):
+        """Test educator course tree loads in the same number of queries for 1 or 5 courses"""
+        with app.app_context():
+            educator, school = educator_data["educator"], educator_data["school"]
+            headers = self._login(client, educator.email)
+
+            self._add_course(educator, school, 0)
+            client.get("/api/users/me/courses", headers=headers)  # warm per-process caches
+            with query_budget(6) as single:
+                response = client.get("/api/users/me/courses?include=resources", headers=headers)
+            assert response.status_code == 200
+            courses = response.json["data"]["courses"]
+            assert len(courses) == 1
+            assert [r["title"] for r in courses[0]["resources"]] == ["Resource 0-0", "Resource 0-1"]
+
+            for n in range(1, 5):
+                self._add_course(educator, school, n)
+            with query_budget(6) as many:
+                response = client.get("/api/users/me/courses?include=resources", headers=headers)
+            assert len(response.json["data"]["courses"]) == 5
+            assert many.count == single.count
+
+            response = client.get("/api/users/me/courses", headers=headers)
+            assert "resources" not in response.json["data"]["courses"][0]
+
+    def test_student_enrolled_courses(self, app, client, educator_data):
+        """Test students only see courses they are enrolled in"""
+        with app.app_context():
+            educator, student, school = educator_data["educator"], educator_data["student"], educator_data["school"]
+            enrolled = self._add_course(educator, school, 0)
+            self._add_course(educator, school, 1)
+            db.session.add(Enrollment(user_public_id=student.public_id, course_id=enrolled.id,
+                                      date_enrolled=datetime.now(timezone.utc)))
+            db.session.commit()
+            headers = self._login(client, student.email)
+
+            response = client.get("/api/users/me/courses", headers=headers)
+            assert response.status_code == 200
+            assert [c["title"] for c in response.json["data"]["courses"]] == ["Course 0"]
+
+    def test_courses_etag_revalidation(self, app, client, educator_data):
+        """Test If-None-Match returns 304 until the course tree changes"""
+        with app.app_context():
+            educator, school = educator_data["educator"], educator_data["school"]
+            self._add_course(educator, school, 0)
+            headers = self._login(client, educator.email)
+
+            response = client.get("/api/users/me/courses?include=resources", headers=headers)
+            etag = response.headers["ETag"]
+
+            response = client.get("/api/users/me/courses?include=resources",
+                                  headers={**headers, "If-None-Match": etag})
+            assert response.status_code == 304
+
+            self._add_course(educator, school, 1)
+            response = client.get("/api/users/me/courses?include=resources",
+                                  headers={**headers, "If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.headers["ETag"] != etag
+
+
+class TestCurrentUserCache:
+    """Test the JWT current-user lookup and its identity cache"""
+
+    def _user_lookups(self, stats):
+        return sum(
+            n for sql, n in stats.fingerprints.items()
+            if sql.startswith("SELECT users.public_id") and "WHERE users.public_id" in sql
+        )
+
+    def test_cached_user_skips_lookup_until_updated(self, app, client, student_user, auth_headers, query_budget):
+        """Test repeat requests reuse the cached user and updates invalidate it"""
+        cache = app.extensions["identity_cache"]
+        cache.ttl = 60
+        try:
+            with app.app_context():
+                with query_budget(10) as first:
+                    response = client.get("/api/users/me", headers=auth_headers)
+                assert response.status_code == 200
+                assert self._user_lookups(first) == 1
+
+                with query_budget(10) as second:
+                    response = client.get("/api/users/me", headers=auth_headers)
+                assert response.json["data"]["user"]["email"] == "student@example.com"
+                assert self._user_lookups(second) == 0
+
+                response = client.put("/api/users/me", json={"name": "Renamed Student"}, headers=auth_headers)
+                assert response.status_code == 200
+
+                with query_budget(10) as third:
+                    response = client.get("/api/users/me", headers=auth_headers)
+                assert response.json["data"]["user"]["name"] == "Renamed Student"
+                assert self._user_lookups(third) == 1
+        finally:
+            cache.ttl = 0
+            cache.clear()
+
+    def test_token_for_missing_user_rejected(self, app, client):
+        """Test a valid token whose user no longer exists is refused"""
+        with app.app_context():
+            token = create_access_token(identity=str(uuid4()), additional_claims={"role": "student"})
+            response = client.get("/api/users/me", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 401
+            assert response.json["success"] is False